@@ -12,9 +12,14 @@ load_dotenv()
 # Add the src directory to the path
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
 
+# Start the startup timing report before the routes pull in the models
+from utils.startup import startup_report
+
 # Import routes
 from routes.chat_routes import chat_bp
+from routes.admin_routes import admin_bp
 from utils.logger import setup_logger
+from utils.tracing import TRACE_HEADER
 
 # Set up logger
 logger = setup_logger("app")
@@ -25,11 +30,12 @@ def create_app():
     """
     app = Flask(__name__)
     
-    # Configure CORS
-    CORS(app, resources={r"/api/*": {"origins": "*"}})
+    # Configure CORS (browsers may read the trace id of a response)
+    CORS(app, resources={r"/api/*": {"origins": "*"}}, expose_headers=[TRACE_HEADER])
     
     # Register blueprints
     app.register_blueprint(chat_bp)
+    app.register_blueprint(admin_bp)
     
     # Root route
     @app.route('/')
@@ -39,7 +45,12 @@ def create_app():
             "status": "operational",
             "endpoints": {
                 "chat": "/api/chat",
+                "stream": "/api/chat/stream",
+                "batch": "/api/chat/batch",
                 "health": "/api/chat/health",
+                "ready": "/api/chat/ready",
+                "stats": "/api/chat/stats",
+                "metrics": "/metrics",
                 "test": "/api/chat/test"
             }
         })
@@ -70,8 +81,10 @@ def create_app():
     # Request logging middleware
     @app.before_request
     def log_request_info():
-        if not request.path.startswith('/api/chat/health'):  # Don't log health checks
-            logger.info(f"Request: {request.method} {request.path} from {request.remote_addr}")
+        if not request.path.startswith(('/api/chat/health', '/api/chat/ready', '/metrics')):  # Don't log health checks and scrapes
+            logger.info("Request: %s %s from %s", request.method, request.path, request.remote_addr)
+    
+    logger.info(f"Application created {startup_report.report()['elapsed']:.3f}s after startup began")
     
     return app
 
@@ -0,0 +1,24 @@
+# asgi.py
+# Async serving mode: uvicorn asgi:app --host 0.0.0.0 --port 5000
+import os
+import sys
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+# Imported for its side effect: the startup timing report starts its clock
+# here, before the routes pull in the models
+from utils.startup import startup_report  # noqa: F401
+
+from routes.async_chat_routes import create_asgi_app
+
+app = create_asgi_app()
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
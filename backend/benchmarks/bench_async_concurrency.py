@@ -0,0 +1,135 @@
+# bench_async_concurrency.py
+"""
+Compare how many Azure fallback calls a single process keeps in flight with
+the blocking OpenAI client on a fixed worker pool (the gunicorn sync model)
+versus AsyncOpenAI on one event loop (the asgi.py serving mode).
+
+A local fake chat-completions endpoint answers every call after --latency
+seconds, so the numbers reflect concurrency, not the real service.
+
+Usage:
+    python benchmarks/bench_async_concurrency.py [--requests 400] [--sync-workers 8] [--latency 0.5]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from services.azure_service import AzureOpenAIService, AsyncAzureOpenAIService
+
+
+class InFlight:
+    """Counts concurrent requests seen by the fake endpoint"""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    def enter(self):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+
+    def leave(self):
+        self.current -= 1
+
+
+def build_fake_endpoint(latency, in_flight):
+    """Starlette app mimicking POST /chat/completions"""
+
+    async def completions(request):
+        await request.json()
+        in_flight.enter()
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            in_flight.leave()
+        return JSONResponse({
+            "id": "bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "bench",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "ok"}
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        })
+
+    return Starlette(routes=[Route('/chat/completions', completions, methods=['POST'])])
+
+
+def start_fake_endpoint(latency, in_flight):
+    """Serve the fake endpoint on a free port in a daemon thread"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(
+        build_fake_endpoint(latency, in_flight),
+        host='127.0.0.1', port=port, log_level='warning', limit_concurrency=10000
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def run_sync(base_url, requests, workers):
+    """Blocking client, one call per worker thread at a time"""
+    service = AzureOpenAIService(base_url=base_url, api_key="bench")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        answers = list(pool.map(lambda i: service.generate_response(f"question {i}"), range(requests)))
+    return time.perf_counter() - start, answers
+
+
+def run_async(base_url, requests):
+    """AsyncOpenAI client, every call scheduled on one event loop"""
+    service = AsyncAzureOpenAIService(base_url=base_url, api_key="bench")
+
+    async def main():
+        return await asyncio.gather(*(service.generate_response(f"question {i}") for i in range(requests)))
+
+    start = time.perf_counter()
+    answers = asyncio.run(main())
+    return time.perf_counter() - start, answers
+
+
+def report(name, elapsed, answers, in_flight):
+    ok = sum(1 for answer in answers if answer == "ok")
+    print(f"{name:<28} {elapsed:8.2f}s {len(answers) / elapsed:10.1f} req/s   peak in flight {in_flight.peak:5d}   ok {ok}/{len(answers)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--sync-workers', type=int, default=8, help='Threads standing in for sync gunicorn workers')
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds the fake endpoint takes per call')
+    args = parser.parse_args()
+
+    in_flight = InFlight()
+    base_url = start_fake_endpoint(args.latency, in_flight)
+
+    print(f"{args.requests} calls, {args.latency:.2f}s simulated Azure latency")
+
+    elapsed, answers = run_sync(base_url, args.requests, args.sync_workers)
+    report(f"sync x{args.sync_workers} workers", elapsed, answers, in_flight)
+
+    in_flight.peak = 0
+    elapsed, answers = run_async(base_url, args.requests)
+    report("async, one event loop", elapsed, answers, in_flight)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# bench_bow_featurizer.py
+"""
+Compare the legacy nested-loop bag of words encoder with BagOfWordsFeaturizer
+as the vocabulary grows.
+
+Usage:
+    python benchmarks/bench_bow_featurizer.py
+"""
+import os
+import sys
+import random
+import string
+import timeit
+
+import numpy as np
+
+# Add the src directory to path to import the featurizer
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from prediction.featurizer import BagOfWordsFeaturizer
+
+VOCAB_SIZES = [1_000, 5_000, 10_000, 50_000]
+MESSAGES = [
+    "what are your skills",
+    "hello",
+    "how can i contact hassane",
+    "tell me about your computer vision projects",
+    "which certificates do you have in machine learning",
+]
+
+
+def tokenize(sentence):
+    """Whitespace tokenizer so the benchmark does not depend on NLTK data"""
+    return sentence.lower().split()
+
+
+def legacy_bag_of_words(sentence, words):
+    """Nested-loop encoder as previously implemented in IntentClassifier"""
+    sentence_words = tokenize(sentence)
+    bag = [0] * len(words)
+    for s_word in sentence_words:
+        for i, word in enumerate(words):
+            if word == s_word:
+                bag[i] = 1
+    return bag
+
+
+def build_vocabulary(size, seed=42):
+    """Build a sorted synthetic vocabulary that contains the message words"""
+    rng = random.Random(seed)
+    vocab = {w for m in MESSAGES for w in tokenize(m)}
+    while len(vocab) < size:
+        vocab.add(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))))
+    return sorted(vocab)
+
+
+def main():
+    print(f"{'vocab':>8} | {'legacy us/msg':>14} | {'featurizer us/msg':>18} | {'batch us/msg':>13}")
+    for size in VOCAB_SIZES:
+        words = build_vocabulary(size)
+        featurizer = BagOfWordsFeaturizer(words, tokenize)
+
+        # Both encoders must agree before their timings are comparable
+        for message in MESSAGES:
+            expected = np.array([legacy_bag_of_words(message, words)])
+            assert np.array_equal(featurizer.transform(message), expected)
+
+        repeats = 20
+        legacy = timeit.timeit(
+            lambda: [legacy_bag_of_words(m, words) for m in MESSAGES], number=repeats
+        ) / (repeats * len(MESSAGES))
+        single = timeit.timeit(
+            lambda: [featurizer.transform(m) for m in MESSAGES], number=repeats
+        ) / (repeats * len(MESSAGES))
+        batch = timeit.timeit(
+            lambda: featurizer.transform(MESSAGES), number=repeats
+        ) / (repeats * len(MESSAGES))
+
+        print(f"{size:>8} | {legacy * 1e6:>14.1f} | {single * 1e6:>18.1f} | {batch * 1e6:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
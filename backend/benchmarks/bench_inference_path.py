@@ -0,0 +1,82 @@
+# bench_inference_path.py
+"""
+Compare per-request latency of keras Model.predict with the compiled
+inference function used by IntentClassifier(inference_mode='compiled').
+
+Usage:
+    python benchmarks/bench_inference_path.py [--model models/chatbot_model_improved.h5]
+
+Without --model a randomly initialised network with the train_model.py
+architecture is used, which is enough to measure the call overhead.
+"""
+import argparse
+import time
+
+import numpy as np
+import tensorflow as tf
+
+
+def build_reference_model(input_dim=800, num_classes=60):
+    """Dense + BatchNormalization + Dropout stack as in train_model.py"""
+    model = tf.keras.Sequential([
+        tf.keras.layers.Dense(256, input_shape=(input_dim,), activation='relu'),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.Dense(256, activation='relu'),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.Dense(64, activation='relu'),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.Dense(num_classes, activation='softmax'),
+    ])
+    return model
+
+
+def measure(fn, sample, iterations):
+    """Return latency percentiles in milliseconds for single-row calls"""
+    for _ in range(10):
+        fn(sample)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(sample)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return np.percentile(timings, [50, 90, 99])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', help='Path to a trained .h5 model')
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    if args.model:
+        import tensorflow_hub as hub
+        model = tf.keras.models.load_model(args.model, custom_objects={'KerasLayer': hub.KerasLayer})
+    else:
+        model = build_reference_model()
+
+    input_shape = tuple(model.input_shape[1:])
+    sample = np.random.rand(1, *input_shape).astype(np.float32)
+
+    @tf.function(input_signature=[tf.TensorSpec(shape=(None,) + input_shape, dtype=tf.float32)])
+    def infer(inputs):
+        return model(inputs, training=False)
+
+    # Both paths must agree before their timings are comparable
+    np.testing.assert_allclose(
+        model.predict(sample, verbose=0), infer(tf.convert_to_tensor(sample)).numpy(), rtol=1e-4, atol=1e-5
+    )
+
+    legacy = measure(lambda x: model.predict(x, verbose=0), sample, args.iterations)
+    compiled = measure(lambda x: infer(tf.convert_to_tensor(x)).numpy(), sample, args.iterations)
+
+    print(f"{'path':>10} | {'p50 ms':>8} | {'p90 ms':>8} | {'p99 ms':>8}")
+    print(f"{'predict':>10} | {legacy[0]:>8.3f} | {legacy[1]:>8.3f} | {legacy[2]:>8.3f}")
+    print(f"{'compiled':>10} | {compiled[0]:>8.3f} | {compiled[1]:>8.3f} | {compiled[2]:>8.3f}")
+    print(f"speedup (p50): {legacy[0] / compiled[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
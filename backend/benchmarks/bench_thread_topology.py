@@ -0,0 +1,133 @@
+# bench_thread_topology.py
+"""
+Sweep gunicorn workers x TensorFlow/BLAS threads per worker and report
+throughput and tail latency of local inference on this node.
+
+For every combination gunicorn is started from the backend directory with
+GUNICORN_WORKERS=<workers>, TF_INTRA_OP_THREADS=<threads> (BLAS threads
+follow it, see config.Config) and INFERENCE_WORKERS=<threads>, then
+--clients concurrent clients post single-message /api/chat/batch requests
+for --duration seconds. That endpoint only classifies (no Azure calls) and
+the prediction cache is disabled, so every request runs the model. Messages
+are the patterns of data/intents.json.
+
+The best setting is usually workers x threads close to the core count;
+more oversubscribes the CPU and p99 latency grows first.
+
+Usage:
+    python benchmarks/bench_thread_topology.py [--workers 1,2,4] [--threads 1,2,4]
+        [--inter-op 1] [--affinity auto] [--clients 16] [--duration 15]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from measure_worker_rss import BACKEND_DIR, wait_ready
+
+
+def load_messages():
+    """Every pattern of the intents file"""
+    with open(os.path.join(BACKEND_DIR, 'data', 'intents.json'), encoding='utf-8') as file:
+        intents = json.load(file)
+    return [pattern for intent in intents['intents'] for pattern in intent.get('patterns', [])]
+
+
+def run_clients(base_url, messages, clients, duration):
+    """Post batch requests from several threads; returns the latencies in seconds"""
+    stop_at = time.monotonic() + duration
+    latencies = []
+    lock = threading.Lock()
+
+    def client(offset):
+        i = offset
+        local = []
+        while time.monotonic() < stop_at:
+            body = json.dumps({"messages": [messages[i % len(messages)]]}).encode("utf-8")
+            request = urllib.request.Request(f"{base_url}/api/chat/batch", data=body,
+                                             headers={"Content-Type": "application/json"})
+            started = time.perf_counter()
+            urllib.request.urlopen(request, timeout=30).read()
+            local.append(time.perf_counter() - started)
+            i += clients
+        with lock:
+            latencies.extend(local)
+
+    with ThreadPoolExecutor(clients) as executor:
+        list(executor.map(client, range(clients)))
+    return latencies
+
+
+def measure(workers, threads, args, messages):
+    """Start gunicorn with one topology, warm it up and load it"""
+    env = dict(os.environ,
+               GUNICORN_WORKERS=str(workers),
+               GUNICORN_THREADS=str(max(1, args.clients // workers)),
+               GUNICORN_BIND=f"127.0.0.1:{args.port}",
+               TF_INTRA_OP_THREADS=str(threads),
+               TF_INTER_OP_THREADS=str(args.inter_op),
+               INFERENCE_WORKERS=str(threads),
+               CPU_AFFINITY=args.affinity,
+               PREDICTION_CACHE_SIZE='0')
+    base_url = f"http://127.0.0.1:{args.port}"
+    master = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(base_url, master, workers, args.timeout)
+        # Warm-up: first calls trace and allocate
+        run_clients(base_url, messages, args.clients, min(3.0, args.duration))
+        latencies = run_clients(base_url, messages, args.clients, args.duration)
+    finally:
+        master.terminate()
+        try:
+            master.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            master.kill()
+            master.wait()
+
+    latencies = np.array(latencies) * 1000.0
+    return {
+        "rps": len(latencies) / args.duration,
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99))
+    }
+
+
+def parse_counts(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=parse_counts, default=[1, 2, 4])
+    parser.add_argument('--threads', type=parse_counts, default=[1, 2, 4])
+    parser.add_argument('--inter-op', type=int, default=1, help="TF_INTER_OP_THREADS for every run")
+    parser.add_argument('--affinity', default='', help="CPU_AFFINITY for every run ('' or 'auto')")
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--timeout', type=float, default=300.0, help="Seconds to wait for the workers to be ready")
+    args = parser.parse_args()
+
+    messages = load_messages()
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"{cores} cores, {args.clients} clients, {args.duration:.0f}s per run, inter-op {args.inter_op}, "
+          f"affinity {args.affinity or 'off'}")
+    print(f"{'workers':>8}{'threads':>8}{'w x t':>7}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for workers in args.workers:
+        for threads in args.threads:
+            result = measure(workers, threads, args, messages)
+            print(f"{workers:>8}{threads:>8}{workers * threads:>7}{result['rps']:>10.1f}"
+                  f"{result['p50']:>10.2f}{result['p99']:>10.2f}", flush=True)
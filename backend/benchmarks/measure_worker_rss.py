@@ -0,0 +1,147 @@
+# measure_worker_rss.py
+"""
+Measure per-worker memory of the gunicorn deployment with and without
+preload_app (see gunicorn.conf.py).
+
+Gunicorn is started twice from the backend directory, each time with
+--workers workers. Once every worker answers /api/chat/ready, --requests chat
+requests are sent so every worker has served traffic, then the memory of the
+master and of each worker is read from /proc/<pid>/smaps_rollup:
+
+    RSS      resident pages, counting shared pages in full for every process
+    PSS      proportional share: shared pages divided by the number of sharers
+    Shared   pages also mapped by another process (the copy-on-write model)
+    Private  pages only this process holds
+
+With preload, worker RSS stays about the same but Shared grows and Private
+(and PSS) shrinks: the sum of PSS over all processes is what the deployment
+really costs. Linux only.
+
+Usage:
+    python benchmarks/measure_worker_rss.py [--workers 4] [--requests 40] [--port 5099]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUESTIONS = [
+    "hello",
+    "what projects have you built",
+    "what are your skills",
+    "how can I contact you"
+]
+
+
+def smaps_rollup(pid):
+    """Rss, Pss, Shared and Private memory of a process in MiB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": values.get("Rss", 0.0),
+        "pss": values.get("Pss", 0.0),
+        "shared": values.get("Shared_Clean", 0.0) + values.get("Shared_Dirty", 0.0),
+        "private": values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0)
+    }
+
+
+def worker_pids(master_pid):
+    """Direct children of the gunicorn master"""
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as file:
+        return [int(pid) for pid in file.read().split()]
+
+
+def wait_ready(base_url, master, workers, timeout):
+    """Poll the readiness endpoint until every worker has forked and answers 200"""
+    end = time.monotonic() + timeout
+    ready = 0
+    while time.monotonic() < end:
+        if master.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {master.returncode}")
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/chat/ready", timeout=5) as response:
+                ready = ready + 1 if response.status == 200 else 0
+        except (urllib.error.URLError, OSError):
+            ready = 0
+        # Several consecutive successes, so requests have reached more than one worker
+        if ready >= workers and len(worker_pids(master.pid)) == workers:
+            return
+        time.sleep(0.5)
+    raise RuntimeError("Workers did not become ready in time")
+
+
+def send_requests(base_url, count):
+    """Chat requests through the local model so every worker has run inference"""
+    for i in range(count):
+        body = json.dumps({"message": QUESTIONS[i % len(QUESTIONS)]}).encode("utf-8")
+        request = urllib.request.Request(f"{base_url}/api/chat", data=body,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(request, timeout=30).read()
+        except urllib.error.HTTPError as e:
+            e.read()
+
+
+def measure(preload, args):
+    """Start gunicorn, wait for it, send traffic and read the memory of every process"""
+    env = dict(os.environ,
+               GUNICORN_PRELOAD=str(preload),
+               GUNICORN_WORKERS=str(args.workers),
+               GUNICORN_BIND=f"127.0.0.1:{args.port}")
+    if not preload:
+        # Without preload each worker loads everything itself at import
+        env.setdefault('STARTUP_MODE', 'eager')
+    base_url = f"http://127.0.0.1:{args.port}"
+    master = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(base_url, master, args.workers, args.timeout)
+        send_requests(base_url, args.requests)
+        return smaps_rollup(master.pid), [smaps_rollup(pid) for pid in worker_pids(master.pid)]
+    finally:
+        master.terminate()
+        master.wait(timeout=30)
+
+
+def print_report(label, master, workers):
+    print(f"\n{label}")
+    print(f"{'process':<10}{'RSS':>10}{'PSS':>10}{'Shared':>10}{'Private':>10}  (MiB)")
+    rows = [("master", master)] + [(f"worker {i}", memory) for i, memory in enumerate(workers)]
+    for name, memory in rows:
+        print(f"{name:<10}{memory['rss']:>10.1f}{memory['pss']:>10.1f}{memory['shared']:>10.1f}{memory['private']:>10.1f}")
+    total_pss = master["pss"] + sum(memory["pss"] for memory in workers)
+    mean_private = sum(memory["private"] for memory in workers) / len(workers)
+    print(f"total PSS {total_pss:.1f} MiB, mean worker private {mean_private:.1f} MiB")
+    return total_pss
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--timeout', type=float, default=300.0, help="Seconds to wait for the workers to be ready")
+    args = parser.parse_args()
+
+    totals = {}
+    for preload in (False, True):
+        master, workers = measure(preload, args)
+        totals[preload] = print_report(f"preload_app={preload}, {args.workers} workers", master, workers)
+
+    saved = totals[False] - totals[True]
+    print(f"\npreload saves {saved:.1f} MiB of PSS ({saved / totals[False]:.0%})")
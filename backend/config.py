@@ -5,6 +5,8 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 class Config:
     """Base configuration"""
     DEBUG = False
@@ -16,15 +18,147 @@ class Config:
     AZURE_OPENAI_API_KEY = os.environ.get('AZURE_OPENAI_API_KEY')
     AZURE_OPENAI_MODEL = os.environ.get('AZURE_OPENAI_MODEL', 'o1-mini')
     
-    # Model paths
-    MODEL_PATH = os.environ.get('MODEL_PATH', 'models/chatbot_model_improved.h5')
+    # Azure OpenAI client: pooled connections, per-attempt timeouts (seconds) and retries
+    AZURE_CONNECT_TIMEOUT = float(os.environ.get('AZURE_CONNECT_TIMEOUT', '5'))
+    AZURE_READ_TIMEOUT = float(os.environ.get('AZURE_READ_TIMEOUT', '30'))
+    AZURE_MAX_CONNECTIONS = int(os.environ.get('AZURE_MAX_CONNECTIONS', '20'))
+    AZURE_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get('AZURE_MAX_KEEPALIVE_CONNECTIONS', '10'))
+    AZURE_KEEPALIVE_EXPIRY = float(os.environ.get('AZURE_KEEPALIVE_EXPIRY', '30'))
+    AZURE_MAX_RETRIES = int(os.environ.get('AZURE_MAX_RETRIES', '2'))
+    AZURE_RETRY_BACKOFF = float(os.environ.get('AZURE_RETRY_BACKOFF', '0.5'))
+    AZURE_RETRY_BACKOFF_MAX = float(os.environ.get('AZURE_RETRY_BACKOFF_MAX', '4'))
+    # Total seconds one Azure call may spend across attempts and backoff (0 = unbounded)
+    AZURE_RETRY_BUDGET = float(os.environ.get('AZURE_RETRY_BUDGET', '20'))
+    
+    # Circuit breaker around Azure OpenAI (threshold 0 disables, slow-call seconds 0 ignores latency)
+    CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', '5'))
+    CIRCUIT_SLOW_CALL_SECONDS = float(os.environ.get('CIRCUIT_SLOW_CALL_SECONDS', '15'))
+    CIRCUIT_RESET_TIMEOUT = float(os.environ.get('CIRCUIT_RESET_TIMEOUT', '30'))
+    # Minimum local confidence to answer from the intents while the circuit is open
+    CIRCUIT_FALLBACK_MIN_CONFIDENCE = float(os.environ.get('CIRCUIT_FALLBACK_MIN_CONFIDENCE', '0.3'))
+    
+    # Model paths (a .npz exported by training/export_numpy.py is served without tensorflow; a .bundle
+    # written by training or training/export_bundle.py also carries classes and vocabulary and is preferred)
+    MODEL_PATH = os.environ.get('MODEL_PATH', os.path.join(BASE_DIR, 'models', 'chatbot_model_improved.bundle')
+                                if os.path.exists(os.path.join(BASE_DIR, 'models', 'chatbot_model_improved.bundle'))
+                                else os.path.join(BASE_DIR, 'models', 'chatbot_model_improved.h5'))
     INTENTS_PATH = os.environ.get('INTENTS_PATH', 'data/intents.json')
     
+    # Local artifacts so startup needs no network (fetch with src/utils/artifacts.py)
+    ARTIFACTS_DIR = os.environ.get('ARTIFACTS_DIR', os.path.join(BASE_DIR, 'artifacts'))
+    NLTK_DATA_DIR = os.environ.get('NLTK_DATA_DIR', os.path.join(ARTIFACTS_DIR, 'nltk_data'))
+    USE_MODEL_PATH = os.environ.get('USE_MODEL_PATH', os.path.join(ARTIFACTS_DIR, 'universal-sentence-encoder-4'))
+    OFFLINE_ARTIFACTS = os.environ.get('OFFLINE_ARTIFACTS', 'False').lower() == 'true'
+    
+    # Component loading: 'eager' (at import), 'lazy' (first request), 'background' (loader thread)
+    # or 'preload' (in the gunicorn master before fork, see gunicorn.conf.py)
+    STARTUP_MODE = os.environ.get('STARTUP_MODE', 'eager')
+    
+    # Per-request time budget in seconds (0 = none); clients may send X-Request-Deadline up to the maximum
+    REQUEST_DEADLINE = float(os.environ.get('REQUEST_DEADLINE', '10'))
+    REQUEST_DEADLINE_MAX = float(os.environ.get('REQUEST_DEADLINE_MAX', '30'))
+    # Least time left for which an Azure call is started; below it the best local answer is returned
+    REQUEST_MIN_REMOTE_SECONDS = float(os.environ.get('REQUEST_MIN_REMOTE_SECONDS', '1.0'))
+    
     # Confidence threshold for local vs Azure responses
     CONFIDENCE_THRESHOLD = float(os.environ.get('CONFIDENCE_THRESHOLD', '0.7'))
     
+    # Maximum number of messages accepted by /api/chat/batch
+    CHAT_BATCH_MAX_SIZE = int(os.environ.get('CHAT_BATCH_MAX_SIZE', '1000'))
+    
+    # Inference path: 'compiled' (traced tf.function) or 'predict' (keras Model.predict)
+    INFERENCE_MODE = os.environ.get('INFERENCE_MODE', 'compiled')
+    
+    # LRU cache of intent predictions keyed on normalized message text (size 0 disables, TTL 0 = no expiry)
+    PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', '1024'))
+    PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', '0'))
+    
+    # Semantic cache of Azure answers (size 0 disables, TTL 0 = no expiry); only used with the 'use' sentence
+    # encoder, bag of words vectors ignore unknown words and would merge unrelated questions
+    SEMANTIC_CACHE_SIZE = int(os.environ.get('SEMANTIC_CACHE_SIZE', '512'))
+    SEMANTIC_CACHE_TTL = float(os.environ.get('SEMANTIC_CACHE_TTL', '3600'))
+    SEMANTIC_CACHE_THRESHOLD = float(os.environ.get('SEMANTIC_CACHE_THRESHOLD', '0.92'))
+    
+    # Threads running classification for the async (asgi.py) serving mode
+    CLASSIFICATION_WORKERS = int(os.environ.get('CLASSIFICATION_WORKERS', '2'))
+    
+    # Thread topology per process (0 = library default, every core). With several gunicorn workers
+    # per node keep workers x TF_INTRA_OP_THREADS at or below the core count
+    TF_INTRA_OP_THREADS = int(os.environ.get('TF_INTRA_OP_THREADS', '0'))
+    TF_INTER_OP_THREADS = int(os.environ.get('TF_INTER_OP_THREADS', '0'))
+    # OMP_NUM_THREADS / MKL_NUM_THREADS / OPENBLAS_NUM_THREADS (0 = same as TF_INTRA_OP_THREADS)
+    BLAS_THREADS = int(os.environ.get('BLAS_THREADS', '0'))
+    # Pin each worker to CPUs: '' (off), 'auto' (TF_INTRA_OP_THREADS cores per worker) or
+    # ';'-separated CPU lists, one per worker ('0-3;4-7')
+    CPU_AFFINITY = os.environ.get('CPU_AFFINITY', '')
+    
+    # Threads running local inference per process (1 serializes keras predict, raise it for the numpy runtime)
+    INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', '1'))
+    
+    # Threads waiting on blocking Azure calls per process, and how many calls may queue for one (0 = no limit)
+    # before answering locally instead
+    AZURE_IO_WORKERS = int(os.environ.get('AZURE_IO_WORKERS', '8'))
+    AZURE_IO_MAX_QUEUE = int(os.environ.get('AZURE_IO_MAX_QUEUE', '0'))
+    
+    # Speculative Azure call started alongside classification for probably out-of-domain messages
+    SPECULATIVE_AZURE = os.environ.get('SPECULATIVE_AZURE', 'False').lower() == 'true'
+    # A message is flagged when at most this share of its informative words appear in the intent patterns
+    SPECULATION_MAX_COVERAGE = float(os.environ.get('SPECULATION_MAX_COVERAGE', '0.5'))
+    SPECULATION_WORKERS = int(os.environ.get('SPECULATION_WORKERS', '4'))
+    
+    # Persistent Azure answer cache shared by all workers (SQLite, WAL mode; size 0 disables, TTL 0 = no expiry)
+    # Inspect and prune with: python src/services/response_cache.py stats|list|prune|delete|clear
+    # (the default file is in backend/cache, which git ignores)
+    RESPONSE_CACHE_PATH = os.environ.get('RESPONSE_CACHE_PATH', os.path.join(BASE_DIR, 'cache', 'responses.sqlite3'))
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '10000'))
+    RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', '86400'))
+    # Stored with each answer; empty derives it from the Azure prompt so prompt changes invalidate old answers
+    RESPONSE_CACHE_PROMPT_VERSION = os.environ.get('RESPONSE_CACHE_PROMPT_VERSION', '')
+    
+    # Background warm-up from past chat traffic (JSONL, one {"message": ...} per line; empty path disables)
+    # Readiness is reported only once it has finished; the Azure pre-fill needs the response cache
+    WARMUP_TRAFFIC_PATH = os.environ.get('WARMUP_TRAFFIC_PATH', '')
+    WARMUP_TOP_N = int(os.environ.get('WARMUP_TOP_N', '200'))
+    WARMUP_PREFILL_AZURE = os.environ.get('WARMUP_PREFILL_AZURE', 'False').lower() == 'true'
+    # Maximum Azure calls per second of the pre-fill pass
+    WARMUP_AZURE_RATE = float(os.environ.get('WARMUP_AZURE_RATE', '1'))
+    
+    # Reload intents.json and the model directory when they change, without restarting (seconds between checks)
+    HOT_RELOAD = os.environ.get('HOT_RELOAD', 'False').lower() == 'true'
+    HOT_RELOAD_INTERVAL = float(os.environ.get('HOT_RELOAD_INTERVAL', '5'))
+    # Token expected in the X-Admin-Token header of /api/admin/* (empty disables the admin endpoints)
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+    
+    # Merge concurrent identical history-free Azure requests into one call (timeout 0 = wait indefinitely)
+    SINGLE_FLIGHT = os.environ.get('SINGLE_FLIGHT', 'True').lower() == 'true'
+    SINGLE_FLIGHT_TIMEOUT = float(os.environ.get('SINGLE_FLIGHT_TIMEOUT', '30'))
+    
+    # Micro-batching of concurrent /api/chat classifications
+    INFERENCE_BATCHING = os.environ.get('INFERENCE_BATCHING', 'False').lower() == 'true'
+    INFERENCE_MAX_BATCH_SIZE = int(os.environ.get('INFERENCE_MAX_BATCH_SIZE', '32'))
+    INFERENCE_MAX_WAIT_MS = float(os.environ.get('INFERENCE_MAX_WAIT_MS', '5'))
+    
     # Logging configuration
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    # One file per module logger in LOG_DIR, rotated 'daily' (<name>_<YYYYMMDD>.log, safe with several workers),
+    # by 'size' (<name>.log, .1, .2, ... renamed on rollover, one process per directory) or 'none'
+    LOG_DIR = os.environ.get('LOG_DIR', os.path.join(BASE_DIR, 'logs'))
+    LOG_ROTATION = os.environ.get('LOG_ROTATION', 'daily')
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    # Rotated files (or days) kept, 0 keeps all
+    LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT', '14'))
+    # Records waiting for the background writer before new ones are dropped (0 = no limit)
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+    # Share of the request INFO lines kept per logger, decided per request: "intent_classifier=0.1,chat_routes=0.1"
+    # (traced requests, warnings, errors and lines outside requests are always kept)
+    LOG_SAMPLING = os.environ.get('LOG_SAMPLING', '')
+    
+    # Request tracing: share of /api/chat requests traced (head sampling, 0 disables), where traces go
+    # ('jsonl', 'log', 'none' or the dotted path of a utils.tracing.SpanExporter subclass) and the JSONL file
+    # (kept next to the logs, in the git-ignored backend/logs by default)
+    TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '0.01'))
+    TRACE_EXPORTER = os.environ.get('TRACE_EXPORTER', 'jsonl')
+    TRACE_FILE = os.environ.get('TRACE_FILE', os.path.join(LOG_DIR, 'traces.jsonl'))
 
 class DevelopmentConfig(Config):
     """Development configuration"""
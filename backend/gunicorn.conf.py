@@ -0,0 +1,67 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings for the Flask app (wsgi.py)
+
+With preload_app on, the master imports the app once before forking: the
+intents, the model weights and the NLTK data are loaded a single time and
+every worker shares those pages copy-on-write instead of holding its own
+copy. Fork-unsafe state (the OpenAI HTTP client, SQLite connections,
+thread pools, and the TF runtime when the model needs it) is created in each
+worker by ResponseManager.after_fork.
+
+The thread policy of config.Config (TF_INTRA_OP_THREADS, TF_INTER_OP_THREADS,
+BLAS_THREADS) is exported before the app is imported, and CPU_AFFINITY pins
+each worker to its own block of cores. Compare settings with
+benchmarks/bench_thread_topology.py.
+
+Usage (from the backend directory):
+    gunicorn -c gunicorn.conf.py
+
+Measure the effect with benchmarks/measure_worker_rss.py.
+"""
+import gc
+import os
+import sys
+
+wsgi_app = "wsgi:app"
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+workers = int(os.environ.get('GUNICORN_WORKERS', '2'))
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+
+# Load the app in the master so the workers share its memory
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+if preload_app:
+    # Let the response manager load fork-safe models in the master and defer the rest to each worker
+    os.environ.setdefault('STARTUP_MODE', 'preload')
+
+# Imported only now: config.Config reads the environment once, when it is imported
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.join(BACKEND_DIR, 'src'))
+from config import get_config
+from utils.thread_policy import ThreadPolicy
+
+# Thread counts must be in the environment before numpy and tensorflow load
+thread_policy = ThreadPolicy.from_config(get_config())
+thread_policy.apply_environment()
+
+
+def pre_fork(server, worker):
+    """Freeze the preloaded objects and give the new worker its CPU block"""
+    # Collections write to every tracked object header, which would copy the shared pages into each worker
+    gc.freeze()
+    # Lowest CPU block not held by a live worker, so a replacement worker takes over its predecessor's cores
+    taken = {getattr(sibling, "cpu_slot", None) for sibling in server.WORKERS.values()}
+    worker.cpu_slot = next(slot for slot in range(len(taken) + 1) if slot not in taken)
+
+
+def post_fork(server, worker):
+    """Pin this worker to its cores and give the preloaded response manager its own clients, locks and threads"""
+    thread_policy.pin(worker.cpu_slot)
+    for module_name in ("routes.chat_routes", "routes.async_chat_routes"):
+        module = sys.modules.get(module_name)
+        # Absent when preload_app is off: the worker imports the app itself after this hook
+        if module is not None:
+            module.response_manager.after_fork()
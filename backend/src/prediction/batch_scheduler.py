@@ -0,0 +1,181 @@
+# batch_scheduler.py
+import os
+import sys
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+# Add the parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import setup_logger
+from utils.histogram import Histogram
+
+# Set up logger
+logger = setup_logger("batch_scheduler")
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+QUEUE_WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250)
+
+
+class BatcherClosedError(RuntimeError):
+    """Raised when a message is submitted to a batcher that has been shut down"""
+
+
+class InferenceBatcher:
+    """
+    Micro-batching scheduler in front of IntentClassifier
+
+    Concurrent predict_intent calls are queued and flushed as one
+    predict_intents call when the batch is full or max_wait_ms has elapsed
+    since the first queued message.
+    """
+
+    def __init__(self, classifier, max_batch_size=32, max_wait_ms=5.0):
+        """
+        Initialize the scheduler
+
+        Args:
+            classifier: IntentClassifier (anything exposing predict_intents)
+            max_batch_size: Maximum number of messages per forward pass
+            max_wait_ms: Maximum time the first queued message waits for company
+        """
+        self.classifier = classifier
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._closed = False
+
+        self.batch_size_histogram = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_histogram = Histogram(QUEUE_WAIT_MS_BUCKETS)
+
+    def _ensure_worker(self):
+        """Start the flushing thread on first use (and again after a fork; lock held)"""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="inference-batcher", daemon=True
+            )
+            self._worker.start()
+            logger.info(
+                f"Inference batcher started (max_batch_size={self.max_batch_size}, "
+                f"max_wait_ms={self.max_wait * 1000:.1f})"
+            )
+
+    def submit(self, message):
+        """
+        Queue a message for classification
+
+        Args:
+            message: User input message
+
+        Returns:
+            Future resolving to the predict_intent dict
+
+        Raises:
+            BatcherClosedError: if shutdown has been called
+        """
+        future = Future()
+        # Checked and queued under the lock so nothing lands behind the stop marker
+        with self._worker_lock:
+            if self._closed:
+                raise BatcherClosedError("Inference batcher is shut down")
+            self._ensure_worker()
+            self._queue.put((message, future, time.perf_counter()))
+        return future
+
+    def predict_intent(self, message, timeout=None):
+        """
+        Predict the intent of a message through the shared batch
+
+        Args:
+            message: User input message
+            timeout: Optional seconds to wait for the result
+
+        Returns:
+            Same dict as IntentClassifier.predict_intent
+
+        Raises:
+            BatcherClosedError: if shutdown has been called
+        """
+        return self.submit(message).result(timeout=timeout)
+
+    def predict_intents(self, messages):
+        """Already batched requests go straight to the classifier"""
+        return self.classifier.predict_intents(messages)
+
+    def _collect_batch(self):
+        """Block for the first item, then gather more until full or timed out"""
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Put the stop marker back so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        """Worker loop flushing batches to the classifier"""
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                break
+
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                self.queue_wait_histogram.observe((started - enqueued) * 1000.0)
+            self.batch_size_histogram.observe(len(batch))
+
+            messages = [message for message, _, _ in batch]
+            try:
+                results = self.classifier.predict_intents(messages)
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"Error running batched prediction: {str(e)}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+
+    def stats(self):
+        """
+        Get scheduler metrics
+
+        Returns:
+            dict with configuration, queue depth and histograms
+        """
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self._queue.qsize(),
+            "batch_size": self.batch_size_histogram.snapshot(),
+            "queue_wait_ms": self.queue_wait_histogram.snapshot()
+        }
+
+    def after_fork(self):
+        """Drop the queue and worker inherited from the parent process"""
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def shutdown(self):
+        """Stop the worker after the queued messages are flushed; later submissions are refused"""
+        with self._worker_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        if self._worker is not None:
+            self._worker.join(timeout=1.0)
@@ -0,0 +1,86 @@
+# featurizer.py
+import numpy as np
+
+
+class BagOfWordsFeaturizer:
+    """
+    Index-based bag of words encoder built once from the training vocabulary
+    """
+
+    def __init__(self, words, tokenizer, dtype=np.float32):
+        """
+        Initialize the featurizer
+
+        Args:
+            words: Vocabulary list as saved in words.pkl (column order)
+            tokenizer: Callable turning a message into a list of lemmatized words
+            dtype: dtype of the produced feature matrix
+        """
+        self.words = list(words)
+        self.tokenizer = tokenizer
+        self.dtype = dtype
+
+        # Map each word to its column(s); the vocabulary is normally unique but
+        # duplicates are kept so the output matches the legacy nested loop
+        self.word_index = {}
+        for i, word in enumerate(self.words):
+            self.word_index.setdefault(word, []).append(i)
+
+    @property
+    def vocab_size(self):
+        """Number of columns in the feature matrix"""
+        return len(self.words)
+
+    def columns(self, tokens):
+        """
+        Get the active columns for a list of tokens
+
+        Args:
+            tokens: List of lemmatized words
+
+        Returns:
+            List of column indices set to 1 (may contain repeats)
+        """
+        cols = []
+        for token in tokens:
+            hits = self.word_index.get(token)
+            if hits:
+                cols.extend(hits)
+        return cols
+
+    def transform_tokens(self, token_lists):
+        """
+        Encode already tokenized messages
+
+        Args:
+            token_lists: List of token lists, one per message
+
+        Returns:
+            Feature matrix of shape (len(token_lists), vocab_size)
+        """
+        matrix = np.zeros((len(token_lists), self.vocab_size), dtype=self.dtype)
+        rows = []
+        cols = []
+        for row, tokens in enumerate(token_lists):
+            active = self.columns(tokens)
+            rows.extend([row] * len(active))
+            cols.extend(active)
+        if cols:
+            matrix[rows, cols] = 1
+        return matrix
+
+    def transform(self, messages):
+        """
+        Encode one message or a list of messages
+
+        Args:
+            messages: A message string or a list of message strings
+
+        Returns:
+            Feature matrix with one row per message
+        """
+        if isinstance(messages, str):
+            messages = [messages]
+        return self.transform_tokens([self.tokenizer(message) for message in messages])
+
+    __call__ = transform
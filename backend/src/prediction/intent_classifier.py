@@ -2,70 +2,158 @@
 import numpy as np
 import pickle
 import os
-import tensorflow as tf
-import nltk
-from nltk.stem import WordNetLemmatizer
-import tensorflow_hub as hub
-import random
 import sys
-import json
 
 # Add the parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.logger import setup_logger
+from prediction.featurizer import BagOfWordsFeaturizer
+from prediction.numpy_model import NumpyDenseModel
+from prediction.model_bundle import ModelBundle
+from utils.artifacts import configure_nltk, resolve_use_model
+from utils.startup import startup_report
+from utils.cache import LRUCache, normalize_message
+from utils.intents_store import IntentsStore
+from utils.metrics import stage_seconds
+from utils.tracing import tracer
 
 # Set up logger
 logger = setup_logger("intent_classifier")
 
+# Stage timers, bound once so the hot path skips the label lookup
+TOKENIZE_SECONDS = stage_seconds.labels("tokenize")
+FEATURES_SECONDS = stage_seconds.labels("features")
+PREDICT_SECONDS = stage_seconds.labels("predict")
+
 class IntentClassifier:
     """
     Class for intent classification using the trained model
     """
     
-    def __init__(self, model_path=None, threshold=0.6):
+    INFERENCE_MODES = ('compiled', 'predict')
+    
+    def __init__(self, model_path=None, threshold=0.6, inference_mode='compiled',
+                 nltk_data_dir=None, use_model_path=None, offline=False,
+                 cache_size=1024, cache_ttl=None, intents=None, thread_policy=None):
         """
         Initialize the intent classifier
         
         Args:
-            model_path: Path to the trained model, defaults to 'models/chatbot_model_improved.h5'
+            model_path: Path to the trained model, defaults to 'models/chatbot_model_improved.h5';
+                a .bundle file carries classes and vocabulary itself, otherwise they are
+                read from the pickles next to the model
             threshold: Confidence threshold for intent prediction
+            inference_mode: 'compiled' to call a traced inference function directly,
+                'predict' to use the legacy keras Model.predict path
+            nltk_data_dir: Local nltk_data directory searched before the defaults
+            use_model_path: Local Universal Sentence Encoder SavedModel directory
+            offline: Never download NLTK data or the USE model during initialization
+            cache_size: Maximum cached predictions keyed on normalized text (0 disables)
+            cache_ttl: Seconds a cached prediction stays valid, None for no expiry
+            intents: Shared utils.intents_store.IntentsStore answering process_message; read
+                once from the intents file on first use when omitted
+            thread_policy: utils.thread_policy.ThreadPolicy sizing the TensorFlow and BLAS
+                thread pools, applied before the model loads
         """
         # Set paths and parameters
         self.model_path = model_path or 'models/chatbot_model_improved.h5'
-        self.classes_path = 'models/classes.pkl'
-        self.model_info_path = 'models/model_info.pkl'
+        # Legacy metadata lives next to the model, whatever the working directory
+        model_dir = os.path.dirname(self.model_path)
+        self.classes_path = os.path.join(model_dir, 'classes.pkl')
+        self.model_info_path = os.path.join(model_dir, 'model_info.pkl')
+        self.words_path = os.path.join(model_dir, 'words.pkl')
+        self.bundle_version = None
         self.threshold = threshold
+        self.intents = intents
         self.logger = logger
         
-        # Download required NLTK resources
-        nltk.download('punkt', quiet=True)
-        nltk.download('wordnet', quiet=True)
+        if inference_mode not in self.INFERENCE_MODES:
+            logger.warning(f"Unknown inference mode '{inference_mode}', using 'predict'")
+            inference_mode = 'predict'
+        self.inference_mode = inference_mode
+        self.use_model_path = use_model_path
+        self.offline = offline
+        self.thread_policy = thread_policy
+        
+        # Predictions keyed on normalized text; cleared whenever model or classes change
+        self.prediction_cache = LRUCache(max_size=cache_size, ttl=cache_ttl)
+        
+        # Make the NLTK resources available, downloading only when missing and allowed
+        with startup_report.phase("nltk resources"):
+            configure_nltk(nltk_data_dir, offline=offline)
+            import nltk
+            from nltk.stem import WordNetLemmatizer
+            self._word_tokenize = nltk.word_tokenize
+            
+            # Initialize lemmatizer
+            self.lemmatizer = WordNetLemmatizer()
         
-        # Initialize lemmatizer
-        self.lemmatizer = WordNetLemmatizer()
+        # Load the tokenizer and WordNet now rather than on the first request
+        with startup_report.phase("nltk warm-up"):
+            self._clean_up_sentence("warm up")
+        
+        # Size the thread pools before tensorflow creates them
+        if self.thread_policy:
+            self.thread_policy.apply()
         
         # Load model and data
         self._load_model_and_data()
         
         logger.info("Intent classifier initialized successfully")
         
+    @property
+    def model(self):
+        """Loaded model (keras or numpy runtime)"""
+        return self._model
+    
+    @model.setter
+    def model(self, value):
+        self._model = value
+        self.prediction_cache.clear()
+    
+    @property
+    def classes(self):
+        """Intent tags in model output order"""
+        return self._classes
+    
+    @classes.setter
+    def classes(self, value):
+        self._classes = value
+        self.prediction_cache.clear()
+    
     def _load_model_and_data(self):
         """Load the trained model, classes, and model info"""
         try:
-            # Load model
+            # Load model; an exported .npz head is served without tensorflow
             logger.info(f"Loading model from {self.model_path}")
-            self.model = tf.keras.models.load_model(
-                self.model_path, 
-                custom_objects={'KerasLayer': hub.KerasLayer}
-            )
-            
-            # Load classes
-            logger.info(f"Loading classes from {self.classes_path}")
-            self.classes = pickle.load(open(self.classes_path, 'rb'))
+            if self.model_path.endswith('.bundle'):
+                self._load_bundle()
+            elif self.model_path.endswith('.npz'):
+                self.backend = 'numpy'
+                with startup_report.phase("model load"):
+                    self.model = NumpyDenseModel.load(self.model_path)
+            else:
+                with startup_report.phase("tensorflow import"):
+                    import tensorflow as tf
+                    import tensorflow_hub as hub
+                    if self.thread_policy:
+                        self.thread_policy.apply_tensorflow()
+                self.backend = 'keras'
+                with startup_report.phase("model load"):
+                    self.model = tf.keras.models.load_model(
+                        self.model_path, 
+                        custom_objects={'KerasLayer': hub.KerasLayer}
+                    )
             
-            # Load model info
-            logger.info(f"Loading model info from {self.model_info_path}")
-            self.model_info = pickle.load(open(self.model_info_path, 'rb'))
+            if self.bundle_version is None:
+                with startup_report.phase("model metadata"):
+                    # Load classes
+                    logger.info(f"Loading classes from {self.classes_path}")
+                    self.classes = pickle.load(open(self.classes_path, 'rb'))
+                    
+                    # Load model info
+                    logger.info(f"Loading model info from {self.model_info_path}")
+                    self.model_info = pickle.load(open(self.model_info_path, 'rb'))
             
             # Determine the embedding method
             self.embedding_method = self.model_info.get('embedding_method', 'bow')  # Default to bag of words
@@ -73,18 +161,26 @@ class IntentClassifier:
             # Initialize USE encoder if needed
             if self.embedding_method == 'use':
                 logger.info("Loading Universal Sentence Encoder")
-                self.use_encoder = hub.load("https://tfhub.dev/google/universal-sentence-encoder/4")
+                with startup_report.phase("use encoder"):
+                    import tensorflow_hub as hub
+                    if self.thread_policy:
+                        self.thread_policy.apply_tensorflow()
+                    self.use_encoder = hub.load(resolve_use_model(self.use_model_path, offline=self.offline))
             
             # Load words and other info if using LSTM or bag of words
             if self.embedding_method == 'lstm' or self.embedding_method == 'bow':
-                self.words_path = 'models/words.pkl'
-                if os.path.exists(self.words_path):
+                if self.bundle_version is not None:
+                    self.words = self._bundle_words
+                elif os.path.exists(self.words_path):
                     logger.info(f"Loading words from {self.words_path}")
                     self.words = pickle.load(open(self.words_path, 'rb'))
                 else:
                     logger.warning(f"Words file not found at {self.words_path}")
                     self.words = []
                 
+                # Build the word -> column index once instead of scanning the vocabulary per token
+                self.featurizer = BagOfWordsFeaturizer(self.words, self._clean_up_sentence)
+                
                 if self.embedding_method == 'lstm':
                     self.word_to_index = self.model_info.get('word_to_index', {})
                     self.max_seq_len = self.model_info.get('max_seq_len', 20)
@@ -94,10 +190,64 @@ class IntentClassifier:
             # Get the expected input shape to validate later inputs
             self._determine_input_shape()
             
+            # Trace the low-overhead inference function once at load time
+            with startup_report.phase("inference trace"):
+                self._build_inference_fn()
+            
         except Exception as e:
             logger.error(f"Error loading model and data: {str(e)}")
             raise ValueError(f"Failed to load the model and supporting files: {str(e)}")
     
+    @staticmethod
+    def needs_tensorflow(model_path=None):
+        """
+        Whether serving a model imports tensorflow (a keras model or USE embeddings)
+        
+        The TF runtime is not fork-safe, so such models must be loaded in each
+        worker rather than in a preloading parent process.
+        
+        Args:
+            model_path: Model file as passed to the constructor
+            
+        Returns:
+            True unless the model is known to run on the numpy runtime with local features
+        """
+        model_path = model_path or 'models/chatbot_model_improved.h5'
+        try:
+            if model_path.endswith('.bundle'):
+                bundle = ModelBundle.load(model_path, verify=False)
+                return bundle.backend == 'keras' or bundle.embedding_method == 'use'
+            if model_path.endswith('.npz'):
+                model_info_path = os.path.join(os.path.dirname(model_path), 'model_info.pkl')
+                if not os.path.exists(model_info_path):
+                    return False
+                with open(model_info_path, 'rb') as file:
+                    return pickle.load(file).get('embedding_method', 'bow') == 'use'
+        except Exception as e:
+            logger.warning(f"Could not inspect {model_path}: {str(e)}")
+        return True
+    
+    def _load_bundle(self):
+        """Load model, classes and vocabulary from one versioned bundle (no pickle)"""
+        with startup_report.phase("model load"):
+            bundle = ModelBundle.load(self.model_path)
+            if bundle.backend == 'numpy':
+                self.backend = 'numpy'
+                self.model = bundle.numpy_model()
+            else:
+                with startup_report.phase("tensorflow import"):
+                    import tensorflow_hub as hub
+                    if self.thread_policy:
+                        self.thread_policy.apply_tensorflow()
+                self.backend = 'keras'
+                self.model = bundle.keras_model(custom_objects={'KerasLayer': hub.KerasLayer})
+        
+        self.classes = bundle.classes
+        self.model_info = bundle.model_info
+        self._bundle_words = bundle.words
+        self.bundle_version = bundle.version
+        logger.info(f"Loaded model bundle {bundle.version} (run {bundle.manifest.get('run_id')}, backend {self.backend})")
+    
     def _determine_input_shape(self):
         """Determine the expected input shape for the model"""
         try:
@@ -121,6 +271,59 @@ class IntentClassifier:
             logger.warning(f"Could not determine input shape: {str(e)}. Will use dynamic shape.")
             self.input_shape = None
     
+    def _build_inference_fn(self):
+        """
+        Build a traced inference function with a fixed input signature
+        
+        Model.predict sets up a data adapter and its loop machinery on every
+        call; calling the traced function skips that per-request overhead.
+        """
+        self._infer = None
+        if self.backend == 'numpy':
+            logger.info("Using numpy inference path")
+            return
+        if self.inference_mode != 'compiled':
+            logger.info("Using keras Model.predict inference path")
+            return
+        
+        import tensorflow as tf
+        try:
+            if not self.input_shape or any(dim is None for dim in self.input_shape[1:]):
+                raise ValueError(f"input shape {self.input_shape} is not fixed")
+            
+            model_inputs = getattr(self.model, 'inputs', None)
+            input_dtype = model_inputs[0].dtype if model_inputs else tf.float32
+            signature = [tf.TensorSpec(shape=(None,) + tuple(self.input_shape[1:]), dtype=input_dtype)]
+            
+            model = self.model
+            
+            @tf.function(input_signature=signature, reduce_retracing=True)
+            def infer(inputs):
+                return model(inputs, training=False)
+            
+            # Trace now so the first request does not pay for it
+            infer(tf.zeros((1,) + tuple(self.input_shape[1:]), dtype=input_dtype))
+            self._infer = lambda inputs: infer(tf.convert_to_tensor(inputs, dtype=input_dtype)).numpy()
+            logger.info(f"Compiled inference function for input signature {signature[0]}")
+        except Exception as e:
+            logger.warning(f"Could not build compiled inference function, using Model.predict: {str(e)}")
+            self._infer = None
+    
+    def _run_model(self, input_data):
+        """
+        Run the model on a prepared input batch
+        
+        Args:
+            input_data: Array with one row per message
+            
+        Returns:
+            Array of class probabilities with one row per message
+        """
+        with PREDICT_SECONDS.time(), tracer.span("model.predict", batch_size=len(input_data)):
+            if self._infer is not None:
+                return self._infer(input_data)
+            return self.model.predict(input_data, batch_size=len(input_data), verbose=0)
+    
     def _clean_up_sentence(self, sentence):
         """
         Tokenize and lemmatize the sentence
@@ -132,51 +335,28 @@ class IntentClassifier:
             List of lemmatized words
         """
         # Tokenize words
-        word_tokens = nltk.word_tokenize(sentence)
+        word_tokens = self._word_tokenize(sentence)
         # Lemmatize each word
         return [self.lemmatizer.lemmatize(word.lower()) for word in word_tokens]
     
-    def _bag_of_words(self, sentence):
+    def _prepare_use_batch(self, messages):
+        """Prepare a batch of inputs for USE embedding model"""
+        # Get embeddings using Universal Sentence Encoder in one call
+        embedding = self.use_encoder(list(messages)).numpy()
+        return embedding
+    
+    def _lstm_indices(self, sentence_words):
         """
-        Create a bag of words representation for the traditional approach
+        Convert lemmatized words into a padded sequence of word indices
         
         Args:
-            sentence: Input sentence
+            sentence_words: List of lemmatized words
             
         Returns:
-            Bag of words array
+            List of max_seq_len word indices
         """
-        # Get lemmatized words from the sentence
-        sentence_words = self._clean_up_sentence(sentence)
-        
-        # Create empty bag with 0 for each word in our vocabulary
-        bag = [0] * len(self.words)
-        
-        # Fill the bag with 1s for each word found in the sentence
-        for s_word in sentence_words:
-            for i, word in enumerate(self.words):
-                if word == s_word:
-                    bag[i] = 1
-        
-        return bag
-    
-    def _prepare_use_input(self, message):
-        """Prepare input for USE embedding model"""
-        # Get embedding using Universal Sentence Encoder
-        embedding = self.use_encoder([message]).numpy()
-        return embedding
-    
-    def _prepare_lstm_input(self, message):
-        """Prepare input for LSTM model"""
-        # Get lemmatized words
-        sentence_words = self._clean_up_sentence(message)
-        
-        # Convert words to indices and pad sequence
-        seq = []
-        for word in sentence_words:
-            # Get index of word, or 0 if not found
-            idx = self.word_to_index.get(word, 0)
-            seq.append(idx)
+        # Convert words to indices, or 0 if not found
+        seq = [self.word_to_index.get(word, 0) for word in sentence_words]
         
         # Truncate if too long or pad if too short
         if len(seq) > self.max_seq_len:
@@ -184,12 +364,7 @@ class IntentClassifier:
         else:
             seq = seq + [0] * (self.max_seq_len - len(seq))
         
-        return np.array([seq])
-    
-    def _prepare_bow_input(self, message):
-        """Prepare input for bag of words model"""
-        bow = self._bag_of_words(message)
-        return np.array([bow])
+        return seq
     
     def _prepare_input(self, message):
         """
@@ -201,18 +376,151 @@ class IntentClassifier:
         Returns:
             Processed input ready for model prediction
         """
+        return self._prepare_batch([message])
+    
+    def _prepare_batch(self, messages):
+        """
+        Prepare one input tensor for several messages based on the embedding method
+        
+        Args:
+            messages: List of input messages
+            
+        Returns:
+            Processed input with one row per message, or None on failure
+        """
         try:
             if self.embedding_method == 'use':
-                return self._prepare_use_input(message)
-            elif self.embedding_method == 'lstm':
-                return self._prepare_lstm_input(message)
-            else:  # Default to bag of words
-                return self._prepare_bow_input(message)
+                # The encoder tokenizes internally, so the whole call counts as feature building
+                with FEATURES_SECONDS.time(), tracer.span("features"):
+                    return self._prepare_use_batch(messages)
+            
+            # Tokenize and lemmatize first so both stages are timed separately
+            with TOKENIZE_SECONDS.time(), tracer.span("tokenize"):
+                token_lists = [self._clean_up_sentence(message) for message in messages]
+            with FEATURES_SECONDS.time(), tracer.span("features"):
+                if self.embedding_method == 'lstm':
+                    return np.array([self._lstm_indices(tokens) for tokens in token_lists])
+                # Default to bag of words
+                return self.featurizer.transform_tokens(token_lists)
         except Exception as e:
             logger.error(f"Error preparing input: {str(e)}")
             # Return None to indicate failure
             return None
     
+    @property
+    def has_sentence_encoder(self):
+        """Whether embed_messages can produce sentence embeddings (the 'use' method)"""
+        return self.embedding_method == 'use'
+    
+    def embed_messages(self, messages):
+        """
+        Embed messages with the classifier's sentence encoder
+        
+        Bag of words and LSTM inputs are not offered: every out-of-vocabulary
+        word maps to zero, so unrelated questions sharing their known words
+        would look identical.
+        
+        Args:
+            messages: List of input messages
+            
+        Returns:
+            Array of USE embeddings with one vector per message, or None
+            without a sentence encoder
+        """
+        if not self.has_sentence_encoder:
+            return None
+        return self._prepare_use_batch(messages)
+    
+    def _fit_input_shape(self, input_data):
+        """
+        Truncate or pad the prepared input to the shape the model expects
+        
+        Args:
+            input_data: Prepared input array
+            
+        Returns:
+            Input array compatible with the model input shape where possible
+        """
+        # Check input shape compatibility
+        if self.input_shape and input_data.shape[1:] != self.input_shape[1:]:
+            actual_shape = input_data.shape
+            expected_shape = self.input_shape
+            logger.warning(f"Input shape mismatch: got {actual_shape}, expected {expected_shape}")
+            
+            # Try to reshape if possible (only for array-based inputs)
+            if len(actual_shape) == 2 and len(expected_shape) == 2:
+                if expected_shape[1] is not None:
+                    # Truncate or pad to match expected shape
+                    if actual_shape[1] > expected_shape[1]:
+                        # Truncate
+                        input_data = input_data[:, :expected_shape[1]]
+                        logger.info(f"Truncated input to shape {input_data.shape}")
+                    elif actual_shape[1] < expected_shape[1]:
+                        # Pad with zeros
+                        padding = np.zeros((actual_shape[0], expected_shape[1] - actual_shape[1]))
+                        input_data = np.hstack((input_data, padding))
+                        logger.info(f"Padded input to shape {input_data.shape}")
+        
+        return input_data
+    
+    def _interpret_prediction(self, result):
+        """
+        Turn one row of class probabilities into an intent dict
+        
+        Args:
+            result: Probability vector for a single message
+            
+        Returns:
+            dict with intent, confidence, use_azure and requires_fallback
+        """
+        # Get the highest confidence intent
+        max_index = np.argmax(result)
+        return self._build_prediction(self.classes[max_index], float(result[max_index]))
+    
+    def _build_prediction(self, intent, confidence):
+        """
+        Build the intent dict returned by predict_intent
+        
+        Args:
+            intent: Predicted intent tag
+            confidence: Confidence score of the prediction
+            
+        Returns:
+            dict with intent, confidence, use_azure and requires_fallback
+        """
+        # Determine if we should use Azure API based on confidence threshold
+        use_azure = confidence < self.threshold
+        
+        return {
+            "intent": intent,
+            "confidence": confidence,
+            "use_azure": use_azure,
+            "requires_fallback": use_azure
+        }
+    
+    def _fallback_prediction(self):
+        """Prediction that will trigger the Azure API"""
+        return {
+            "intent": "unknown",
+            "confidence": 0.0,
+            "use_azure": True,
+            "requires_fallback": True
+        }
+    
+    def cached_prediction(self, message):
+        """
+        Prediction of a message already in the cache, without running the model
+        
+        Args:
+            message: user input message
+            
+        Returns:
+            dict as returned by predict_intent, or None if the message is not cached
+        """
+        cached = self.prediction_cache.get(normalize_message(message))
+        return self._build_prediction(*cached) if cached is not None else None
+    
+    @tracer.traced("intent_classifier.predict_intent")
     def predict_intent(self, message):
         """
         Predict the intent of a message
@@ -228,69 +536,93 @@ class IntentClassifier:
                 - requires_fallback: boolean indicating if confidence is below threshold
         """
         
+        # Serve repeated questions from the cache; use_azure is re-derived from the current threshold
+        cache_key = normalize_message(message)
+        cached = self.prediction_cache.get(cache_key)
+        if cached is not None:
+            tracer.annotate(cache_hit=True, intent=cached[0], confidence=float(cached[1]))
+            return self._build_prediction(*cached)
+        
         try:
             # Prepare input based on model type
-            self.logger.info(f"Classifying intent for: '{message}'")
+            self.logger.info("Classifying intent for: '%.50s'", message)
             input_data = self._prepare_input(message)
             
             if input_data is None:
                 raise ValueError("Failed to prepare input data")
             
-            # Check input shape compatibility
-            if self.input_shape and input_data.shape[1:] != self.input_shape[1:]:
-                actual_shape = input_data.shape
-                expected_shape = self.input_shape
-                logger.warning(f"Input shape mismatch: got {actual_shape}, expected {expected_shape}")
-                
-                # Try to reshape if possible (only for array-based inputs)
-                if len(actual_shape) == 2 and len(expected_shape) == 2:
-                    if expected_shape[1] is not None:
-                        # Truncate or pad to match expected shape
-                        if actual_shape[1] > expected_shape[1]:
-                            # Truncate
-                            input_data = input_data[:, :expected_shape[1]]
-                            logger.info(f"Truncated input to shape {input_data.shape}")
-                        elif actual_shape[1] < expected_shape[1]:
-                            # Pad with zeros
-                            padding = np.zeros((actual_shape[0], expected_shape[1] - actual_shape[1]))
-                            input_data = np.hstack((input_data, padding))
-                            logger.info(f"Padded input to shape {input_data.shape}")
+            input_data = self._fit_input_shape(input_data)
             
             # Make prediction
-            result = self.model.predict(input_data, verbose=0)[0]
-            
-            # Get the highest confidence intent
-            max_index = np.argmax(result)
-            intent = self.classes[max_index]
-            confidence = float(result[max_index])
-            
-            self.logger.info(f"Predicted intent: {intent} with confidence: {confidence:.4f}")
+            result = self._run_model(input_data)[0]
             
-            # Determine if we should use Azure API based on confidence threshold
-            use_azure = confidence < self.threshold
+            prediction = self._interpret_prediction(result)
+            self.logger.info("Predicted intent: %s with confidence: %.4f", prediction['intent'], prediction['confidence'])
+            tracer.annotate(cache_hit=False, intent=prediction["intent"], confidence=float(prediction["confidence"]))
             
-            return {
-                "intent": intent,
-                "confidence": confidence,
-                "use_azure": use_azure,
-                "requires_fallback": use_azure
-            }
+            self.prediction_cache.set(cache_key, (prediction["intent"], prediction["confidence"]))
+            return prediction
         except Exception as e:
             self.logger.error(f"Error predicting intent: {str(e)}")
             # Return a fallback that will trigger Azure API
-            return {
-                "intent": "unknown",
-                "confidence": 0.0,
-                "use_azure": True,
-                "requires_fallback": True
-            }
+            return self._fallback_prediction()
+    
+    def predict_intents(self, messages):
+        """
+        Predict the intents of several messages with a single forward pass
+        
+        Args:
+            messages: list of user input messages
+            
+        Returns:
+            List of dicts in the same order and format as predict_intent
+        """
+        messages = list(messages)
+        if not messages:
+            return []
+        
+        # Answer cached messages first and only run the model on the misses
+        keys = [normalize_message(message) for message in messages]
+        predictions = [None] * len(messages)
+        misses = []
+        for i, key in enumerate(keys):
+            cached = self.prediction_cache.get(key)
+            if cached is not None:
+                predictions[i] = self._build_prediction(*cached)
+            else:
+                misses.append(i)
+        
+        if not misses:
+            return predictions
+        
+        try:
+            self.logger.info("Classifying intents for a batch of %d messages (%d cached)", len(misses), len(messages) - len(misses))
+            input_data = self._prepare_batch([messages[i] for i in misses])
+            
+            if input_data is None:
+                raise ValueError("Failed to prepare input data")
+            
+            input_data = self._fit_input_shape(input_data)
+            
+            # One forward pass for the whole batch
+            results = self._run_model(input_data)
+            
+            for i, result in zip(misses, results):
+                predictions[i] = self._interpret_prediction(result)
+                self.prediction_cache.set(keys[i], (predictions[i]["intent"], predictions[i]["confidence"]))
+        except Exception as e:
+            self.logger.error(f"Error predicting intents for batch: {str(e)}")
+            for i in misses:
+                predictions[i] = self._fallback_prediction()
+        
+        return predictions
     
-    def get_response(self, intents_json, predicted_intent):
+    def get_response(self, intents, predicted_intent):
         """
-        Get a response from the intents file based on the predicted intent
+        Get a response from the intents based on the predicted intent
         
         Args:
-            intents_json: loaded intents JSON data
+            intents: IntentsStore (or loaded intents JSON data, converted on each call)
             predicted_intent: dict returned from predict_intent
             
         Returns:
@@ -301,19 +633,18 @@ class IntentClassifier:
             self.logger.info("Confidence below threshold, response will be handled by Azure API")
             return None
         
+        if not isinstance(intents, IntentsStore):
+            intents = IntentsStore(intents)
+        
         tag = predicted_intent['intent']
         
-        # Find the matching intent in our intents list
-        for intent in intents_json['intents']:
-            if intent['tag'] == tag:
-                # Return a random response for this intent
-                response = random.choice(intent["responses"])
-                self.logger.info(f"Selected response for intent '{tag}'")
-                return response
-        
-        # If no matching intent found
-        self.logger.warning(f"No response found for intent '{tag}'")
-        return None
+        # Constant-time lookup of the tag's responses
+        response = intents.random_response(tag)
+        if response is None:
+            self.logger.warning(f"No response found for intent '{tag}'")
+        else:
+            self.logger.info("Selected response for intent '%s'", tag)
+        return response
     
     def process_message(self, message, intents_file='data/intents.json'):
         """
@@ -321,29 +652,24 @@ class IntentClassifier:
         
         Args:
             message: User input message
-            intents_file: Path to intents JSON file
+            intents_file: Path to intents JSON file, read once when the classifier has no intents store
             
         Returns:
             Tuple of (predicted_intent, response)
         """
-        # Load intents data
-        try:
-            with open(intents_file, 'r', encoding='utf-8') as file:
-                intents_json = json.load(file)
-        except Exception as e:
-            self.logger.error(f"Error loading intents file: {str(e)}")
-            return {
-                "intent": "unknown",
-                "confidence": 0.0,
-                "use_azure": True,
-                "requires_fallback": True
-            }, None
+        # Load intents data on first use only
+        if self.intents is None:
+            try:
+                self.intents = IntentsStore.from_file(intents_file)
+            except Exception as e:
+                self.logger.error(f"Error loading intents file: {str(e)}")
+                return self._fallback_prediction(), None
         
         # Predict intent
         predicted_intent = self.predict_intent(message)
         
         # Get response
-        response = self.get_response(intents_json, predicted_intent)
+        response = self.get_response(self.intents, predicted_intent)
         
         return predicted_intent, response
 
@@ -363,12 +689,11 @@ if __name__ == "__main__":
     
     try:
         # Load intents data
-        with open('data/intents.json', 'r', encoding='utf-8') as file:
-            intents_json = json.load(file)
+        intents = IntentsStore.from_file('data/intents.json')
         
         for sentence in test_sentences:
             predicted_intent = classifier.predict_intent(sentence)
-            response = classifier.get_response(intents_json, predicted_intent)
+            response = classifier.get_response(intents, predicted_intent)
             
             print(f"\nSentence: {sentence}")
             print(f"Intent: {predicted_intent['intent']} (Confidence: {predicted_intent['confidence']:.4f})")
@@ -0,0 +1,206 @@
+# model_bundle.py
+import os
+import json
+import time
+import struct
+import hashlib
+import tempfile
+import numpy as np
+
+from prediction.numpy_model import NumpyDenseModel
+
+# Bump when the bundle layout changes
+FORMAT_VERSION = 1
+
+# File layout: MAGIC | uint32 format version | uint32 reserved | uint64 manifest length |
+# manifest JSON | padding | arrays, each starting on an ALIGNMENT boundary
+MAGIC = b"CHATBNDL"
+_HEADER = struct.Struct("<8sIIQ")
+ALIGNMENT = 64
+
+# Name of the array holding a serialized keras .h5 model (models the numpy runtime cannot run)
+KERAS_BLOB = "keras_h5"
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _checksum(array):
+    return hashlib.sha256(memoryview(np.ascontiguousarray(array)).cast("B")).hexdigest()
+
+
+def write_bundle(path, manifest, arrays):
+    """
+    Write a model bundle atomically
+
+    Args:
+        path: Destination file
+        manifest: JSON-serializable dict (embedding_method, classes, words, ...);
+            the array table, checksums, bundle_id and format version are added here
+        arrays: Dict of name -> numpy array (numeric dtypes only)
+
+    Returns:
+        The complete manifest that was written
+    """
+    manifest = dict(manifest)
+    table = {}
+    offset = 0
+    contiguous = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype.hasobject:
+            raise ValueError(f"Array {name} has an object dtype and cannot be memory-mapped")
+        contiguous[name] = array
+        table[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+            "nbytes": int(array.nbytes),
+            "sha256": _checksum(array)
+        }
+        offset = _aligned(offset + array.nbytes)
+
+    manifest["format_version"] = FORMAT_VERSION
+    manifest["arrays"] = table
+    manifest.setdefault("created_at", time.time())
+    # Identifies the exact content: same weights and metadata give the same id
+    identity = {key: value for key, value in manifest.items() if key not in ("created_at", "bundle_id")}
+    manifest["bundle_id"] = hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    encoded = json.dumps(manifest, sort_keys=True).encode("utf-8")
+    data_start = _aligned(_HEADER.size + len(encoded))
+
+    # Write next to the destination and rename, so a watcher never sees a partial bundle
+    temp_path = f"{path}.tmp-{os.getpid()}"
+    with open(temp_path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(encoded)))
+        file.write(encoded)
+        for name, array in contiguous.items():
+            file.seek(data_start + table[name]["offset"])
+            file.write(memoryview(array).cast("B"))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+    return manifest
+
+
+class ModelBundle:
+    """
+    Single-file model: a JSON manifest followed by memory-mapped weights
+
+    The manifest carries everything the classifier needs besides the
+    weights (embedding method, classes, vocabulary, sequence length,
+    training run id), so model and metadata always come from the same
+    training run. Arrays are memory-mapped read-only: loading copies
+    nothing and every worker process shares the same page-cache pages.
+    """
+
+    def __init__(self, path, manifest, arrays):
+        self.path = path
+        self.manifest = manifest
+        self.arrays = arrays
+
+    @classmethod
+    def load(cls, path, verify=True):
+        """
+        Open a bundle
+
+        Args:
+            path: Bundle file
+            verify: Check every array against its manifest checksum
+
+        Returns:
+            ModelBundle
+
+        Raises:
+            ValueError: if the file is not a bundle, has an unsupported version or fails verification
+        """
+        with open(path, "rb") as file:
+            magic, version, _, manifest_length = _HEADER.unpack(file.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a model bundle")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported model bundle format version {version} (expected {FORMAT_VERSION})")
+            manifest = json.loads(file.read(manifest_length).decode("utf-8"))
+
+        data_start = _aligned(_HEADER.size + manifest_length)
+        arrays = {}
+        for name, entry in manifest["arrays"].items():
+            shape = tuple(entry["shape"])
+            if not entry["nbytes"]:
+                arrays[name] = np.empty(shape, dtype=np.dtype(entry["dtype"]))
+                continue
+            arrays[name] = np.memmap(path, dtype=np.dtype(entry["dtype"]), mode="r",
+                                     offset=data_start + entry["offset"], shape=shape)
+            if verify and _checksum(arrays[name]) != entry["sha256"]:
+                raise ValueError(f"Checksum mismatch for array {name} in {path}")
+        return cls(path, manifest, arrays)
+
+    @property
+    def version(self):
+        """Content id of the bundle"""
+        return self.manifest.get("bundle_id")
+
+    @property
+    def embedding_method(self):
+        return self.manifest.get("embedding_method", "bow")
+
+    @property
+    def classes(self):
+        return list(self.manifest.get("classes", []))
+
+    @property
+    def words(self):
+        return list(self.manifest.get("words", []))
+
+    @property
+    def model_info(self):
+        """Same keys as the legacy model_info.pkl"""
+        info = {
+            "embedding_method": self.embedding_method,
+            "num_classes": len(self.manifest.get("classes", []))
+        }
+        if self.embedding_method == "lstm":
+            words = self.manifest.get("words", [])
+            info.update(
+                vocab_size=len(words) + 1,
+                max_seq_len=self.manifest.get("max_seq_len", 20),
+                # Index 0 is reserved for padding, as in training
+                word_to_index={word: i + 1 for i, word in enumerate(words)}
+            )
+        return info
+
+    @property
+    def backend(self):
+        """'numpy' when the bundle holds dense layers, 'keras' when it holds a serialized keras model"""
+        return "keras" if KERAS_BLOB in self.arrays else "numpy"
+
+    def numpy_model(self):
+        """NumpyDenseModel over the memory-mapped layers (float32 weights are used without a copy)"""
+        layers = []
+        for i, activation in enumerate(self.manifest["layers"]):
+            layers.append((self.arrays[f"layer_{i}_kernel"], self.arrays[f"layer_{i}_bias"], activation))
+        return NumpyDenseModel(layers, self.manifest["input_dim"])
+
+    def keras_model(self, custom_objects=None):
+        """Load the embedded keras model (needs tensorflow)"""
+        import tensorflow as tf
+        # Not every keras version loads from an open HDF5 handle, a private temporary file always works
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.h5")
+            with open(path, "wb") as file:
+                file.write(memoryview(self.arrays[KERAS_BLOB]).cast("B"))
+            return tf.keras.models.load_model(path, custom_objects=custom_objects)
+
+    def describe(self):
+        """Manifest without the array table and vocabulary, for logs and CLIs"""
+        summary = {key: value for key, value in self.manifest.items() if key not in ("arrays", "words", "classes")}
+        summary.update(
+            path=self.path,
+            backend=self.backend,
+            num_classes=len(self.manifest.get("classes", [])),
+            vocab_size=len(self.manifest.get("words", [])),
+            arrays={name: {"dtype": entry["dtype"], "shape": entry["shape"]} for name, entry in self.manifest["arrays"].items()}
+        )
+        return summary
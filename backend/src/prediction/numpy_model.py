@@ -0,0 +1,132 @@
+# numpy_model.py
+import numpy as np
+
+# Bump when the .npz layout written by training/export_numpy.py changes
+FORMAT_VERSION = 1
+
+
+def _relu(x):
+    return np.maximum(x, 0.0)
+
+
+def _softmax(x):
+    shifted = x - np.max(x, axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / np.sum(exp, axis=-1, keepdims=True)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': _relu,
+    'softmax': _softmax,
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+}
+
+
+class NumpyDenseModel:
+    """
+    NumPy-only runtime for the exported Dense classifier head
+
+    Loads the .npz written by training/export_numpy.py. Each layer is an
+    affine transform (kernel, bias) followed by an activation, with
+    BatchNormalization already folded in and Dropout removed, so serving
+    never needs to import tensorflow.
+    """
+
+    def __init__(self, layers, input_dim, dtype=np.float32):
+        """
+        Initialize the model
+
+        Args:
+            layers: List of (kernel, bias, activation) tuples
+            input_dim: Number of input features
+            dtype: Compute dtype
+        """
+        self.dtype = dtype
+        self.input_dim = int(input_dim)
+        self.layers = []
+        for kernel, bias, activation in layers:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {activation}")
+            self.layers.append((
+                np.ascontiguousarray(kernel, dtype=dtype),
+                np.ascontiguousarray(bias, dtype=dtype),
+                activation
+            ))
+
+    @property
+    def input_shape(self):
+        """Keras-compatible input shape"""
+        return (None, self.input_dim)
+
+    @property
+    def output_shape(self):
+        """Keras-compatible output shape"""
+        return (None, self.layers[-1][0].shape[1])
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an exported model
+
+        Args:
+            path: Path to the .npz file
+
+        Returns:
+            NumpyDenseModel instance
+        """
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data['format_version'])
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported numpy model format version {version} (expected {FORMAT_VERSION})")
+
+            layers = []
+            for i in range(int(data['num_layers'])):
+                layers.append((
+                    data[f'layer_{i}_kernel'],
+                    data[f'layer_{i}_bias'],
+                    str(data[f'layer_{i}_activation'])
+                ))
+            return cls(layers, int(data['input_dim']))
+
+    def save(self, path):
+        """
+        Write the model to a .npz file
+
+        Args:
+            path: Destination path
+        """
+        arrays = {
+            'format_version': np.array(FORMAT_VERSION),
+            'num_layers': np.array(len(self.layers)),
+            'input_dim': np.array(self.input_dim),
+        }
+        for i, (kernel, bias, activation) in enumerate(self.layers):
+            arrays[f'layer_{i}_kernel'] = kernel
+            arrays[f'layer_{i}_bias'] = bias
+            arrays[f'layer_{i}_activation'] = np.array(activation)
+        np.savez(path, **arrays)
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        """
+        Run a forward pass
+
+        Args:
+            inputs: Array of shape (n, input_dim)
+            batch_size: Ignored, kept for keras API compatibility
+            verbose: Ignored, kept for keras API compatibility
+
+        Returns:
+            Array of class probabilities with one row per input
+        """
+        x = np.asarray(inputs, dtype=self.dtype)
+        for kernel, bias, activation in self.layers:
+            x = ACTIVATIONS[activation](x @ kernel + bias)
+        return x
+
+    __call__ = predict
@@ -0,0 +1,82 @@
+# src/routes/admin_routes.py
+from flask import Blueprint, request, jsonify
+import sys
+import os
+import threading
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from routes.chat_routes import response_manager
+from utils.logger import setup_logger
+from utils.admin_auth import admin_access_error
+from config import get_config
+
+# Set up logger
+logger = setup_logger("admin_routes")
+
+# Create Blueprint
+admin_bp = Blueprint('admin', __name__)
+
+# Load configuration
+app_config = get_config()
+
+def _admin_error(headers):
+    """Error response when the request may not use the admin endpoints, otherwise None"""
+    refused = admin_access_error(headers, app_config.ADMIN_TOKEN)
+    if refused:
+        message, status = refused
+        return jsonify({
+            "error": message,
+            "status": "error"
+        }), status
+    return None
+
+@admin_bp.route('/api/admin/reload', methods=['POST'])
+def reload_artifacts():
+    """
+    Reload intents.json and the model of this worker process
+
+    Expected JSON request body (optional):
+    {
+        "force": false, // reload even if the files look unchanged
+        "wait": true    // false returns 202 at once and reloads in the background
+    }
+
+    With several workers only the one receiving the request reloads; enable
+    HOT_RELOAD so every worker picks up changed files.
+
+    Returns:
+        The reload result and the active versions
+    """
+    error = _admin_error(request.headers)
+    if error:
+        return error
+
+    data = request.get_json(silent=True) or {}
+    force = bool(data.get('force', False))
+
+    if not data.get('wait', True):
+        threading.Thread(target=response_manager.reload, kwargs={"force": force}, name="admin-reload", daemon=True).start()
+        return jsonify({
+            "status": "accepted",
+            "versions": response_manager.versions()
+        }), 202
+
+    logger.info(f"Reload requested (force: {force})")
+    result = response_manager.reload(force=force)
+    return jsonify(result), 500 if result["status"] == "failed" else 200
+
+@admin_bp.route('/api/admin/versions', methods=['GET'])
+def versions():
+    """
+    Active intents and model versions of this worker process
+    """
+    error = _admin_error(request.headers)
+    if error:
+        return error
+
+    return jsonify({
+        "versions": response_manager.versions(),
+        "status": "success"
+    }), 200
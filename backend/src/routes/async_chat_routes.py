@@ -0,0 +1,473 @@
+# src/routes/async_chat_routes.py
+import sys
+import os
+import json
+import time
+import asyncio
+import functools
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from services.async_response_manager import AsyncResponseManager
+from utils.logger import setup_logger, configure_logging, logging_stats
+from utils.startup import startup_report
+from utils.deadline import Deadline
+from utils.admin_auth import admin_access_error
+from utils.metrics import registry, CONTENT_TYPE, request_seconds, requests_total, requests_in_flight
+from utils.tracing import tracer, TRACE_HEADER
+from config import get_config
+
+# Set up logger
+logger = setup_logger("async_chat_routes")
+
+# Load configuration
+app_config = get_config()
+configure_logging(app_config)
+tracer.configure_from(app_config)
+
+# Initialize response manager
+with startup_report.phase("async response manager"):
+    response_manager = AsyncResponseManager.from_config(app_config)
+
+# Per-endpoint latency and in-flight metrics, bound once for the hot path
+REQUEST_SECONDS = {endpoint: request_seconds.labels(endpoint) for endpoint in ('chat', 'stream', 'batch')}
+IN_FLIGHT = {endpoint: requests_in_flight.labels(endpoint) for endpoint in ('chat', 'stream', 'batch')}
+
+
+def _request_deadline(headers):
+    """Deadline of the request: the X-Request-Deadline header (seconds or "<n>ms") or the configured default"""
+    return Deadline.from_header(
+        headers.get('X-Request-Deadline'),
+        default=app_config.REQUEST_DEADLINE,
+        maximum=app_config.REQUEST_DEADLINE_MAX
+    )
+
+
+async def _read_json(request):
+    """Parse the request body, returning None when it is missing or invalid"""
+    try:
+        return await request.json()
+    except Exception:
+        return None
+
+
+def _sse_event(event, payload):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+def _traced_request(endpoint):
+    """Run an endpoint in the root span of its trace and return the trace id in the X-Trace-Id header"""
+    @functools.wraps(endpoint)
+    async def wrapper(request):
+        with tracer.start_trace(f"{request.method} {request.url.path}", trace_id=request.headers.get(TRACE_HEADER)) as span:
+            response = await endpoint(request)
+            span.set_attribute("status_code", response.status_code)
+            response.headers[TRACE_HEADER] = span.trace_id
+            return response
+    return wrapper
+
+
+@_traced_request
+async def chat(request):
+    """
+    Async endpoint for chat interactions, same contract as the Flask /api/chat
+    """
+    start_time = time.time()
+    deadline = _request_deadline(request.headers)
+    IN_FLIGHT['chat'].inc()
+
+    try:
+        data = await _read_json(request)
+
+        if not data:
+            return JSONResponse({
+                "error": "No data provided",
+                "status": "error"
+            }, status_code=400)
+
+        # Extract message
+        message = data.get('message', '').strip()
+        if not message:
+            return JSONResponse({
+                "error": "No message provided",
+                "status": "error"
+            }, status_code=400)
+
+        conversation_id = data.get('conversation_id')
+        history = data.get('history', [])
+
+        logger.info("Received chat request: %.50s... (conversation_id: %s)", message, conversation_id)
+
+        # Get response from manager
+        result = await response_manager.get_response(message, history, deadline)
+
+        processing_time = time.time() - start_time
+
+        logger.info("Response sent: %s, intent: %s, time: %.3fs", result['source'], result['intent'], processing_time)
+        requests_total.labels('chat', result["source"]).inc()
+        tracer.annotate(source=result["source"], intent=result["intent"])
+
+        return JSONResponse({
+            "response": result["response"],
+            "source": result["source"],
+            "confidence": result["confidence"],
+            "intent": result["intent"],
+            "processing_time": round(processing_time, 3),
+            "status": "success"
+        })
+
+    except Exception as e:
+        logger.error(f"Error processing chat request: {str(e)}")
+        requests_total.labels('chat', 'error').inc()
+
+        processing_time = time.time() - start_time
+
+        return JSONResponse({
+            "error": "Failed to process your request",
+            "details": str(e),
+            "processing_time": round(processing_time, 3),
+            "status": "error"
+        }, status_code=500)
+    finally:
+        IN_FLIGHT['chat'].dec()
+        REQUEST_SECONDS['chat'].observe(time.time() - start_time)
+
+
+async def chat_stream(request):
+    """
+    Async endpoint streaming the answer as Server-Sent Events, same events as the Flask /api/chat/stream
+    """
+    start_time = time.time()
+    deadline = _request_deadline(request.headers)
+
+    data = await _read_json(request)
+
+    if not data:
+        return JSONResponse({
+            "error": "No data provided",
+            "status": "error"
+        }, status_code=400)
+
+    message = data.get('message', '').strip()
+    if not message:
+        return JSONResponse({
+            "error": "No message provided",
+            "status": "error"
+        }, status_code=400)
+
+    history = data.get('history', [])
+
+    logger.info("Received streaming chat request: %.50s... (conversation_id: %s)", message, data.get('conversation_id'))
+
+    async def generate():
+        IN_FLIGHT['stream'].inc()
+        try:
+            async for event, payload in response_manager.stream_response(message, history, deadline):
+                if event == 'done':
+                    processing_time = time.time() - start_time
+                    payload = dict(payload, processing_time=round(processing_time, 3), status="success")
+                    logger.info("Stream finished: %s, intent: %s, time: %.3fs", payload['source'], payload['intent'], processing_time)
+                    requests_total.labels('stream', payload['source']).inc()
+                yield _sse_event(event, payload)
+        except Exception as e:
+            logger.error(f"Error processing streaming chat request: {str(e)}")
+            requests_total.labels('stream', 'error').inc()
+            yield _sse_event('error', {
+                "error": "Failed to process your request",
+                "details": str(e),
+                "processing_time": round(time.time() - start_time, 3),
+                "status": "error"
+            })
+        finally:
+            # Also runs when the client disconnects and the generator is closed
+            IN_FLIGHT['stream'].dec()
+            REQUEST_SECONDS['stream'].observe(time.time() - start_time)
+
+    return StreamingResponse(
+        generate(),
+        media_type='text/event-stream',
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+async def chat_batch(request):
+    """
+    Async endpoint for many messages in one request, same contract as the Flask /api/chat/batch
+    """
+    start_time = time.time()
+    IN_FLIGHT['batch'].inc()
+
+    try:
+        data = await _read_json(request)
+
+        if not data:
+            return JSONResponse({
+                "error": "No data provided",
+                "status": "error"
+            }, status_code=400)
+
+        messages = data.get('messages')
+        if not isinstance(messages, list) or not messages:
+            return JSONResponse({
+                "error": "No messages provided",
+                "status": "error"
+            }, status_code=400)
+
+        if len(messages) > app_config.CHAT_BATCH_MAX_SIZE:
+            return JSONResponse({
+                "error": f"Too many messages (max {app_config.CHAT_BATCH_MAX_SIZE})",
+                "status": "error"
+            }, status_code=413)
+
+        messages = [message.strip() if isinstance(message, str) else '' for message in messages]
+        use_azure = bool(data.get('use_azure', False))
+
+        logger.info("Received batch chat request: %d messages (use_azure: %s)", len(messages), use_azure)
+
+        results = await response_manager.get_responses(messages, use_azure=use_azure)
+
+        processing_time = time.time() - start_time
+        for result in results:
+            requests_total.labels('batch', result["source"]).inc()
+
+        return JSONResponse({
+            "results": [
+                {
+                    "message": message,
+                    "response": result["response"],
+                    "source": result["source"],
+                    "confidence": result["confidence"],
+                    "intent": result["intent"]
+                }
+                for message, result in zip(messages, results)
+            ],
+            "count": len(results),
+            "processing_time": round(processing_time, 3),
+            "status": "success"
+        })
+
+    except Exception as e:
+        logger.error(f"Error processing batch chat request: {str(e)}")
+        requests_total.labels('batch', 'error').inc()
+
+        return JSONResponse({
+            "error": "Failed to process your request",
+            "details": str(e),
+            "processing_time": round(time.time() - start_time, 3),
+            "status": "error"
+        }, status_code=500)
+    finally:
+        IN_FLIGHT['batch'].dec()
+        REQUEST_SECONDS['batch'].observe(time.time() - start_time)
+
+
+async def health_check(request):
+    """
+    Simple health check endpoint
+    """
+    return JSONResponse({
+        # Degraded while Azure calls are short-circuited to local answers
+        "status": "degraded" if response_manager.azure_service.circuit_open else "healthy",
+        "service": "Chat API (async)",
+        "ready": response_manager.ready,
+        "azure_circuit": response_manager.azure_service.circuit_breaker.stats(),
+        "warmup": response_manager.warmup.stats() if response_manager.warmup else None,
+        "timestamp": time.time()
+    })
+
+
+async def readiness_check(request):
+    """
+    Readiness probe: 503 until the classifier is loaded and the warm-up has finished
+    """
+    ready = response_manager.ready
+    return JSONResponse({
+        "ready": ready,
+        "warmup": response_manager.warmup.stats() if response_manager.warmup else None,
+        "timestamp": time.time()
+    }, status_code=200 if ready else 503)
+
+
+async def stats(request):
+    """
+    Runtime statistics of the chat pipeline
+    """
+    return JSONResponse({
+        "inference_batching": response_manager.batcher.stats() if response_manager.batcher else None,
+        "prediction_cache": response_manager.intent_classifier.prediction_cache.stats() if response_manager.intent_classifier else None,
+        "semantic_cache": response_manager.semantic_cache.stats(),
+        "response_cache": response_manager.response_cache.stats() if response_manager.response_cache else None,
+        "speculation": response_manager.speculation_metrics.stats(),
+        "single_flight": response_manager.single_flight.stats() if response_manager.single_flight else None,
+        "worker_pools": response_manager.pool_stats(),
+        "warmup": response_manager.warmup.stats() if response_manager.warmup else None,
+        "versions": response_manager.versions(),
+        "startup": startup_report.report(),
+        "logging": logging_stats(),
+        "timestamp": time.time(),
+        "status": "success"
+    })
+
+
+async def list_intents(request):
+    """
+    List available intents for debugging/development, same output as the Flask /api/chat/intents
+    """
+    try:
+        intents = response_manager.intents
+        if not len(intents):
+            return JSONResponse({
+                "error": "Intents data not available",
+                "status": "error"
+            }, status_code=404)
+
+        # Intent tags with their first 3 patterns as samples
+        intents_list = [
+            {
+                "tag": intent.tag,
+                "sample_patterns": list(intent.patterns[:3]),
+                "response_count": len(intent.responses),
+            }
+            for intent in intents
+        ]
+        return JSONResponse({
+            "intents": intents_list,
+            "count": len(intents_list),
+            "status": "success"
+        })
+
+    except Exception as e:
+        logger.error(f"Error listing intents: {str(e)}")
+        return JSONResponse({
+            "error": "Failed to list intents",
+            "details": str(e),
+            "status": "error"
+        }, status_code=500)
+
+
+async def test_chat(request):
+    """
+    Predefined response for checking that the API is up, same as the Flask /api/chat/test
+    """
+    return JSONResponse({
+        "response": "The chat service is running correctly. You can send POST requests to /api/chat to interact with the chatbot.",
+        "source": "test",
+        "status": "success"
+    })
+
+
+async def metrics(request):
+    """
+    Prometheus scrape endpoint, same output as the Flask /metrics (per worker process)
+    """
+    # Passed as a header: media_type would get a second charset appended
+    return Response(registry.render(response_manager.metric_families()), headers={"Content-Type": CONTENT_TYPE})
+
+
+def _admin_error(headers):
+    """Error response when the request may not use the admin endpoints, otherwise None"""
+    refused = admin_access_error(headers, app_config.ADMIN_TOKEN)
+    if refused:
+        message, status = refused
+        return JSONResponse({
+            "error": message,
+            "status": "error"
+        }, status_code=status)
+    return None
+
+
+async def reload_artifacts(request):
+    """
+    Reload intents.json and the model of this worker, same contract as the Flask /api/admin/reload
+    """
+    error = _admin_error(request.headers)
+    if error:
+        return error
+
+    data = await _read_json(request) or {}
+    force = bool(data.get('force', False))
+
+    # Loading a model takes seconds: keep it off the event loop and off the classification pool
+    loop = asyncio.get_running_loop()
+    reload_future = loop.run_in_executor(None, lambda: response_manager.reload(force=force))
+    if not data.get('wait', True):
+        return JSONResponse({
+            "status": "accepted",
+            "versions": response_manager.versions()
+        }, status_code=202)
+
+    logger.info(f"Reload requested (force: {force})")
+    result = await reload_future
+    return JSONResponse(result, status_code=500 if result["status"] == "failed" else 200)
+
+
+async def versions(request):
+    """
+    Active intents and model versions of this worker process
+    """
+    error = _admin_error(request.headers)
+    if error:
+        return error
+
+    return JSONResponse({
+        "versions": response_manager.versions(),
+        "status": "success"
+    })
+
+
+async def index(request):
+    """
+    Service description, same as the Flask root route
+    """
+    return JSONResponse({
+        "service": "Portfolio Chatbot API",
+        "status": "operational",
+        "endpoints": {
+            "chat": "/api/chat",
+            "stream": "/api/chat/stream",
+            "batch": "/api/chat/batch",
+            "health": "/api/chat/health",
+            "ready": "/api/chat/ready",
+            "stats": "/api/chat/stats",
+            "metrics": "/metrics",
+            "test": "/api/chat/test"
+        }
+    })
+
+
+def create_asgi_app():
+    """
+    Create and configure the ASGI application
+    """
+    return Starlette(
+        routes=[
+            Route('/', index, methods=['GET']),
+            Route('/api/chat', chat, methods=['POST']),
+            Route('/api/chat/stream', chat_stream, methods=['POST']),
+            Route('/api/chat/batch', chat_batch, methods=['POST']),
+            Route('/api/chat/health', health_check, methods=['GET']),
+            Route('/api/chat/ready', readiness_check, methods=['GET']),
+            Route('/api/chat/stats', stats, methods=['GET']),
+            Route('/api/chat/intents', list_intents, methods=['GET']),
+            Route('/api/chat/test', test_chat, methods=['GET']),
+            Route('/metrics', metrics, methods=['GET']),
+            Route('/api/admin/reload', reload_artifacts, methods=['POST']),
+            Route('/api/admin/versions', versions, methods=['GET']),
+        ],
+        middleware=[
+            # Same CORS policy as the Flask app
+            Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'],
+                       expose_headers=[TRACE_HEADER])
+        ]
+    )
@@ -1,13 +1,21 @@
 # src/routes/chat_routes.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, make_response, stream_with_context
 import sys
 import os
+import json
 import time
+import functools
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from services.response_manager import ResponseManager
-from utils.logger import setup_logger
+from utils.logger import setup_logger, configure_logging, logging_stats
+from utils.startup import startup_report
+from utils.deadline import Deadline
+from utils.metrics import registry, CONTENT_TYPE, request_seconds, requests_total, requests_in_flight
+from utils.tracing import tracer, TRACE_HEADER
+from config import get_config
 
 # Set up logger
 logger = setup_logger("chat_routes")
@@ -15,10 +23,33 @@ logger = setup_logger("chat_routes")
 # Create Blueprint
 chat_bp = Blueprint('chat', __name__)
 
+# Load configuration
+app_config = get_config()
+configure_logging(app_config)
+tracer.configure_from(app_config)
+
 # Initialize response manager
-response_manager = ResponseManager()
+with startup_report.phase("response manager"):
+    response_manager = ResponseManager.from_config(app_config)
+
+# Per-endpoint latency and in-flight metrics, bound once for the hot path
+REQUEST_SECONDS = {endpoint: request_seconds.labels(endpoint) for endpoint in ('chat', 'stream', 'batch')}
+IN_FLIGHT = {endpoint: requests_in_flight.labels(endpoint) for endpoint in ('chat', 'stream', 'batch')}
+
+def _traced_request(view):
+    """Run a view in the root span of its trace and return the trace id in the X-Trace-Id header"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        # A caller-supplied X-Trace-Id is kept so the request can be found under the caller's id
+        with tracer.start_trace(f"{request.method} {request.path}", trace_id=request.headers.get(TRACE_HEADER)) as span:
+            response = make_response(view(*args, **kwargs))
+            span.set_attribute("status_code", response.status_code)
+            response.headers[TRACE_HEADER] = span.trace_id
+            return response
+    return wrapper
 
 @chat_bp.route('/api/chat', methods=['POST'])
+@_traced_request
 def chat():
     """
     Endpoint for chat interactions
@@ -30,16 +61,24 @@ def chat():
         "history": [] // optional conversation history
     }
     
+    Optional header X-Request-Deadline: time budget in seconds ("2.5") or
+    milliseconds ("2500ms"), capped by REQUEST_DEADLINE_MAX
+    
+    Optional header X-Trace-Id: trace id to reuse; the response always
+    carries the request's trace id in X-Trace-Id
+    
     Returns:
     {
         "response": "Assistant response",
-        "source": "local/azure/fallback",
+        "source": "local/azure/fallback/local_fallback",
         "confidence": 0.85,
         "intent": "detected_intent",
         "processing_time": 0.25
     }
     """
     start_time = time.time()
+    deadline = _request_deadline(request.headers)
+    IN_FLIGHT['chat'].inc()
     
     try:
         # Get request data
@@ -64,10 +103,10 @@ def chat():
         history = data.get('history', [])
         
         # Log incoming request
-        logger.info(f"Received chat request: {message[:50]}... (conversation_id: {conversation_id})")
+        logger.info("Received chat request: %.50s... (conversation_id: %s)", message, conversation_id)
         
         # Get response from manager
-        result = response_manager.get_response(message, history)
+        result = response_manager.get_response(message, history, deadline)
         
         # Calculate processing time
         processing_time = time.time() - start_time
@@ -82,13 +121,16 @@ def chat():
             "status": "success"
         }
         
-        logger.info(f"Response sent: {result['source']}, intent: {result['intent']}, time: {processing_time:.3f}s")
+        logger.info("Response sent: %s, intent: %s, time: %.3fs", result['source'], result['intent'], processing_time)
+        requests_total.labels('chat', result["source"]).inc()
+        tracer.annotate(source=result["source"], intent=result["intent"])
         
         return jsonify(response), 200
         
     except Exception as e:
         # Log error
         logger.error(f"Error processing chat request: {str(e)}")
+        requests_total.labels('chat', 'error').inc()
         
         # Calculate processing time even for errors
         processing_time = time.time() - start_time
@@ -100,6 +142,198 @@ def chat():
             "processing_time": round(processing_time, 3),
             "status": "error"
         }), 500
+    finally:
+        IN_FLIGHT['chat'].dec()
+        REQUEST_SECONDS['chat'].observe(time.time() - start_time)
+
+def _request_deadline(headers):
+    """Deadline of the request: the X-Request-Deadline header (seconds or "<n>ms") or the configured default"""
+    return Deadline.from_header(
+        headers.get('X-Request-Deadline'),
+        default=app_config.REQUEST_DEADLINE,
+        maximum=app_config.REQUEST_DEADLINE_MAX
+    )
+
+def _sse_event(event, payload):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@chat_bp.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Endpoint for chat interactions streamed as Server-Sent Events
+    
+    Expected JSON request body: same as /api/chat
+    
+    Streams:
+        event: message  data: {"text": "complete answer"}   (local intents, cached or fallback answers)
+        event: token    data: {"text": "partial text"}      (Azure OpenAI, as tokens arrive)
+        event: error    data: {"error": "..."}               (stream interrupted)
+        event: done     data: {"source": "...", "intent": "...", "confidence": 0.85,
+                               "processing_time": 0.25, "status": "success"}
+    """
+    start_time = time.time()
+    deadline = _request_deadline(request.headers)
+    
+    # Get request data
+    data = request.json
+    
+    if not data:
+        return jsonify({
+            "error": "No data provided",
+            "status": "error"
+        }), 400
+    
+    # Extract message
+    message = data.get('message', '').strip()
+    if not message:
+        return jsonify({
+            "error": "No message provided",
+            "status": "error"
+        }), 400
+    
+    conversation_id = data.get('conversation_id')
+    history = data.get('history', [])
+    
+    logger.info("Received streaming chat request: %.50s... (conversation_id: %s)", message, conversation_id)
+    
+    def generate():
+        IN_FLIGHT['stream'].inc()
+        try:
+            first_event_time = None
+            for event, payload in response_manager.stream_response(message, history, deadline):
+                if first_event_time is None:
+                    first_event_time = time.time() - start_time
+                if event == 'done':
+                    processing_time = time.time() - start_time
+                    payload = dict(payload, processing_time=round(processing_time, 3), status="success")
+                    logger.info("Stream finished: %s, intent: %s, first event: %.3fs, time: %.3fs",
+                                payload['source'], payload['intent'], first_event_time, processing_time)
+                    requests_total.labels('stream', payload['source']).inc()
+                yield _sse_event(event, payload)
+        except Exception as e:
+            logger.error(f"Error processing streaming chat request: {str(e)}")
+            requests_total.labels('stream', 'error').inc()
+            yield _sse_event('error', {
+                "error": "Failed to process your request",
+                "details": str(e),
+                "processing_time": round(time.time() - start_time, 3),
+                "status": "error"
+            })
+        finally:
+            # Also runs when the client disconnects and the generator is closed
+            IN_FLIGHT['stream'].dec()
+            REQUEST_SECONDS['stream'].observe(time.time() - start_time)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+@chat_bp.route('/api/chat/batch', methods=['POST'])
+def chat_batch():
+    """
+    Endpoint for classifying and answering many messages in one request
+    
+    Expected JSON request body:
+    {
+        "messages": ["first message", "second message"],
+        "use_azure": false // optional, send low-confidence messages to Azure OpenAI
+    }
+    
+    Returns:
+    {
+        "results": [
+            {
+                "message": "first message",
+                "response": "Assistant response or null",
+                "source": "local/azure/fallback/unanswered",
+                "confidence": 0.85,
+                "intent": "detected_intent"
+            }
+        ],
+        "count": 2,
+        "processing_time": 0.25
+    }
+    """
+    start_time = time.time()
+    IN_FLIGHT['batch'].inc()
+    
+    try:
+        # Get request data
+        data = request.json
+        
+        if not data:
+            return jsonify({
+                "error": "No data provided",
+                "status": "error"
+            }), 400
+        
+        messages = data.get('messages')
+        if not isinstance(messages, list) or not messages:
+            return jsonify({
+                "error": "No messages provided",
+                "status": "error"
+            }), 400
+        
+        if len(messages) > app_config.CHAT_BATCH_MAX_SIZE:
+            return jsonify({
+                "error": f"Too many messages (max {app_config.CHAT_BATCH_MAX_SIZE})",
+                "status": "error"
+            }), 413
+        
+        messages = [message.strip() if isinstance(message, str) else '' for message in messages]
+        use_azure = bool(data.get('use_azure', False))
+        
+        logger.info("Received batch chat request: %d messages (use_azure: %s)", len(messages), use_azure)
+        
+        # Get responses from manager
+        results = response_manager.get_responses(messages, use_azure=use_azure)
+        
+        # Calculate processing time
+        processing_time = time.time() - start_time
+        
+        response = {
+            "results": [
+                {
+                    "message": message,
+                    "response": result["response"],
+                    "source": result["source"],
+                    "confidence": result["confidence"],
+                    "intent": result["intent"]
+                }
+                for message, result in zip(messages, results)
+            ],
+            "count": len(results),
+            "processing_time": round(processing_time, 3),
+            "status": "success"
+        }
+        
+        logger.info("Batch response sent: %d results, time: %.3fs", len(results), processing_time)
+        for result in results:
+            requests_total.labels('batch', result["source"]).inc()
+        
+        return jsonify(response), 200
+        
+    except Exception as e:
+        logger.error(f"Error processing batch chat request: {str(e)}")
+        requests_total.labels('batch', 'error').inc()
+        
+        processing_time = time.time() - start_time
+        
+        return jsonify({
+            "error": "Failed to process your request",
+            "details": str(e),
+            "processing_time": round(processing_time, 3),
+            "status": "error"
+        }), 500
+    finally:
+        IN_FLIGHT['batch'].dec()
+        REQUEST_SECONDS['batch'].observe(time.time() - start_time)
 
 @chat_bp.route('/api/chat/health', methods=['GET'])
 def health_check():
@@ -107,19 +341,68 @@ def health_check():
     Simple health check endpoint
     """
     return jsonify({
-        "status": "healthy",
+        # Degraded while Azure calls are short-circuited to local answers
+        "status": "degraded" if response_manager.azure_service.circuit_open else "healthy",
         "service": "Chat API",
+        "ready": response_manager.ready,
+        "azure_circuit": response_manager.azure_service.circuit_breaker.stats(),
+        "warmup": response_manager.warmup.stats() if response_manager.warmup else None,
+        "timestamp": time.time()
+    }), 200
+
+@chat_bp.route('/api/chat/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness probe: 503 until the classifier is loaded and the warm-up has finished
+    """
+    ready = response_manager.ready
+    return jsonify({
+        "ready": ready,
+        "warmup": response_manager.warmup.stats() if response_manager.warmup else None,
         "timestamp": time.time()
+    }), 200 if ready else 503
+
+@chat_bp.route('/api/chat/stats', methods=['GET'])
+def stats():
+    """
+    Runtime statistics of the chat pipeline
+    """
+    return jsonify({
+        "inference_batching": response_manager.batcher.stats() if response_manager.batcher else None,
+        "prediction_cache": response_manager.intent_classifier.prediction_cache.stats() if response_manager.intent_classifier else None,
+        "semantic_cache": response_manager.semantic_cache.stats(),
+        "response_cache": response_manager.response_cache.stats() if response_manager.response_cache else None,
+        "speculation": response_manager.speculation_metrics.stats(),
+        "single_flight": response_manager.single_flight.stats() if response_manager.single_flight else None,
+        "worker_pools": response_manager.pool_stats(),
+        "warmup": response_manager.warmup.stats() if response_manager.warmup else None,
+        "versions": response_manager.versions(),
+        "startup": startup_report.report(),
+        "logging": logging_stats(),
+        "timestamp": time.time(),
+        "status": "success"
     }), 200
 
+@chat_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus scrape endpoint (text exposition format)
+    
+    Counters and histograms are per process: with several gunicorn workers
+    each scrape reports the worker that served it, identified by
+    chatbot_process_start_time_seconds.
+    """
+    body = registry.render(response_manager.metric_families())
+    return Response(body, content_type=CONTENT_TYPE), 200
+
 @chat_bp.route('/api/chat/intents', methods=['GET'])
 def list_intents():
     """
     List available intents for debugging/development
     """
     try:
-        # Get intents from response manager
-        if not hasattr(response_manager, 'intents_data') or not response_manager.intents_data:
+        # Get intents from the response manager's shared store
+        if not len(response_manager.intents):
             return jsonify({
                 "error": "Intents data not available",
                 "status": "error"
@@ -127,12 +410,12 @@ def list_intents():
         
         # Extract intent tags and sample patterns
         intents_list = []
-        for intent in response_manager.intents_data.get("intents", []):
+        for intent in response_manager.intents:
             # Add basic intent information
             intent_info = {
-                "tag": intent.get("tag"),
-                "sample_patterns": intent.get("patterns", [])[:3],  # First 3 patterns as samples
-                "response_count": len(intent.get("responses", [])),
+                "tag": intent.tag,
+                "sample_patterns": list(intent.patterns[:3]),  # First 3 patterns as samples
+                "response_count": len(intent.responses),
             }
             intents_list.append(intent_info)
         
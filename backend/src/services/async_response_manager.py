@@ -0,0 +1,318 @@
+# src/services/async_response_manager.py
+import os
+import sys
+import time
+import asyncio
+from typing import Dict, List
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import setup_logger
+from utils.deadline import Deadline
+from utils.singleflight import AsyncSingleFlight
+from utils.worker_pool import WorkerPool
+from utils.tracing import tracer
+from services.azure_service import AsyncAzureOpenAIService, CircuitOpenError
+from services.response_manager import ResponseManager
+
+# Set up logger
+logger = setup_logger("async_response_manager")
+
+
+class AsyncResponseManager(ResponseManager):
+    """
+    Response manager for the asyncio serving mode
+
+    Azure calls go through AsyncOpenAI so hundreds of them can be in flight
+    per process, while CPU-bound classification runs on a small thread pool
+    so it never blocks the event loop.
+    """
+
+    azure_service_class = AsyncAzureOpenAIService
+    single_flight_class = AsyncSingleFlight
+
+    def __init__(self, *args, classification_workers=2, **kwargs):
+        """
+        Initialize the async response manager
+
+        Args:
+            classification_workers: Threads used for tokenization and model inference
+            *args, **kwargs: Passed to ResponseManager
+        """
+        self.executor = WorkerPool("classification", classification_workers)
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def from_config(cls, app_config, **overrides):
+        """Build a manager from a config.Config class, including the executor size"""
+        overrides.setdefault("classification_workers", app_config.CLASSIFICATION_WORKERS)
+        return super().from_config(app_config, **overrides)
+
+    def after_fork(self):
+        """Re-create per-process state, including the classification executor"""
+        self.executor.after_fork()
+        super().after_fork()
+
+    def pool_stats(self) -> Dict:
+        """Worker pool metrics, including the classification executor"""
+        stats = super().pool_stats()
+        stats["classification"] = self.executor.stats()
+        return stats
+
+    async def _run_blocking(self, func, *args):
+        """Run a CPU-bound or blocking call on the classification executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    @tracer.traced("response_manager.get_response")
+    async def get_response(self, message: str, conversation_history=None, deadline=None) -> Dict:
+        """
+        Get a response based on the user message
+
+        Args:
+            message: User message
+            conversation_history: List of previous messages in the conversation
+            deadline: Optional utils.deadline.Deadline of the request, see ResponseManager.get_response
+
+        Returns:
+            Dict containing response and metadata
+        """
+        if not message:
+            return self._empty_message_result()
+
+        # Initialize conversation history if not provided
+        if conversation_history is None:
+            conversation_history = []
+
+        deadline = deadline or Deadline()
+        await self._run_blocking(self._ensure_components)
+
+        try:
+            if deadline.expired:
+                logger.warning(f"Request deadline exceeded before classification ({deadline.elapsed():.3f}s)")
+                return self._azure_failure_result()
+
+            # Probably out-of-domain: ask Azure while classifying instead of after
+            if self._should_speculate(message, deadline):
+                return await self._get_speculative_response(message, conversation_history, deadline)
+
+            # First, try to answer with our local model
+            local_result = await self._run_blocking(self._classify_locally, message, deadline)
+            if local_result:
+                return local_result
+
+            # Use Azure OpenAI for response
+            return await self._get_azure_response(message, conversation_history, deadline)
+
+        except Exception as e:
+            logger.error(f"Error getting response: {str(e)}")
+            # Fallback to Azure in case of any error
+            try:
+                return await self._get_azure_response(message, conversation_history, deadline)
+            except Exception as e2:
+                logger.error(f"Error getting Azure fallback response: {str(e2)}")
+                return self._error_result()
+
+    async def get_responses(self, messages: List[str], use_azure: bool = False) -> List[Dict]:
+        """
+        Get responses for a batch of messages; Azure calls for the batch run concurrently
+
+        Args:
+            messages: List of user messages
+            use_azure: Whether low-confidence messages are sent to Azure OpenAI
+
+        Returns:
+            List of dicts containing response and metadata, in input order
+        """
+        results = await self._run_blocking(super().get_responses, messages, False)
+        if not use_azure:
+            return results
+
+        pending = [i for i, result in enumerate(results) if result["source"] == "unanswered"]
+        answers = await asyncio.gather(
+            *(self._get_azure_response(messages[i], []) for i in pending),
+            return_exceptions=True
+        )
+        for i, answer in zip(pending, answers):
+            if isinstance(answer, Exception):
+                logger.error(f"Error getting Azure response in batch: {str(answer)}")
+                answer = self._error_result()
+            results[i] = answer
+        return results
+
+    async def stream_response(self, message: str, conversation_history=None, deadline=None):
+        """
+        Async counterpart of ResponseManager.stream_response
+
+        Yields:
+            (event, payload) tuples, see ResponseManager.stream_response
+        """
+        if not message:
+            for event in self._result_events(self._empty_message_result()):
+                yield event
+            return
+
+        deadline = deadline or Deadline()
+        await self._run_blocking(self._ensure_components)
+
+        if deadline.expired:
+            logger.warning(f"Request deadline exceeded before classification ({deadline.elapsed():.3f}s)")
+            for event in self._result_events(self._azure_failure_result()):
+                yield event
+            return
+
+        try:
+            local_result = await self._run_blocking(self._classify_locally, message, deadline)
+        except Exception as e:
+            logger.error(f"Error classifying message for stream: {str(e)}")
+            local_result = None
+
+        if local_result:
+            for event in self._result_events(local_result):
+                yield event
+            return
+
+        formatted_history = self._format_conversation_history(conversation_history or [])
+        cached_result, embedding = await self._run_blocking(self._lookup_cached_response, message, formatted_history)
+        if cached_result:
+            for event in self._result_events(cached_result):
+                yield event
+            return
+
+        skip_reason = self._remote_skip_reason(deadline)
+        if skip_reason:
+            fallback = await self._run_blocking(self._local_fallback_result, message, skip_reason, deadline)
+            for event in self._result_events(fallback):
+                yield event
+            return
+
+        if not self.azure_service.client:
+            logger.error("Failed to get response from Azure OpenAI")
+            for event in self._result_events(self._azure_failure_result()):
+                yield event
+            return
+
+        chunks = []
+        try:
+            async for chunk in self.azure_service.generate_response_stream(message=message, context=formatted_history, deadline=deadline):
+                chunks.append(chunk)
+                yield "token", {"text": chunk}
+        except Exception as e:
+            logger.error(f"Error streaming response from Azure OpenAI: {str(e)}")
+            if chunks:
+                # Part of the answer is already on the client; report the interruption
+                yield "error", {"error": "The response stream was interrupted"}
+                yield "done", {"source": "azure", "confidence": 1.0, "intent": "azure_generated"}
+            else:
+                fallback = await self._run_blocking(
+                    self._azure_error_result, message, deadline, None, isinstance(e, CircuitOpenError)
+                )
+                for event in self._result_events(fallback):
+                    yield event
+            return
+
+        if not chunks:
+            logger.error("Azure OpenAI returned an empty stream")
+            for event in self._result_events(self._azure_failure_result()):
+                yield event
+            return
+
+        await self._run_blocking(self._store_answer, message, "".join(chunks), embedding, not formatted_history)
+
+        yield "done", {"source": "azure", "confidence": 1.0, "intent": "azure_generated"}
+
+    async def _get_speculative_response(self, message: str, conversation_history: List, deadline=None) -> Dict:
+        """
+        Async counterpart of ResponseManager._get_speculative_response; the
+        speculative call is a task that is cancelled outright
+        """
+        formatted_history = self._format_conversation_history(conversation_history)
+        started_at = time.monotonic()
+        finished = {}
+        task = asyncio.create_task(self.azure_service.generate_response(
+            message=message,
+            context=formatted_history,
+            deadline=deadline
+        ))
+        task.add_done_callback(lambda _: finished.setdefault("at", time.monotonic()))
+        self.speculation_metrics.record_started()
+        logger.info("Started speculative Azure call for probably out-of-domain message")
+
+        try:
+            local_result, embedding = await self._run_blocking(self._speculative_local_stage, message, formatted_history, deadline)
+        except BaseException:
+            # Do not leave the speculative call running if this request is cancelled
+            task.cancel()
+            raise
+        local_done = time.monotonic()
+
+        if local_result:
+            task.cancel()
+            self.speculation_metrics.record_wasted(local_done - started_at)
+            return local_result
+
+        try:
+            response_text = await task
+        except Exception as e:
+            logger.error(f"Speculative Azure call failed: {type(e).__name__}: {str(e)}")
+            self.speculation_metrics.record_failed()
+            return await self._run_blocking(self._azure_error_result, message, deadline)
+        else:
+            self.speculation_metrics.record_used(min(local_done, finished.get("at", local_done)) - started_at)
+
+        return await self._run_blocking(self._azure_result, message, response_text, embedding, deadline, not formatted_history)
+
+    @tracer.traced("response_manager.azure_response")
+    async def _get_azure_response(self, message: str, conversation_history: List, deadline=None) -> Dict:
+        """
+        Get response from Azure OpenAI without blocking the event loop
+
+        Args:
+            message: User message
+            conversation_history: List of previous messages
+            deadline: Optional utils.deadline.Deadline of the request
+
+        Returns:
+            Dict containing response and metadata
+        """
+        # Format conversation history for Azure
+        formatted_history = self._format_conversation_history(conversation_history)
+
+        cached_result, embedding = await self._run_blocking(self._lookup_cached_response, message, formatted_history)
+        if cached_result:
+            return cached_result
+
+        # Answer locally right away when Azure is failing or there is no time left for it
+        skip_reason = self._remote_skip_reason(deadline)
+        if skip_reason:
+            return await self._run_blocking(self._local_fallback_result, message, skip_reason, deadline)
+
+        shared = False
+        key = self._single_flight_key(message, formatted_history)
+        if key is None:
+            # Get response from Azure
+            response_text = await self.azure_service.generate_response(
+                message=message,
+                context=formatted_history,
+                deadline=deadline
+            )
+        else:
+            # Identical questions in flight share one upstream call
+            try:
+                response_text, shared = await self.single_flight.do(
+                    key,
+                    lambda: self.azure_service.generate_response(message=message, context=formatted_history, deadline=deadline),
+                    timeout=self._single_flight_wait(deadline)
+                )
+            except asyncio.TimeoutError:
+                return await self._run_blocking(
+                    self._local_fallback_result, message, "timed out waiting for an identical in-flight Azure call", deadline
+                )
+            if shared:
+                # The leader already stores the answer in the caches
+                embedding = None
+
+        # The failure path may classify again for a local fallback, keep it off the event loop
+        return await self._run_blocking(
+            self._azure_result, message, response_text, embedding, deadline, not formatted_history and not shared
+        )
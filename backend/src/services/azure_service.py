@@ -1,23 +1,49 @@
 # src/services/azure_service.py
 import os
-from openai import OpenAI
 import sys
+import json
+import time
+import random
+import hashlib
+import asyncio
 import logging
+import threading
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.logger import setup_logger
+from utils.startup import startup_report
+from services.circuit_breaker import CircuitBreaker
+from utils.metrics import stage_seconds, azure_tokens_total
+from utils.tracing import tracer
 
 # Set up logger
 logger = setup_logger("azure_service")
 
+# Completion call timers (retries included), bound once for the hot path
+AZURE_SECONDS = stage_seconds.labels("azure")
+AZURE_STREAM_SECONDS = stage_seconds.labels("azure_stream")
+
 from dotenv import load_dotenv
 
 load_dotenv()
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Azure OpenAI while the circuit breaker is open"""
+
 class AzureOpenAIService:
     """Service for interacting with Azure OpenAI API"""
     
-    def __init__(self, base_url=None, api_key=None, model="gpt-4o-mini"):
+    # Returned to the user when the completion call fails
+    ERROR_RESPONSE = "I'm sorry, I'm having trouble connecting to my knowledge base right now. Please try asking in a different way or try again later."
+    
+    # HTTP statuses worth another attempt (timeouts, conflicts, throttling, server errors)
+    RETRYABLE_STATUS_CODES = (408, 409, 429)
+    
+    def __init__(self, base_url=None, api_key=None, model="gpt-4o-mini", lazy=False,
+                 connect_timeout=5.0, read_timeout=30.0, max_connections=20,
+                 max_keepalive_connections=10, keepalive_expiry=30.0, max_retries=2,
+                 retry_backoff=0.5, retry_backoff_max=4.0, retry_budget=20.0, circuit_breaker=None):
         """
         Initialize the Azure OpenAI service
         
@@ -25,22 +51,228 @@ class AzureOpenAIService:
             base_url: Azure OpenAI base URL
             api_key: Azure OpenAI API key
             model: Model to use for completions
+            lazy: Defer importing openai and creating the client until first use
+            connect_timeout: Seconds to establish a connection (also bounds waiting for a pooled one)
+            read_timeout: Seconds to wait for the response of a single attempt
+            max_connections: Connection pool size
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept
+            max_retries: Extra attempts after a retryable failure
+            retry_backoff: Base delay in seconds of the exponential backoff (full jitter)
+            retry_backoff_max: Upper bound of a single backoff delay
+            retry_budget: Total seconds a call may spend across attempts and backoff
+            circuit_breaker: CircuitBreaker guarding the API; a default one is created if omitted
         """
         # Use provided values or environment variables
         self.base_url = base_url or os.getenv("AZURE_OPENAI_BASE_URL", "https://models.inference.ai.azure.com")
         self.api_key = api_key or os.getenv("AZURE_OPENAI_API_KEY")
         self.model = model
         
-        try:
-            # Initialize OpenAI client
-            self.client = OpenAI(
-                base_url=self.base_url,
-                api_key=self.api_key,
-            )
-            logger.info("Azure OpenAI client initialized successfully")
-        except Exception as e:
-            logger.error(f"Error initializing Azure OpenAI client: {str(e)}")
-            self.client = None
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.retry_budget = retry_budget
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        
+        self._client = None
+        self._client_failed = False
+        self._client_lock = threading.Lock()
+        
+        if not lazy:
+            self._init_client()
+    
+    def _init_client(self):
+        """Import openai and create the client once"""
+        with self._client_lock:
+            if self._client is not None or self._client_failed:
+                return
+            try:
+                with startup_report.phase("openai client"):
+                    self._client = self._create_client()
+                logger.info("Azure OpenAI client initialized successfully")
+            except Exception as e:
+                logger.error(f"Error initializing Azure OpenAI client: {str(e)}")
+                self._client_failed = True
+    
+    def _http_settings(self):
+        """Pool limits and timeouts for the underlying httpx client"""
+        import httpx
+        
+        return {
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            "timeout": httpx.Timeout(self.read_timeout, connect=self.connect_timeout, pool=self.connect_timeout)
+        }
+    
+    def _create_client(self):
+        """Create the OpenAI client on a pooled keep-alive connection pool"""
+        import httpx
+        from openai import OpenAI
+        
+        settings = self._http_settings()
+        # Retries are handled by _call_with_retries so they share the retry budget and the breaker
+        return OpenAI(
+            base_url=self.base_url,
+            api_key=self.api_key,
+            max_retries=0,
+            timeout=settings["timeout"],
+            http_client=httpx.Client(**settings)
+        )
+    
+    @property
+    def circuit_open(self):
+        """Whether calls are currently short-circuited"""
+        return self.circuit_breaker.is_open
+    
+    @property
+    def accepting_calls(self):
+        """Whether the breaker would admit a call now (False while open or while half-open trials are all taken)"""
+        return self.circuit_breaker.admits_calls
+    
+    def _is_retryable(self, error):
+        """Whether another attempt may succeed after this error"""
+        import openai
+        
+        if isinstance(error, openai.APIConnectionError):
+            # Includes APITimeoutError
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in self.RETRYABLE_STATUS_CODES or error.status_code >= 500
+        return False
+    
+    def _is_upstream_failure(self, error):
+        """Whether this error says the upstream is unhealthy (counts against the circuit breaker)"""
+        import openai
+        
+        if isinstance(error, openai.APIStatusError):
+            return self._is_retryable(error)
+        return True
+    
+    def _call_deadline(self, deadline=None):
+        """
+        monotonic time by which a call must finish
+        
+        Args:
+            deadline: Optional utils.deadline.Deadline of the request
+            
+        Returns:
+            The earlier of the retry budget and the request deadline, or None if neither is set
+        """
+        call_deadline = time.monotonic() + self.retry_budget if self.retry_budget else None
+        if deadline is not None and deadline.at is not None:
+            call_deadline = deadline.at if call_deadline is None else min(call_deadline, deadline.at)
+        return call_deadline
+    
+    def _attempt_timeout(self, deadline):
+        """Per-attempt timeout: the read timeout, cut short by the remaining retry budget"""
+        import httpx
+        
+        read_timeout = self.read_timeout
+        if deadline is not None:
+            read_timeout = max(0.001, min(read_timeout, deadline - time.monotonic()))
+        return httpx.Timeout(read_timeout, connect=min(self.connect_timeout, read_timeout), pool=self.connect_timeout)
+    
+    def _next_delay(self, attempt, deadline):
+        """
+        Backoff before the next attempt
+        
+        Args:
+            attempt: Number of attempts made so far
+            deadline: monotonic time at which the retry budget runs out, or None
+            
+        Returns:
+            Seconds to sleep, or None when no attempt is left
+        """
+        if attempt > self.max_retries:
+            return None
+        # Full jitter: uniform between 0 and the capped exponential delay
+        delay = random.uniform(0, min(self.retry_backoff_max, self.retry_backoff * (2 ** (attempt - 1))))
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        return delay
+    
+    def _call_with_retries(self, func, request_deadline=None, **kwargs):
+        """
+        Call the API through the circuit breaker, retrying retryable failures
+        
+        Args:
+            func: Client method to call
+            request_deadline: Optional Deadline of the request, bounding attempts and backoff
+            kwargs: Arguments for the call (a per-attempt timeout is added)
+            
+        Returns:
+            The API result
+            
+        Raises:
+            CircuitOpenError: if the breaker refuses the call
+            Exception: the last error once attempts or the retry budget are exhausted
+        """
+        deadline = self._call_deadline(request_deadline)
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError("Azure OpenAI circuit breaker is open")
+            attempt += 1
+            start = time.monotonic()
+            try:
+                result = func(timeout=self._attempt_timeout(deadline), **kwargs)
+            except Exception as e:
+                if self._is_upstream_failure(e):
+                    self.circuit_breaker.record_failure()
+                else:
+                    # The service answered (e.g. a 400); the request was wrong, not the upstream
+                    self.circuit_breaker.record_success()
+                delay = self._next_delay(attempt, deadline) if self._is_retryable(e) else None
+                if delay is None:
+                    raise
+                logger.warning(f"Azure OpenAI attempt {attempt} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled (asyncio.CancelledError) or interrupted: no outcome to report,
+                # but a half-open trial slot must not stay taken
+                self.circuit_breaker.release()
+                raise
+            self.circuit_breaker.record_success(time.monotonic() - start)
+            tracer.annotate(attempts=attempt)
+            return result
+    
+    @staticmethod
+    def _record_usage(usage):
+        """
+        Count the tokens billed for one completion
+        
+        Args:
+            usage: The usage object of a response or stream chunk, may be None
+        """
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        azure_tokens_total.labels("prompt").inc(prompt_tokens)
+        azure_tokens_total.labels("completion").inc(completion_tokens)
+        tracer.annotate(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    
+    def after_fork(self):
+        """Forget the client inherited from the parent process; the next call creates one with fresh connections"""
+        self._client_lock = threading.Lock()
+        self._client = None
+        self._client_failed = False
+    
+    @property
+    def client(self):
+        """OpenAI client, created on first access when lazy"""
+        if self._client is None and not self._client_failed:
+            self._init_client()
+        return self._client
     
     def _get_instruction_prompt(self):
         """
@@ -59,7 +291,82 @@ class AzureOpenAIService:
                 
                 Now, please respond to the user's question."""
     
-    def generate_response(self, message, system_prompt=None, context=None):
+    def _instruction_messages(self):
+        """
+        Instruction prompt and assistant acknowledgment that open a conversation
+        
+        Returns:
+            List of role/content dicts
+        """
+        return [
+            {
+                "role": "user",
+                "content": self._get_instruction_prompt()
+            },
+            {
+                "role": "assistant",
+                "content": "I understand. I will answer questions about Hassane's portfolio professionally. Here's how I'll format my responses:\n\n### Key Information\n- **Skills** and technical expertise\n- *Projects* and achievements\n- Educational background\n- Contact details\n\nI can provide code examples like:\n```python\ndef example():\n    return \"Clear explanations\"\n```\n\nAnd link to resources when relevant. Let me know what you'd like to learn about!"
+            }
+        ]
+    
+    @property
+    def prompt_version(self):
+        """Short hash of what shapes an answer: model, opening messages and completion parameters"""
+        payload = json.dumps(self._completion_kwargs(self._instruction_messages()), sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    
+    def _build_messages(self, message, context=None):
+        """
+        Build the chat messages sent to Azure OpenAI
+        
+        Args:
+            message: User message
+            context: Optional conversation context (list of previous messages)
+            
+        Returns:
+            List of role/content dicts
+        """
+        # Create messages array
+        messages = []
+        
+        # Add instruction and acknowledgment as the first messages if no context
+        if not context or len(context) == 0:
+            messages.extend(self._instruction_messages())
+        
+        # Add conversation context if provided
+        elif context and isinstance(context, list):
+            # Filter out invalid messages and ensure content is present
+            filtered_context = [
+                msg for msg in context
+                if msg.get("role") != "system"
+                and msg.get("content") is not None
+                and isinstance(msg.get("content"), str)
+            ]
+            messages.extend(filtered_context)
+        
+        # Add the user message
+        messages.append({
+            "role": "user",
+            "content": message
+        })
+        
+        # Log the request (truncated to 60 characters when the line is written)
+        logger.info("Sending request to Azure OpenAI: '%.60s'", message)
+        
+        return messages
+    
+    def _completion_kwargs(self, messages):
+        """Completion parameters shared by the blocking and streaming calls"""
+        return {
+            "messages": messages,
+            "model": self.model,
+            "temperature": 0.7,
+            "max_completion_tokens": 500,
+            "top_p": 0.95
+        }
+    
+    @tracer.traced("azure_openai.generate_response")
+    def generate_response(self, message, system_prompt=None, context=None, deadline=None):
         """
         Generate a response using Azure OpenAI
         
@@ -67,6 +374,7 @@ class AzureOpenAIService:
             message: User message
             system_prompt: Not used directly due to model limitations, but kept for API compatibility
             context: Optional conversation context (list of previous messages)
+            deadline: Optional utils.deadline.Deadline; attempts and retries stop when it runs out
             
         Returns:
             Response text or None if an error occurs
@@ -76,61 +384,215 @@ class AzureOpenAIService:
             return None
         
         try:
-            # Create messages array
-            messages = []
-            
-            # Add instruction as the first user message if no context
-            if not context or len(context) == 0:
-                messages.append({
-                    "role": "user",
-                    "content": self._get_instruction_prompt()
-                })
-                
-                # Add assistant acknowledgment
-                messages.append({
-                    "role": "assistant",
-                    "content": "I understand. I will answer questions about Hassane's portfolio professionally. Here's how I'll format my responses:\n\n### Key Information\n- **Skills** and technical expertise\n- *Projects* and achievements\n- Educational background\n- Contact details\n\nI can provide code examples like:\n```python\ndef example():\n    return \"Clear explanations\"\n```\n\nAnd link to resources when relevant. Let me know what you'd like to learn about!"
-                })
-            
-            # Add conversation context if provided
-            elif context and isinstance(context, list):
-                # Filter out invalid messages and ensure content is present
-                filtered_context = [
-                    msg for msg in context
-                    if msg.get("role") != "system"
-                    and msg.get("content") is not None
-                    and isinstance(msg.get("content"), str)
-                ]
-                messages.extend(filtered_context)
-            
-            # Add the user message
-            messages.append({
-                "role": "user",
-                "content": message
-            })
+            messages = self._build_messages(message, context)
+            
+            # Generate completion
+            with AZURE_SECONDS.time():
+                response = self._call_with_retries(self.client.chat.completions.create, deadline, **self._completion_kwargs(messages))
+            self._record_usage(getattr(response, "usage", None))
+            
+            # Extract response text
+            response_text = response.choices[0].message.content
+            logger.info("Response generated successfully (%d chars)", len(response_text))
+            
+            return response_text
+            
+        except CircuitOpenError:
+            logger.warning("Azure OpenAI circuit breaker is open, skipping the call")
+            return None
+        except Exception as e:
+            logger.error(f"Error generating response from Azure OpenAI: {str(e)}")
+            return self.ERROR_RESPONSE
+    
+    def _close_stream(self, stream):
+        """Close a completion stream and its HTTP response"""
+        try:
+            close = getattr(stream, "close", None) or stream.response.close
+            close()
+        except Exception as e:
+            logger.warning(f"Error closing Azure OpenAI stream: {str(e)}")
+    
+    def generate_response_stream(self, message, system_prompt=None, context=None, deadline=None):
+        """
+        Generate a response using Azure OpenAI, yielding text as it arrives
+        
+        Args:
+            message: User message
+            system_prompt: Not used directly due to model limitations, but kept for API compatibility
+            context: Optional conversation context (list of previous messages)
+            deadline: Optional utils.deadline.Deadline bounding the time to open the stream
+            
+        Yields:
+            Response text chunks; exceptions from the API are raised to the caller
+        """
+        if not self.client:
+            logger.error("Cannot generate response: Azure OpenAI client not initialized")
+            return
+        
+        messages = self._build_messages(message, context)
+        # Only opening the stream is retried; once text has been yielded it cannot be replayed
+        started = time.perf_counter()
+        stream = self._call_with_retries(self.client.chat.completions.create, deadline, stream=True, **self._completion_kwargs(messages))
+        
+        total_chars = 0
+        try:
+            for chunk in stream:
+                # Only sent by deployments that report usage on streams (in the last chunk, without choices)
+                self._record_usage(getattr(chunk, "usage", None))
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    total_chars += len(delta)
+                    yield delta
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+        finally:
+            # Also runs when the consumer stops early, ending generation upstream
+            self._close_stream(stream)
+            AZURE_STREAM_SECONDS.observe(time.perf_counter() - started)
+        
+        logger.info("Streamed response generated successfully (%d chars)", total_chars)
+
+class AsyncAzureOpenAIService(AzureOpenAIService):
+    """Azure OpenAI service built on AsyncOpenAI for the asyncio serving mode"""
+    
+    def _create_client(self):
+        """Create the AsyncOpenAI client on a pooled keep-alive connection pool"""
+        import httpx
+        from openai import AsyncOpenAI
+        
+        settings = self._http_settings()
+        return AsyncOpenAI(
+            base_url=self.base_url,
+            api_key=self.api_key,
+            max_retries=0,
+            timeout=settings["timeout"],
+            http_client=httpx.AsyncClient(**settings)
+        )
+    
+    async def _call_with_retries(self, func, request_deadline=None, **kwargs):
+        """Async counterpart of AzureOpenAIService._call_with_retries"""
+        deadline = self._call_deadline(request_deadline)
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError("Azure OpenAI circuit breaker is open")
+            attempt += 1
+            start = time.monotonic()
+            try:
+                result = await func(timeout=self._attempt_timeout(deadline), **kwargs)
+            except Exception as e:
+                if self._is_upstream_failure(e):
+                    self.circuit_breaker.record_failure()
+                else:
+                    # The service answered (e.g. a 400); the request was wrong, not the upstream
+                    self.circuit_breaker.record_success()
+                delay = self._next_delay(attempt, deadline) if self._is_retryable(e) else None
+                if delay is None:
+                    raise
+                logger.warning(f"Azure OpenAI attempt {attempt} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled (asyncio.CancelledError) or interrupted: no outcome to report,
+                # but a half-open trial slot must not stay taken
+                self.circuit_breaker.release()
+                raise
+            self.circuit_breaker.record_success(time.monotonic() - start)
+            tracer.annotate(attempts=attempt)
+            return result
+    
+    @tracer.traced("azure_openai.generate_response")
+    async def generate_response(self, message, system_prompt=None, context=None, deadline=None):
+        """
+        Generate a response using Azure OpenAI without blocking the event loop
+        
+        Args:
+            message: User message
+            system_prompt: Not used directly due to model limitations, but kept for API compatibility
+            context: Optional conversation context (list of previous messages)
+            deadline: Optional utils.deadline.Deadline; attempts and retries stop when it runs out
             
-            # Log the request (truncate long messages)
-            log_message = message[:60] + "..." if len(message) > 60 else message
-            logger.info(f"Sending request to Azure OpenAI: '{log_message}'")
+        Returns:
+            Response text or None if an error occurs
+        """
+        if not self.client:
+            logger.error("Cannot generate response: Azure OpenAI client not initialized")
+            return None
+        
+        try:
+            messages = self._build_messages(message, context)
             
             # Generate completion
-            response = self.client.chat.completions.create(
-                messages=messages,
-                model=self.model,
-                temperature=0.7,
-                max_completion_tokens=500,
-                top_p=0.95
-            )
+            with AZURE_SECONDS.time():
+                response = await self._call_with_retries(self.client.chat.completions.create, deadline, **self._completion_kwargs(messages))
+            self._record_usage(getattr(response, "usage", None))
             
             # Extract response text
             response_text = response.choices[0].message.content
-            logger.info(f"Response generated successfully ({len(response_text)} chars)")
+            logger.info("Response generated successfully (%d chars)", len(response_text))
             
             return response_text
             
+        except CircuitOpenError:
+            logger.warning("Azure OpenAI circuit breaker is open, skipping the call")
+            return None
         except Exception as e:
             logger.error(f"Error generating response from Azure OpenAI: {str(e)}")
-            return "I'm sorry, I'm having trouble connecting to my knowledge base right now. Please try asking in a different way or try again later."
+            return self.ERROR_RESPONSE
+    
+    async def _close_stream(self, stream):
+        """Close a completion stream and its HTTP response"""
+        try:
+            close = getattr(stream, "close", None) or stream.response.aclose
+            await close()
+        except Exception as e:
+            logger.warning(f"Error closing Azure OpenAI stream: {str(e)}")
+    
+    async def generate_response_stream(self, message, system_prompt=None, context=None, deadline=None):
+        """
+        Generate a response using Azure OpenAI, yielding text as it arrives
+        
+        Args:
+            message: User message
+            system_prompt: Not used directly due to model limitations, but kept for API compatibility
+            context: Optional conversation context (list of previous messages)
+            deadline: Optional utils.deadline.Deadline bounding the time to open the stream
+            
+        Yields:
+            Response text chunks; exceptions from the API are raised to the caller
+        """
+        if not self.client:
+            logger.error("Cannot generate response: Azure OpenAI client not initialized")
+            return
+        
+        messages = self._build_messages(message, context)
+        # Only opening the stream is retried; once text has been yielded it cannot be replayed
+        started = time.perf_counter()
+        stream = await self._call_with_retries(self.client.chat.completions.create, deadline, stream=True, **self._completion_kwargs(messages))
+        
+        total_chars = 0
+        try:
+            async for chunk in stream:
+                # Only sent by deployments that report usage on streams (in the last chunk, without choices)
+                self._record_usage(getattr(chunk, "usage", None))
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    total_chars += len(delta)
+                    yield delta
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+        finally:
+            # Also runs when the consumer stops early, ending generation upstream
+            await self._close_stream(stream)
+            AZURE_STREAM_SECONDS.observe(time.perf_counter() - started)
+        
+        logger.info("Streamed response generated successfully (%d chars)", total_chars)
 
 if __name__ == "__main__":
     azure_service = AzureOpenAIService()
@@ -0,0 +1,186 @@
+# circuit_breaker.py
+import time
+import threading
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing upstream until it has had time to recover
+
+    'closed': calls go through. Consecutive failures or slow calls beyond
+    the threshold open the circuit.
+    'open': calls are refused until reset_timeout has passed.
+    'half_open': a limited number of trial calls go through; a success
+    closes the circuit, a failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, slow_call_threshold=15.0, reset_timeout=30.0, half_open_max_calls=1):
+        """
+        Initialize the breaker
+
+        Args:
+            failure_threshold: Consecutive failed or slow calls that open the circuit; 0 disables the breaker
+            slow_call_threshold: Seconds after which a successful call still counts as a failure, None to ignore latency
+            reset_timeout: Seconds the circuit stays open before trial calls are allowed
+            half_open_max_calls: Trial calls allowed at once while half open
+        """
+        self.failure_threshold = max(0, int(failure_threshold))
+        self.slow_call_threshold = slow_call_threshold if slow_call_threshold else None
+        self.reset_timeout = float(reset_timeout)
+        self.half_open_max_calls = max(1, int(half_open_max_calls))
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._half_open_calls = 0
+
+        self.successes = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def enabled(self):
+        return self.failure_threshold > 0
+
+    def _refresh_state(self, now):
+        """Move from open to half open once the reset timeout has passed (lock held)"""
+        if self._state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+
+    def _open(self, now):
+        """Open the circuit (lock held)"""
+        if self._state != self.OPEN:
+            self.times_opened += 1
+        self._state = self.OPEN
+        self._opened_at = now
+        self._half_open_calls = 0
+
+    @property
+    def state(self):
+        """Current state: 'closed', 'open' or 'half_open'"""
+        with self._lock:
+            self._refresh_state(time.monotonic())
+            return self._state
+
+    @property
+    def is_open(self):
+        """Whether calls are currently refused outright"""
+        return self.state == self.OPEN
+
+    @property
+    def admits_calls(self):
+        """Whether allow_request would let a call through now (no trial slot is taken)"""
+        if not self.enabled:
+            return True
+        with self._lock:
+            self._refresh_state(time.monotonic())
+            if self._state == self.CLOSED:
+                return True
+            return self._state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls
+
+    def allow_request(self):
+        """
+        Ask to make a call
+
+        Returns:
+            True if the call may go ahead; the caller must then report it with
+            record_success or record_failure, or hand it back with release
+        """
+        if not self.enabled:
+            return True
+        with self._lock:
+            self._refresh_state(time.monotonic())
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, duration=None):
+        """
+        Report a completed call
+
+        Args:
+            duration: Seconds the call took; slow calls count towards opening the circuit
+        """
+        with self._lock:
+            now = time.monotonic()
+            if duration is not None and self.slow_call_threshold and duration >= self.slow_call_threshold:
+                self.slow_calls += 1
+                self._record_bad_call(now)
+                return
+            self.successes += 1
+            self._consecutive_failures = 0
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._half_open_calls = 0
+
+    def record_failure(self):
+        """Report a failed call"""
+        with self._lock:
+            self.failures += 1
+            self._record_bad_call(time.monotonic())
+
+    def release(self):
+        """
+        Hand back an allowed call that ended without an outcome (cancelled)
+
+        Frees its half-open trial slot without counting a success or a
+        failure, so the next call can try the upstream.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def _record_bad_call(self, now):
+        """Count a failed or slow call and open the circuit if needed (lock held)"""
+        self._consecutive_failures += 1
+        if not self.enabled:
+            return
+        if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._open(now)
+
+    def reset(self):
+        """Close the circuit and forget recent failures"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._half_open_calls = 0
+
+    def stats(self):
+        """
+        Get breaker state and counters
+
+        Returns:
+            dict with the state, configuration and call counters
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refresh_state(now)
+            retry_in = None
+            if self._state == self.OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (now - self._opened_at)), 3)
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "slow_call_threshold": self.slow_call_threshold,
+                "reset_timeout": self.reset_timeout,
+                "retry_in": retry_in,
+                "successes": self.successes,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened
+            }
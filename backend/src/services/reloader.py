@@ -0,0 +1,109 @@
+# reloader.py
+import os
+import sys
+import hashlib
+import threading
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger("reloader")
+
+
+def path_fingerprint(path):
+    """
+    Cheap change marker for a file or a directory
+
+    Args:
+        path: File, or directory whose direct children are considered
+
+    Returns:
+        Tuple of (name, size, mtime_ns) entries, empty when the path is missing
+    """
+    try:
+        if os.path.isdir(path):
+            entries = []
+            for entry in sorted(os.scandir(path), key=lambda item: item.name):
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((entry.name, stat.st_size, stat.st_mtime_ns))
+            return tuple(entries)
+        stat = os.stat(path)
+        return ((os.path.basename(path), stat.st_size, stat.st_mtime_ns),)
+    except OSError:
+        return ()
+
+
+def fingerprint_version(path):
+    """Short version string derived from path_fingerprint"""
+    return hashlib.sha256(repr(path_fingerprint(path)).encode("utf-8")).hexdigest()[:12]
+
+
+class ArtifactWatcher:
+    """
+    Polls the modification time and size of artifact paths and reports changes
+
+    A change is reported once the paths have stayed unchanged for a whole
+    polling interval, so a training run writing several files in a row
+    triggers one reload, after its last write. Polling is used instead of
+    inotify because it needs no extra dependency and works on every
+    platform and on network mounts.
+    """
+
+    def __init__(self, paths, on_change, interval=5.0):
+        """
+        Configure the watcher
+
+        Args:
+            paths: Files or directories to watch
+            on_change: Callable without arguments run in the watcher thread after a change
+            interval: Seconds between polls
+        """
+        self.paths = list(paths)
+        self.on_change = on_change
+        self.interval = max(0.1, float(interval))
+        self._stop = threading.Event()
+        self._thread = None
+        self.changes = 0
+
+    def _fingerprints(self):
+        return tuple(path_fingerprint(path) for path in self.paths)
+
+    def start(self):
+        """Start polling in a daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="artifact-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {', '.join(self.paths)} every {self.interval:.1f}s")
+
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+
+    def _run(self):
+        """Watcher loop: wait for a change, then for the paths to settle"""
+        current = self._fingerprints()
+        pending = None
+        while not self._stop.wait(self.interval):
+            observed = self._fingerprints()
+            if observed == current:
+                pending = None
+                continue
+            if observed != pending:
+                # Still being written; report it once it stops changing
+                pending = observed
+                continue
+
+            current, pending = observed, None
+            self.changes += 1
+            logger.info("Artifact change detected")
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.error(f"Error handling artifact change: {str(e)}")
@@ -0,0 +1,320 @@
+# response_cache.py
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import setup_logger
+from utils.cache import normalize_message
+
+# Set up logger
+logger = setup_logger("response_cache")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    prompt_version TEXT NOT NULL,
+    message TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (prompt_version, message)
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at);
+"""
+
+
+class PersistentResponseCache:
+    """
+    Azure answers stored in SQLite, shared by every worker process and kept across restarts
+
+    Entries are keyed by normalized message and prompt version, so changing
+    the instructions sent to Azure never serves answers written for the old
+    ones. The database runs in WAL mode: readers never block and writers
+    from several processes are serialized by SQLite's own locking.
+    """
+
+    def __init__(self, path, prompt_version, max_size=10000, ttl=86400.0, touch_interval=30.0, busy_timeout=5.0):
+        """
+        Open (and create if needed) the cache database
+
+        Args:
+            path: SQLite database file
+            prompt_version: Version of the prompt the stored answers were generated with
+            max_size: Maximum number of entries, least recently used evicted first; 0 disables the cache
+            ttl: Seconds an answer stays valid, None for no expiry
+            touch_interval: Minimum seconds between last-used updates of an entry (limits writes on hot keys)
+            busy_timeout: Seconds to wait for another process holding the write lock
+        """
+        self.path = path
+        self.prompt_version = prompt_version
+        self.max_size = max(0, int(max_size))
+        self.ttl = ttl if ttl else None
+        self.touch_interval = touch_interval
+        self.busy_timeout = busy_timeout
+
+        # sqlite3 connections must stay in the thread that created them
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self.evictions = 0
+        self.errors = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def after_fork(self):
+        """Forget connections inherited from the parent process (SQLite connections must not cross a fork)"""
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def _connection(self):
+        """Connection of the current thread in autocommit mode, opened on first use"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _transaction(self):
+        """Write transaction on the current thread's connection"""
+        return _Transaction(self._connection())
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, message):
+        """
+        Look up the stored answer for a message
+
+        Args:
+            message: User message (normalized here)
+
+        Returns:
+            Response text, or None on a miss, an expired entry or a database error
+        """
+        key = normalize_message(message)
+        if not self.enabled or not key:
+            return None
+        now = time.time()
+        try:
+            # Plain autocommit statements: the read never takes the write lock
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT response, last_used FROM responses "
+                "WHERE prompt_version = ? AND message = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (self.prompt_version, key, now)
+            ).fetchone()
+            if row and now - row[1] >= self.touch_interval:
+                connection.execute(
+                    "UPDATE responses SET last_used = ?, hits = hits + 1 WHERE prompt_version = ? AND message = ?",
+                    (now, self.prompt_version, key)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache read failed: {str(e)}")
+            self._count("errors")
+            return None
+
+        self._count("hits" if row else "misses")
+        return row[0] if row else None
+
+    def set(self, message, response):
+        """
+        Store an answer, evicting expired and least recently used entries beyond max_size
+
+        Args:
+            message: User message (normalized here)
+            response: Answer text
+        """
+        key = normalize_message(message)
+        if not self.enabled or not key or not response:
+            return
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        try:
+            with self._transaction() as connection:
+                connection.execute(
+                    "INSERT INTO responses (prompt_version, message, response, created_at, expires_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (prompt_version, message) DO UPDATE SET "
+                    "response = excluded.response, created_at = excluded.created_at, "
+                    "expires_at = excluded.expires_at, last_used = excluded.last_used",
+                    (self.prompt_version, key, response, now, expires_at, now)
+                )
+                evicted = self._evict(connection, now, self.max_size)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed: {str(e)}")
+            self._count("errors")
+            return
+        self._count("inserts")
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _evict(self, connection, now, max_size):
+        """Delete expired entries, then the least recently used ones beyond max_size"""
+        removed = connection.execute(
+            "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        excess = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - max_size
+        if excess > 0:
+            removed += connection.execute(
+                "DELETE FROM responses WHERE rowid IN "
+                "(SELECT rowid FROM responses ORDER BY last_used ASC LIMIT ?)",
+                (excess,)
+            ).rowcount
+        return removed
+
+    def prune(self, max_size=None, other_versions=False):
+        """
+        Remove expired entries and enforce a size cap
+
+        Args:
+            max_size: Size cap to enforce, defaults to the configured one
+            other_versions: Also remove entries written for another prompt version
+
+        Returns:
+            Number of removed entries
+        """
+        with self._transaction() as connection:
+            removed = 0
+            if other_versions:
+                removed += connection.execute(
+                    "DELETE FROM responses WHERE prompt_version != ?", (self.prompt_version,)
+                ).rowcount
+            removed += self._evict(connection, time.time(), self.max_size if max_size is None else max_size)
+        return removed
+
+    def delete(self, message):
+        """Remove the entry for a message; returns whether one existed"""
+        with self._transaction() as connection:
+            return connection.execute(
+                "DELETE FROM responses WHERE prompt_version = ? AND message = ?",
+                (self.prompt_version, normalize_message(message))
+            ).rowcount > 0
+
+    def clear(self):
+        """Remove every entry (all prompt versions)"""
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM responses")
+
+    def entries(self, limit=20):
+        """
+        Most recently used entries
+
+        Args:
+            limit: Maximum number of entries
+
+        Returns:
+            List of entry dicts
+        """
+        rows = self._connection().execute(
+            "SELECT prompt_version, message, response, created_at, expires_at, last_used, hits "
+            "FROM responses ORDER BY last_used DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        columns = ("prompt_version", "message", "response", "created_at", "expires_at", "last_used", "hits")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def stats(self):
+        """
+        Get cache metrics
+
+        Returns:
+            dict with this process's hit/miss counters and the shared database size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "path": self.path,
+                "prompt_version": self.prompt_version,
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "inserts": self.inserts,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+        try:
+            connection = self._connection()
+            stats["size"] = connection.execute(
+                "SELECT COUNT(*) FROM responses WHERE prompt_version = ?", (self.prompt_version,)
+            ).fetchone()[0]
+            stats["total_size"] = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache stats failed: {str(e)}")
+        return stats
+
+
+class _Transaction:
+    """Runs a block in one IMMEDIATE transaction (write lock taken up front, no upgrade deadlocks)"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    from config import get_config
+    from services.azure_service import AzureOpenAIService
+
+    app_config = get_config()
+    parser = argparse.ArgumentParser(description="Inspect and prune the persistent Azure response cache")
+    parser.add_argument('--path', default=app_config.RESPONSE_CACHE_PATH)
+    parser.add_argument('--prompt-version', default=None,
+                        help="Prompt version to operate on (default: the current prompt's version)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('stats', help="Show entry counts")
+    list_parser = subparsers.add_parser('list', help="Show the most recently used entries")
+    list_parser.add_argument('--limit', type=int, default=20)
+    prune_parser = subparsers.add_parser('prune', help="Remove expired entries and enforce the size cap")
+    prune_parser.add_argument('--max-size', type=int, default=None)
+    prune_parser.add_argument('--other-versions', action='store_true', help="Also remove entries of other prompt versions")
+    delete_parser = subparsers.add_parser('delete', help="Remove the entry for a message")
+    delete_parser.add_argument('message')
+    subparsers.add_parser('clear', help="Remove every entry")
+    args = parser.parse_args()
+
+    cache = PersistentResponseCache(
+        args.path,
+        args.prompt_version or app_config.RESPONSE_CACHE_PROMPT_VERSION or AzureOpenAIService(lazy=True).prompt_version,
+        max_size=app_config.RESPONSE_CACHE_SIZE,
+        ttl=app_config.RESPONSE_CACHE_TTL or None
+    )
+
+    if args.command == 'stats':
+        print(json.dumps(cache.stats(), indent=2))
+    elif args.command == 'list':
+        print(json.dumps(cache.entries(args.limit), indent=2, ensure_ascii=False))
+    elif args.command == 'prune':
+        print(f"Removed {cache.prune(max_size=args.max_size, other_versions=args.other_versions)} entries")
+    elif args.command == 'delete':
+        print("Deleted" if cache.delete(args.message) else "No entry for this message")
+    elif args.command == 'clear':
+        cache.clear()
+        print("Cache cleared")
@@ -1,27 +1,76 @@
 # src/services/response_manager.py
 import os
-import json
 import sys
+import time
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Dict, List
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.logger import setup_logger
-from services.azure_service import AzureOpenAIService
+from utils.startup import startup_report
+from utils.deadline import Deadline
+from utils.cache import normalize_message
+from utils.singleflight import SingleFlight
+from utils.intents_store import IntentsStore
+from utils.worker_pool import WorkerPool, PoolFullError
+from utils.thread_policy import ThreadPolicy
+from utils.metrics import MetricFamily, stage_seconds
+from utils.tracing import tracer
+from services.azure_service import AzureOpenAIService, CircuitOpenError
+from services.circuit_breaker import CircuitBreaker
+from services.semantic_cache import SemanticResponseCache
+from services.response_cache import PersistentResponseCache
+from services.speculation import DomainPrecheck, SpeculativeCall, SpeculationMetrics
+from services.warmup import CacheWarmup
+from services.reloader import ArtifactWatcher, fingerprint_version
 
 # Import the intent classifier
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src'))
 from prediction.intent_classifier import IntentClassifier
+from prediction.batch_scheduler import InferenceBatcher, BatcherClosedError
 
 # Set up logger
 logger = setup_logger("response_manager")
 
+# Stage timer of the intent -> response lookup, bound once for the hot path
+INTENT_LOOKUP_SECONDS = stage_seconds.labels("intent_lookup")
+
+# Everything a local answer depends on, swapped as one object on reload so a
+# request that has started keeps using the versions it began with
+ActiveComponents = namedtuple(
+    "ActiveComponents",
+    ["intents", "classifier", "batcher", "domain_precheck", "model_version", "loaded_at"]
+)
+
 class ResponseManager:
     """
     Manager for handling chat responses, coordinating between local model and Azure OpenAI
     """
     MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'models', 'chatbot_model_improved.h5')
-    def __init__(self, confidence_threshold=0.9, intents_path=None, model_path=MODEL_PATH):
+    STARTUP_MODES = ('eager', 'lazy', 'background', 'preload')
+    # Seconds the test prediction of a reload may take on the inference pool
+    VALIDATION_TIMEOUT = 30.0
+    
+    # Subclasses swap in a different client implementation (see AsyncResponseManager)
+    azure_service_class = AzureOpenAIService
+    single_flight_class = SingleFlight
+    
+    def __init__(self, confidence_threshold=0.9, intents_path=None, model_path=MODEL_PATH,
+                 batching=False, max_batch_size=32, max_wait_ms=5.0, inference_mode='compiled',
+                 startup_mode='eager', nltk_data_dir=None, use_model_path=None, offline=False,
+                 prediction_cache_size=1024, prediction_cache_ttl=None,
+                 semantic_cache_size=512, semantic_cache_ttl=3600.0, semantic_cache_threshold=0.92,
+                 azure_options=None, fallback_confidence=0.3, min_remote_seconds=1.0,
+                 speculative=False, speculation_max_coverage=0.5, speculation_workers=4,
+                 single_flight=True, single_flight_timeout=30.0,
+                 response_cache_path=None, response_cache_size=10000, response_cache_ttl=86400.0,
+                 prompt_version=None, warmup_traffic_path=None, warmup_top_n=200, warmup_prefill=False,
+                 warmup_azure_rate=1.0, hot_reload=False, hot_reload_interval=5.0,
+                 inference_workers=1, azure_io_workers=8, azure_io_max_queue=0, thread_policy=None):
         """
         Initialize the response manager
         
@@ -29,131 +78,932 @@ class ResponseManager:
             confidence_threshold: Threshold for using Azure OpenAI (default: 0.7)
             intents_path: Path to the intents.json file
             model_path: Path to the trained model file
+            batching: Whether concurrent classifications are micro-batched
+            max_batch_size: Maximum messages per batched forward pass
+            max_wait_ms: Maximum time a queued message waits for a batch to fill
+            inference_mode: 'compiled' or 'predict', see IntentClassifier
+            startup_mode: 'eager' loads the classifier and Azure client now, 'lazy' on
+                the first request, 'background' in a loader thread started now,
+                'preload' loads fork-safe models now and leaves everything else to
+                after_fork in each worker (see gunicorn.conf.py)
+            nltk_data_dir: Local nltk_data directory for the classifier
+            use_model_path: Local Universal Sentence Encoder SavedModel directory
+            offline: Never download artifacts during initialization
+            prediction_cache_size: Maximum cached intent predictions (0 disables)
+            prediction_cache_ttl: Seconds a cached prediction stays valid, None for no expiry
+            semantic_cache_size: Maximum Azure answers kept in the semantic cache (0 disables)
+            semantic_cache_ttl: Seconds a cached Azure answer stays valid, None for no expiry
+            semantic_cache_threshold: Minimum cosine similarity to reuse a cached answer
+            azure_options: Keyword arguments for the Azure service (timeouts, pool, retries, circuit_breaker)
+            fallback_confidence: Minimum confidence to answer locally when Azure cannot be used
+            min_remote_seconds: Least time left on a request deadline for which an Azure call is started
+            speculative: Start the Azure call alongside classification for probably out-of-domain messages
+            speculation_max_coverage: Share of known words at or below which a message is flagged
+            speculation_workers: Threads running speculative Azure calls
+            single_flight: Merge concurrent identical history-free Azure requests into one call
+            single_flight_timeout: Seconds a merged request waits for the shared call
+            response_cache_path: SQLite file of the persistent response cache shared by all workers, None disables it
+            response_cache_size: Maximum entries in the persistent response cache (0 disables)
+            response_cache_ttl: Seconds a persisted answer stays valid, None for no expiry
+            prompt_version: Version stored with persisted answers, defaults to a hash of the Azure prompt
+            warmup_traffic_path: JSONL file of past chat traffic to warm up from, None to skip the warm-up
+            warmup_top_n: Number of most frequent questions warmed up
+            warmup_prefill: Pre-fill the persistent response cache with Azure answers during warm-up
+            warmup_azure_rate: Maximum Azure calls per second of the warm-up pre-fill
+            hot_reload: Watch the intents file and the model directory and reload them on change
+            hot_reload_interval: Seconds between checks of the watched files
+            inference_workers: Threads running local inference (1 serializes keras predict)
+            azure_io_workers: Threads waiting on Azure calls, the cap on concurrent calls
+            azure_io_max_queue: Azure calls allowed to wait for a thread before answering
+                locally instead, 0 for no limit
+            thread_policy: utils.thread_policy.ThreadPolicy applied before the classifier loads
         """
         self.confidence_threshold = confidence_threshold
+        self.fallback_confidence = fallback_confidence
+        self.min_remote_seconds = min_remote_seconds
         self.intents_path = intents_path or os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'intents.json')
         
-        # Load intents data
+        if startup_mode not in self.STARTUP_MODES:
+            logger.warning(f"Unknown startup mode '{startup_mode}', using 'eager'")
+            startup_mode = 'eager'
+        self.startup_mode = startup_mode
+        
+        # Load intents data once; the store is shared with the classifier and the routes
         try:
-            with open(self.intents_path, 'r', encoding='utf-8') as file:
-                self.intents_data = json.load(file)
-            logger.info(f"Loaded intents from {self.intents_path}")
+            with startup_report.phase("intents"):
+                intents = IntentsStore.from_file(self.intents_path)
+            logger.info(f"Loaded {len(intents)} intents from {self.intents_path}")
         except Exception as e:
             logger.error(f"Error loading intents file: {str(e)}")
-            self.intents_data = {"intents": []}
+            intents = IntentsStore.empty()
         
-        # Initialize intent classifier
-        try:
-            self.intent_classifier = IntentClassifier(
-                model_path=model_path,
-                threshold=confidence_threshold
+        # Heavy components are built by _load_components according to startup_mode
+        self._classifier_kwargs = {
+            "model_path": model_path,
+            "threshold": confidence_threshold,
+            "inference_mode": inference_mode,
+            "nltk_data_dir": nltk_data_dir,
+            "use_model_path": use_model_path,
+            "offline": offline,
+            "cache_size": prediction_cache_size,
+            "cache_ttl": prediction_cache_ttl,
+            "thread_policy": thread_policy
+        }
+        self._batching_kwargs = {
+            "max_batch_size": max_batch_size,
+            "max_wait_ms": max_wait_ms
+        } if batching else None
+        self._components_ready = threading.Event()
+        self._load_lock = threading.Lock()
+        
+        # Local inference and Azure waits run on separate pools, so a surge of
+        # Azure traffic never holds the threads fast local answers need
+        self.inference_pool = WorkerPool("inference", inference_workers)
+        self.io_pool = WorkerPool("azure-io", azure_io_workers, max_queue=azure_io_max_queue)
+        self._reload_lock = threading.Lock()
+        self.last_reload = None
+        
+        # Initialize Azure OpenAI service
+        self.azure_service = self.azure_service_class(lazy=startup_mode != 'eager', **(azure_options or {}))
+        self.speculation_workers = max(1, int(speculation_workers))
+        
+        # Speculative Azure calls for messages that look out-of-domain
+        self.speculation_metrics = SpeculationMetrics()
+        self.speculation_max_coverage = speculation_max_coverage
+        self.components = ActiveComponents(
+            intents=intents,
+            classifier=None,
+            batcher=None,
+            domain_precheck=DomainPrecheck(intents, max_coverage=speculation_max_coverage) if speculative else None,
+            model_version=None,
+            loaded_at=time.time()
+        )
+        self._speculation_executor = ThreadPoolExecutor(
+            max_workers=self.speculation_workers,
+            thread_name_prefix="speculative-azure"
+        ) if speculative else None
+        
+        # Azure answers kept on disk, shared across workers and restarts
+        self.response_cache = None
+        if response_cache_path and response_cache_size > 0:
+            try:
+                with startup_report.phase("response cache"):
+                    self.response_cache = PersistentResponseCache(
+                        response_cache_path,
+                        prompt_version or self.azure_service.prompt_version,
+                        max_size=response_cache_size,
+                        ttl=response_cache_ttl
+                    )
+                logger.info(f"Persistent response cache at {response_cache_path}")
+            except Exception as e:
+                logger.error(f"Error opening persistent response cache: {str(e)}")
+        
+        # One upstream call for identical questions asked at the same time
+        self.single_flight = self.single_flight_class() if single_flight else None
+        self.single_flight_timeout = single_flight_timeout
+        
+        # Reuse Azure answers for near-identical questions
+        self.semantic_cache = SemanticResponseCache(
+            max_size=semantic_cache_size,
+            ttl=semantic_cache_ttl,
+            threshold=semantic_cache_threshold
+        )
+        
+        if startup_mode == 'eager':
+            self._load_components()
+        elif startup_mode == 'background':
+            threading.Thread(target=self._background_load, name="component-loader", daemon=True).start()
+        elif startup_mode == 'preload':
+            # Loaded once before the fork, numpy weights are shared copy-on-write by every worker;
+            # the TF runtime is not fork-safe, so TF-backed models are loaded by each worker instead
+            if IntentClassifier.needs_tensorflow(model_path):
+                logger.info("Model needs tensorflow, each worker loads it after the fork")
+            else:
+                self._load_components()
+        
+        # Classify the most frequent past questions (and optionally pre-fill the response cache) in the background
+        self.warmup = None
+        if warmup_traffic_path:
+            self.warmup = CacheWarmup(
+                warmup_traffic_path,
+                classify=self._warmup_classify,
+                top_n=warmup_top_n,
+                # A separate synchronous client and circuit breaker: the offline pass never trips live traffic
+                azure_service=AzureOpenAIService(
+                    lazy=True,
+                    **{key: value for key, value in (azure_options or {}).items() if key != "circuit_breaker"}
+                ) if warmup_prefill else None,
+                response_cache=self.response_cache,
+                azure_rate=warmup_azure_rate
+            )
+            # A preloading parent never serves: each worker runs its own pass after the fork
+            if startup_mode != 'preload':
+                self.warmup.start()
+        
+        # Reload intents and model in the background when their files change
+        self.watcher = None
+        if hot_reload:
+            self.watcher = ArtifactWatcher(
+                [self.intents_path, self._model_dir],
+                on_change=self.reload,
+                interval=hot_reload_interval
+            )
+            if startup_mode != 'preload':
+                self.watcher.start()
+        
+    @classmethod
+    def from_config(cls, app_config, **overrides):
+        """
+        Build a manager from a config.Config class
+        
+        Args:
+            app_config: Configuration class (see config.get_config)
+            overrides: Keyword arguments taking precedence over the config
+            
+        Returns:
+            Manager instance
+        """
+        kwargs = {
+            "model_path": app_config.MODEL_PATH,
+            "batching": app_config.INFERENCE_BATCHING,
+            "max_batch_size": app_config.INFERENCE_MAX_BATCH_SIZE,
+            "max_wait_ms": app_config.INFERENCE_MAX_WAIT_MS,
+            "inference_mode": app_config.INFERENCE_MODE,
+            "startup_mode": app_config.STARTUP_MODE,
+            "nltk_data_dir": app_config.NLTK_DATA_DIR,
+            "use_model_path": app_config.USE_MODEL_PATH,
+            "offline": app_config.OFFLINE_ARTIFACTS,
+            "prediction_cache_size": app_config.PREDICTION_CACHE_SIZE,
+            "prediction_cache_ttl": app_config.PREDICTION_CACHE_TTL or None,
+            "semantic_cache_size": app_config.SEMANTIC_CACHE_SIZE,
+            "semantic_cache_ttl": app_config.SEMANTIC_CACHE_TTL or None,
+            "semantic_cache_threshold": app_config.SEMANTIC_CACHE_THRESHOLD,
+            "azure_options": {
+                "connect_timeout": app_config.AZURE_CONNECT_TIMEOUT,
+                "read_timeout": app_config.AZURE_READ_TIMEOUT,
+                "max_connections": app_config.AZURE_MAX_CONNECTIONS,
+                "max_keepalive_connections": app_config.AZURE_MAX_KEEPALIVE_CONNECTIONS,
+                "keepalive_expiry": app_config.AZURE_KEEPALIVE_EXPIRY,
+                "max_retries": app_config.AZURE_MAX_RETRIES,
+                "retry_backoff": app_config.AZURE_RETRY_BACKOFF,
+                "retry_backoff_max": app_config.AZURE_RETRY_BACKOFF_MAX,
+                "retry_budget": app_config.AZURE_RETRY_BUDGET or None,
+                "circuit_breaker": CircuitBreaker(
+                    failure_threshold=app_config.CIRCUIT_FAILURE_THRESHOLD,
+                    slow_call_threshold=app_config.CIRCUIT_SLOW_CALL_SECONDS or None,
+                    reset_timeout=app_config.CIRCUIT_RESET_TIMEOUT
+                )
+            },
+            "fallback_confidence": app_config.CIRCUIT_FALLBACK_MIN_CONFIDENCE,
+            "min_remote_seconds": app_config.REQUEST_MIN_REMOTE_SECONDS,
+            "speculative": app_config.SPECULATIVE_AZURE,
+            "speculation_max_coverage": app_config.SPECULATION_MAX_COVERAGE,
+            "speculation_workers": app_config.SPECULATION_WORKERS,
+            "single_flight": app_config.SINGLE_FLIGHT,
+            "single_flight_timeout": app_config.SINGLE_FLIGHT_TIMEOUT or None,
+            "response_cache_path": app_config.RESPONSE_CACHE_PATH,
+            "response_cache_size": app_config.RESPONSE_CACHE_SIZE,
+            "response_cache_ttl": app_config.RESPONSE_CACHE_TTL or None,
+            "prompt_version": app_config.RESPONSE_CACHE_PROMPT_VERSION or None,
+            "warmup_traffic_path": app_config.WARMUP_TRAFFIC_PATH or None,
+            "warmup_top_n": app_config.WARMUP_TOP_N,
+            "warmup_prefill": app_config.WARMUP_PREFILL_AZURE,
+            "warmup_azure_rate": app_config.WARMUP_AZURE_RATE,
+            "hot_reload": app_config.HOT_RELOAD,
+            "hot_reload_interval": app_config.HOT_RELOAD_INTERVAL,
+            "inference_workers": app_config.INFERENCE_WORKERS,
+            "azure_io_workers": app_config.AZURE_IO_WORKERS,
+            "azure_io_max_queue": app_config.AZURE_IO_MAX_QUEUE,
+            "thread_policy": ThreadPolicy.from_config(app_config)
+        }
+        kwargs.update(overrides)
+        return cls(**kwargs)
+    
+    @property
+    def ready(self) -> bool:
+        """Whether the classifier has finished loading and the warm-up, if any, has finished (successfully or not)"""
+        return self._components_ready.is_set() and (self.warmup is None or self.warmup.done)
+    
+    @property
+    def intents(self) -> IntentsStore:
+        """Active intents store"""
+        return self.components.intents
+    
+    @property
+    def intent_classifier(self):
+        """Active intent classifier, None until loaded or if loading failed"""
+        return self.components.classifier
+    
+    @property
+    def batcher(self):
+        """Active micro-batcher, None when batching is disabled"""
+        return self.components.batcher
+    
+    @property
+    def domain_precheck(self):
+        """Active speculation pre-check, None when speculation is disabled"""
+        return self.components.domain_precheck
+    
+    @property
+    def _model_dir(self) -> str:
+        """Directory holding the model and its metadata files"""
+        return os.path.dirname(os.path.abspath(self._classifier_kwargs["model_path"] or self.MODEL_PATH))
+    
+    def _load_components(self):
+        """Build the intent classifier, the batcher and the Azure client once"""
+        with self._load_lock:
+            if self._components_ready.is_set():
+                return
+            
+            model_version = fingerprint_version(self._model_dir)
+            
+            # Initialize intent classifier
+            try:
+                with startup_report.phase("intent classifier"):
+                    classifier = IntentClassifier(intents=self.intents, **self._classifier_kwargs)
+                logger.info("Intent classifier initialized successfully")
+            except Exception as e:
+                logger.error(f"Error initializing intent classifier: {str(e)}")
+                classifier = None
+            
+            # Queue concurrent classifications into shared forward passes if enabled
+            batcher = None
+            if self._batching_kwargs and classifier:
+                batcher = InferenceBatcher(classifier, **self._batching_kwargs)
+            
+            self.components = self.components._replace(
+                classifier=classifier,
+                batcher=batcher,
+                model_version=model_version if classifier else None,
+                loaded_at=time.time()
             )
-            logger.info("Intent classifier initialized successfully")
+            self._components_ready.set()
+    
+    def after_fork(self):
+        """
+        Re-create per-process state in a worker forked from a preloading parent
+        
+        Only threads that called fork survive it, so locks, pools and queues
+        inherited from the parent are replaced, and connections (the Azure
+        HTTP client, SQLite) are reopened by this process on first use.
+        Loaded weights are kept: they stay shared with the parent until written.
+        """
+        self._load_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        
+        self.inference_pool.after_fork()
+        self.io_pool.after_fork()
+        self.azure_service.after_fork()
+        if self.response_cache:
+            self.response_cache.after_fork()
+        if self.single_flight:
+            self.single_flight = self.single_flight_class()
+        if self._speculation_executor:
+            self._speculation_executor = ThreadPoolExecutor(
+                max_workers=self.speculation_workers,
+                thread_name_prefix="speculative-azure"
+            )
+        if self.batcher:
+            self.batcher.after_fork()
+        
+        # Models the parent could not load safely (tensorflow) are loaded here
+        if not self._components_ready.is_set():
+            self._load_components()
+        
+        if self.warmup and self.warmup.status == "pending":
+            if self.warmup.azure_service:
+                self.warmup.azure_service.after_fork()
+            self.warmup.start()
+        if self.watcher:
+            self.watcher.start()
+        logger.info(f"Worker {os.getpid()} ready after fork")
+    
+    def pool_stats(self) -> Dict:
+        """
+        Queue depth and wait metrics of the worker pools
+        
+        Returns:
+            dict of pool name -> WorkerPool.stats()
+        """
+        return {
+            "inference": self.inference_pool.stats(),
+            "azure_io": self.io_pool.stats()
+        }
+    
+    def metric_families(self) -> List[MetricFamily]:
+        """
+        Cache and pool metrics read from their own counters at scrape time
+        
+        Returns:
+            List of utils.metrics.MetricFamily for MetricsRegistry.render
+        """
+        caches = {"semantic": self.semantic_cache.stats()}
+        classifier = self.intent_classifier
+        if classifier is not None:
+            caches["prediction"] = classifier.prediction_cache.stats()
+        if self.response_cache:
+            caches["response"] = self.response_cache.stats()
+        pools = self.pool_stats()
+        
+        return [
+            MetricFamily("chatbot_cache_hits_total", "counter", "Cache lookups answered from the cache",
+                         [({"cache": name}, stats["hits"]) for name, stats in caches.items()]),
+            MetricFamily("chatbot_cache_misses_total", "counter", "Cache lookups that missed",
+                         [({"cache": name}, stats["misses"]) for name, stats in caches.items()]),
+            MetricFamily("chatbot_cache_hit_ratio", "gauge", "Hits over lookups since the process started",
+                         [({"cache": name}, stats["hit_ratio"]) for name, stats in caches.items()]),
+            MetricFamily("chatbot_pool_queue_depth", "gauge", "Tasks waiting for a worker pool thread",
+                         [({"pool": name}, stats["queue_depth"]) for name, stats in pools.items()]),
+            MetricFamily("chatbot_pool_active", "gauge", "Tasks running on a worker pool",
+                         [({"pool": name}, stats["active"]) for name, stats in pools.items()])
+        ]
+    
+    def versions(self) -> Dict:
+        """
+        Versions of the active intents and model
+        
+        Returns:
+            dict with the intents content hash, the model directory fingerprint,
+            the time they were activated and the outcome of the last reload
+        """
+        components = self.components
+        return {
+            "intents": components.intents.version,
+            "intent_count": len(components.intents),
+            "model": components.model_version,
+            "classes": len(components.classifier.classes) if components.classifier else 0,
+            "bundle": getattr(components.classifier, "bundle_version", None),
+            "loaded_at": components.loaded_at,
+            "last_reload": self.last_reload
+        }
+    
+    def reload(self, force: bool = False) -> Dict:
+        """
+        Load changed intents and model files and swap them in atomically
+        
+        The new versions are built and validated while requests keep being
+        served by the active ones; requests already running finish on the
+        versions they started with. A failed load or validation keeps the
+        active versions.
+        
+        Args:
+            force: Reload both even if their files look unchanged
+            
+        Returns:
+            dict with the reload status ('reloaded', 'unchanged', 'failed' or
+            'in_progress'), what changed and the active versions
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return {"status": "in_progress", "versions": self.versions()}
+        
+        started = time.perf_counter()
+        result = {"status": "unchanged", "intents_changed": False, "model_changed": False}
+        try:
+            self._ensure_components()
+            current = self.components
+            
+            intents = IntentsStore.from_file(self.intents_path)
+            model_version = fingerprint_version(self._model_dir)
+            intents_changed = force or intents.version != current.intents.version
+            model_changed = force or current.classifier is None or model_version != current.model_version
+            result.update(intents_changed=intents_changed, model_changed=model_changed)
+            
+            if intents_changed or model_changed:
+                if not intents_changed:
+                    intents = current.intents
+                
+                if model_changed:
+                    logger.info(f"Loading model from {self._model_dir} for reload")
+                    classifier = IntentClassifier(intents=intents, **self._classifier_kwargs)
+                else:
+                    classifier = current.classifier
+                self._validate_components(intents, classifier)
+                
+                if model_changed and self._batching_kwargs:
+                    batcher = InferenceBatcher(classifier, **self._batching_kwargs)
+                else:
+                    batcher = current.batcher
+                if current.domain_precheck and intents_changed:
+                    domain_precheck = DomainPrecheck(intents, max_coverage=self.speculation_max_coverage)
+                else:
+                    domain_precheck = current.domain_precheck
+                
+                # One assignment: each request sees either the old or the new set, never a mix
+                with self._load_lock:
+                    classifier.intents = intents
+                    self.components = ActiveComponents(
+                        intents=intents,
+                        classifier=classifier,
+                        batcher=batcher,
+                        domain_precheck=domain_precheck,
+                        model_version=model_version,
+                        loaded_at=time.time()
+                    )
+                
+                if model_changed:
+                    # Queued messages are still flushed to the old model before its worker stops
+                    if current.batcher and current.batcher is not batcher:
+                        current.batcher.shutdown()
+                    # Embeddings of the old model are not comparable with the new one
+                    self.semantic_cache.clear()
+                result["status"] = "reloaded"
+                logger.info(f"Reloaded (intents: {intents_changed}, model: {model_changed}), "
+                            f"intents {intents.version}, model {model_version}")
         except Exception as e:
-            logger.error(f"Error initializing intent classifier: {str(e)}")
-            self.intent_classifier = None
+            logger.error(f"Reload failed, keeping the active versions: {str(e)}")
+            result.update(status="failed", error=str(e))
+        finally:
+            self._reload_lock.release()
         
-        # Initialize Azure OpenAI service
-        self.azure_service = AzureOpenAIService()
+        result["duration"] = round(time.perf_counter() - started, 3)
+        result["finished_at"] = time.time()
+        self.last_reload = result
+        return dict(result, versions=self.versions())
+    
+    def _validate_components(self, intents: IntentsStore, classifier):
+        """
+        Check that a classifier and an intents store can serve together
         
+        Args:
+            intents: Candidate intents store
+            classifier: Candidate IntentClassifier
+            
+        Raises:
+            ValueError: if the intents are empty, the model predicts a tag the
+                intents cannot answer or a test prediction fails
+        """
+        if not len(intents):
+            raise ValueError("The intents file has no intents")
+        missing = [tag for tag in classifier.classes if tag not in intents]
+        if missing:
+            raise ValueError(f"Model classes without intent: {', '.join(map(str, missing[:10]))}")
+        unused = [tag for tag in intents.tags if tag not in set(classifier.classes)]
+        if unused:
+            logger.warning(f"Intents not predicted by the model: {', '.join(unused[:10])}")
+        
+        sample = next((intent.patterns[0] for intent in intents if intent.patterns), "hello")
+        # On the inference pool like any other prediction, never alongside it on this thread
+        prediction = self.inference_pool.run(classifier.predict_intent, sample, timeout=self.VALIDATION_TIMEOUT)
+        if prediction.get("intent") == "unknown" and not prediction.get("confidence"):
+            raise ValueError("Test prediction with the new model failed")
+    
+    def _background_load(self):
+        """Loader thread target: components first, then warm the Azure client off the request path"""
+        self._load_components()
+        self.azure_service.client
+    
+    def _ensure_components(self):
+        """Block until the components are loaded, loading them now if lazy"""
+        if not self._components_ready.is_set():
+            self._load_components()
     
-    def get_response(self, message: str, conversation_history=None) -> Dict:
+    def _warmup_classify(self, message: str):
+        """Warm-up classification: local result dict or None when the message would go to Azure"""
+        self._ensure_components()
+        return self._classify_locally(message)
+    
+    @tracer.traced("response_manager.get_response")
+    def get_response(self, message: str, conversation_history=None, deadline=None) -> Dict:
         """
         Get a response based on the user message
         
         Args:
             message: User message
             conversation_history: List of previous messages in the conversation
+            deadline: Optional utils.deadline.Deadline of the request; no Azure call is
+                started without min_remote_seconds left, the best local answer is used instead
             
         Returns:
             Dict containing response and metadata
         """
         if not message:
-            return {
-                "response": "I didn't receive a message. How can I help you?",
-                "source": "default",
-                "confidence": 0.0,
-                "intent": None
-            }
+            return self._empty_message_result()
         
         # Initialize conversation history if not provided
         if conversation_history is None:
             conversation_history = []
         
+        deadline = deadline or Deadline()
+        self._ensure_components()
+        
         try:
-            # First, try to classify the intent using our local model
-            if self.intent_classifier:
-                logger.info(f"Classifying intent for message: {message[:50]}...")
-                intent_data = self.intent_classifier.predict_intent(message)
-                
-                # If confidence is above threshold, use local response
-                if intent_data and intent_data["confidence"] >= self.confidence_threshold:
-                    logger.info(f"Using local response for intent: {intent_data['intent']} (confidence: {intent_data['confidence']:.4f})")
-                    
-                    # Get response from intents data
-                    response = self._get_local_response(intent_data["intent"])
-                    
-                    return {
-                        "response": response,
-                        "source": "local",
-                        "confidence": intent_data["confidence"],
-                        "intent": intent_data["intent"]
-                    }
-                else:
-                    # Intent confidence below threshold, use Azure
-                    logger.info(f"Local confidence ({intent_data['confidence']:.4f}) below threshold ({self.confidence_threshold}), using Azure OpenAI")
-            else:
-                logger.warning("Intent classifier not available, defaulting to Azure OpenAI")
+            if deadline.expired:
+                logger.warning(f"Request deadline exceeded before classification ({deadline.elapsed():.3f}s)")
+                return self._azure_failure_result()
+            
+            # Probably out-of-domain: ask Azure while classifying instead of after
+            if self._should_speculate(message, deadline):
+                return self._get_speculative_response(message, conversation_history, deadline)
+            
+            # First, try to answer with our local model
+            local_result = self._classify_locally(message, deadline)
+            if local_result:
+                return local_result
             
             # Use Azure OpenAI for response
-            return self._get_azure_response(message, conversation_history)
+            return self._get_azure_response(message, conversation_history, deadline)
             
         except Exception as e:
             logger.error(f"Error getting response: {str(e)}")
             # Fallback to Azure in case of any error
             try:
-                return self._get_azure_response(message, conversation_history)
+                return self._get_azure_response(message, conversation_history, deadline)
             except Exception as e2:
                 logger.error(f"Error getting Azure fallback response: {str(e2)}")
-                return {
-                    "response": "I'm sorry, I encountered an issue processing your request. Please try again.",
-                    "source": "error",
-                    "confidence": 0.0,
-                    "intent": None
+                return self._error_result()
+    
+    def stream_response(self, message: str, conversation_history=None, deadline=None):
+        """
+        Get a response as a sequence of events for streaming to the client
+        
+        Args:
+            message: User message
+            conversation_history: List of previous messages in the conversation
+            deadline: Optional utils.deadline.Deadline bounding the time to the first token
+            
+        Yields:
+            (event, payload) tuples: a single 'message' event for complete answers
+            (local intents, cache hits, fallbacks) or 'token' events as Azure
+            generates text, always followed by a 'done' event with the metadata
+        """
+        if not message:
+            yield from self._result_events(self._empty_message_result())
+            return
+        
+        deadline = deadline or Deadline()
+        self._ensure_components()
+        
+        if deadline.expired:
+            logger.warning(f"Request deadline exceeded before classification ({deadline.elapsed():.3f}s)")
+            yield from self._result_events(self._azure_failure_result())
+            return
+        
+        try:
+            local_result = self._classify_locally(message, deadline)
+        except Exception as e:
+            logger.error(f"Error classifying message for stream: {str(e)}")
+            local_result = None
+        
+        if local_result:
+            yield from self._result_events(local_result)
+            return
+        
+        formatted_history = self._format_conversation_history(conversation_history or [])
+        cached_result, embedding = self._lookup_cached_response(message, formatted_history)
+        if cached_result:
+            yield from self._result_events(cached_result)
+            return
+        
+        skip_reason = self._remote_skip_reason(deadline)
+        if skip_reason:
+            yield from self._result_events(self._local_fallback_result(message, skip_reason, deadline))
+            return
+        
+        if not self.azure_service.client:
+            logger.error("Failed to get response from Azure OpenAI")
+            yield from self._result_events(self._azure_failure_result())
+            return
+        
+        chunks = []
+        try:
+            for chunk in self._stream_azure(message, formatted_history, deadline):
+                chunks.append(chunk)
+                yield "token", {"text": chunk}
+        except PoolFullError as e:
+            yield from self._result_events(self._local_fallback_result(message, str(e), deadline))
+            return
+        except Exception as e:
+            logger.error(f"Error streaming response from Azure OpenAI: {str(e)}")
+            if chunks:
+                # Part of the answer is already on the client; report the interruption
+                yield "error", {"error": "The response stream was interrupted"}
+                yield "done", {"source": "azure", "confidence": 1.0, "intent": "azure_generated"}
+            else:
+                yield from self._result_events(
+                    self._azure_error_result(message, deadline, refused=isinstance(e, CircuitOpenError))
+                )
+            return
+        
+        if not chunks:
+            logger.error("Azure OpenAI returned an empty stream")
+            yield from self._result_events(self._azure_failure_result())
+            return
+        
+        self._store_answer(message, "".join(chunks), embedding, persist=not formatted_history)
+        
+        yield "done", {"source": "azure", "confidence": 1.0, "intent": "azure_generated"}
+    
+    def _stream_azure(self, message: str, formatted_history: List, deadline=None):
+        """
+        Stream an Azure answer produced on the I/O pool
+        
+        Args:
+            message: User message
+            formatted_history: Conversation history already formatted for Azure
+            deadline: Optional utils.deadline.Deadline bounding the wait for the first chunk
+            
+        Yields:
+            Text chunks as Azure generates them
+            
+        Raises:
+            PoolFullError: if the I/O pool queue is full
+            concurrent.futures.TimeoutError: if no chunk arrived before the deadline
+        """
+        chunks = queue.Queue()
+        stopped = threading.Event()
+        
+        def produce():
+            try:
+                for chunk in self.azure_service.generate_response_stream(message=message, context=formatted_history, deadline=deadline):
+                    # The client went away: stop reading from Azure
+                    if stopped.is_set():
+                        return
+                    chunks.put(("token", chunk))
+                chunks.put(("end", None))
+            except Exception as e:
+                chunks.put(("error", e))
+        
+        future = self.io_pool.submit(produce)
+        first = True
+        try:
+            while True:
+                try:
+                    kind, value = chunks.get(timeout=deadline.timeout() if first and deadline else None)
+                except queue.Empty:
+                    raise FutureTimeoutError("No Azure chunk before the request deadline")
+                if kind == "end":
+                    return
+                if kind == "error":
+                    raise value
+                first = False
+                yield value
+        finally:
+            stopped.set()
+            future.cancel()
+    
+    def _should_speculate(self, message: str, deadline=None) -> bool:
+        """
+        Whether to start Azure at the same time as local classification
+        
+        Args:
+            message: User message
+            deadline: Optional utils.deadline.Deadline of the request
+            
+        Returns:
+            True if speculation is enabled, the pre-check flags the message as
+            probably out-of-domain and an Azure call may be started
+        """
+        if not self.domain_precheck or not self.intent_classifier:
+            return False
+        flagged = self.domain_precheck.is_out_of_domain(message)
+        self.speculation_metrics.record_check(flagged)
+        return flagged and not self._remote_skip_reason(deadline)
+    
+    def _get_speculative_response(self, message: str, conversation_history: List, deadline=None) -> Dict:
+        """
+        Classify locally while a speculative Azure call runs, cancelling it if a local answer is found
+        
+        Args:
+            message: User message
+            conversation_history: List of previous messages
+            deadline: Optional utils.deadline.Deadline of the request
+            
+        Returns:
+            Dict containing response and metadata
+        """
+        formatted_history = self._format_conversation_history(conversation_history)
+        call = SpeculativeCall(self._speculation_executor, self.azure_service, message, formatted_history, deadline)
+        self.speculation_metrics.record_started()
+        logger.info("Started speculative Azure call for probably out-of-domain message")
+        
+        local_result, embedding = self._speculative_local_stage(message, formatted_history, deadline)
+        local_done = time.monotonic()
+        
+        if local_result:
+            call.cancel()
+            self.speculation_metrics.record_wasted(local_done - call.started_at)
+            return local_result
+        
+        try:
+            response_text = call.result(timeout=deadline.timeout() if deadline else None)
+        except Exception as e:
+            logger.error(f"Speculative Azure call failed: {type(e).__name__}: {str(e)}")
+            call.cancel()
+            self.speculation_metrics.record_failed()
+            return self._azure_error_result(message, deadline)
+        else:
+            self.speculation_metrics.record_used(min(local_done, call.finished_at or local_done) - call.started_at)
+        
+        return self._azure_result(message, response_text, embedding, deadline, persist=not formatted_history)
+    
+    def _speculative_local_stage(self, message: str, formatted_history: List, deadline=None):
+        """
+        Local work done while a speculative call runs: classification, then the semantic cache
+        
+        Returns:
+            Tuple of (local or cached response dict or None, semantic cache embedding or None)
+        """
+        try:
+            local_result = self._classify_locally(message, deadline)
+            if local_result:
+                return local_result, None
+            return self._lookup_cached_response(message, formatted_history)
+        except Exception as e:
+            logger.error(f"Error in local stage of speculative response: {str(e)}")
+            return None, None
+    
+    def _result_events(self, result: Dict):
+        """Turn a complete response dict into a 'message' event and a 'done' event"""
+        yield "message", {"text": result["response"]}
+        yield "done", {
+            "source": result["source"],
+            "confidence": result["confidence"],
+            "intent": result["intent"]
+        }
+    
+    def _classify_locally(self, message: str, deadline=None):
+        """
+        Answer from the intents data when the classifier is confident enough
+        
+        Args:
+            message: User message
+            deadline: Optional utils.deadline.Deadline bounding the wait for a micro-batch
+            
+        Returns:
+            Dict containing response and metadata, or None to defer to Azure OpenAI
+        """
+        # One snapshot for the whole classification, even if a reload swaps versions meanwhile
+        components = self.components
+        if not components.classifier:
+            logger.warning("Intent classifier not available, defaulting to Azure OpenAI")
+            return None
+        
+        logger.info("Classifying intent for message: %.50s...", message)
+        intent_data = self._predict_intent(message, deadline, components)
+        
+        # If confidence is above threshold, use local response
+        if intent_data and intent_data["confidence"] >= self.confidence_threshold:
+            logger.info("Using local response for intent: %s (confidence: %.4f)", intent_data['intent'], intent_data['confidence'])
+            
+            # Get response from intents data
+            response = self._get_local_response(intent_data["intent"], components.intents)
+            
+            return {
+                "response": response,
+                "source": "local",
+                "confidence": intent_data["confidence"],
+                "intent": intent_data["intent"]
+            }
+        
+        if not intent_data:
+            logger.warning("No intent prediction available, using Azure OpenAI")
+            return None
+        
+        # Intent confidence below threshold, use Azure
+        logger.info("Local confidence (%.4f) below threshold (%s), using Azure OpenAI", intent_data['confidence'], self.confidence_threshold)
+        return None
+    
+    def _predict_intent(self, message: str, deadline=None, components=None) -> Dict:
+        """
+        Classify a message, through the micro-batcher when enabled
+        
+        Args:
+            message: User message
+            deadline: Optional utils.deadline.Deadline bounding the wait for a micro-batch
+            components: ActiveComponents snapshot to use, defaults to the active one
+            
+        Returns:
+            Intent dict from the classifier
+        """
+        components = components or self.components
+        timeout = deadline.timeout() if deadline else None
+        # The batcher already runs inference on its own single thread
+        if components.batcher:
+            try:
+                return components.batcher.predict_intent(message, timeout=timeout)
+            except BatcherClosedError:
+                # A reload retired this snapshot's batcher; its classifier still answers
+                pass
+        return self.inference_pool.run(components.classifier.predict_intent, message, timeout=timeout)
+    
+    def get_responses(self, messages: List[str], use_azure: bool = False) -> List[Dict]:
+        """
+        Get responses for a batch of messages with one classifier forward pass
+        
+        Args:
+            messages: List of user messages
+            use_azure: Whether low-confidence messages are sent to Azure OpenAI
+            
+        Returns:
+            List of dicts containing response and metadata, in input order
+        """
+        results = [None] * len(messages)
+        self._ensure_components()
+        
+        # Only non-empty messages go through the classifier
+        indexed = [(i, message) for i, message in enumerate(messages) if message]
+        for i, message in enumerate(messages):
+            if not message:
+                results[i] = self._empty_message_result()
+        
+        components = self.components
+        if components.classifier and indexed:
+            logger.info("Classifying intents for batch of %d messages", len(indexed))
+            predictions = self.inference_pool.run(components.classifier.predict_intents, [message for _, message in indexed])
+        else:
+            predictions = [None] * len(indexed)
+        
+        for (i, message), intent_data in zip(indexed, predictions):
+            if intent_data and intent_data["confidence"] >= self.confidence_threshold:
+                results[i] = {
+                    "response": self._get_local_response(intent_data["intent"], components.intents),
+                    "source": "local",
+                    "confidence": intent_data["confidence"],
+                    "intent": intent_data["intent"]
                 }
+            elif use_azure:
+                try:
+                    results[i] = self._get_azure_response(message, [])
+                except Exception as e:
+                    logger.error(f"Error getting Azure response in batch: {str(e)}")
+                    results[i] = self._error_result()
+            else:
+                # Report the local prediction without answering it
+                results[i] = {
+                    "response": None,
+                    "source": "unanswered",
+                    "confidence": intent_data["confidence"] if intent_data else 0.0,
+                    "intent": intent_data["intent"] if intent_data else None
+                }
+        
+        return results
     
-    def _get_local_response(self, intent_tag: str) -> str:
+    def _get_local_response(self, intent_tag: str, intents=None) -> str:
         """
         Get response from local intents data
         
         Args:
             intent_tag: Intent tag to find response for
+            intents: IntentsStore to answer from, defaults to the active one
             
         Returns:
             Response string
         """
-        try:
-            # Find matching intent
-            for intent in self.intents_data["intents"]:
-                if intent["tag"] == intent_tag:
-                    # Return random response from list
-                    import random
-                    return random.choice(intent["responses"])
-            
-            # If no matching intent found
+        with INTENT_LOOKUP_SECONDS.time():
+            response = (intents or self.intents).random_response(intent_tag)
+        if response is None:
             logger.warning(f"No local response found for intent: {intent_tag}")
-            return None
-        except Exception as e:
-            logger.error(f"Error getting local response: {str(e)}")
-            return None
+        return response
     
-    def _get_azure_response(self, message: str, conversation_history: List) -> Dict:
+    @tracer.traced("response_manager.azure_response")
+    def _get_azure_response(self, message: str, conversation_history: List, deadline=None) -> Dict:
         """
         Get response from Azure OpenAI
         
         Args:
             message: User message
             conversation_history: List of previous messages
+            deadline: Optional utils.deadline.Deadline of the request
             
         Returns:
             Dict containing response and metadata
@@ -161,29 +1011,320 @@ class ResponseManager:
         # Format conversation history for Azure
         formatted_history = self._format_conversation_history(conversation_history)
         
-        # Get response from Azure
-        response_text = self.azure_service.generate_response(
-            message=message,
-            context=formatted_history
+        cached_result, embedding = self._lookup_cached_response(message, formatted_history)
+        if cached_result:
+            return cached_result
+        
+        # Answer locally right away when Azure is failing or there is no time left for it
+        skip_reason = self._remote_skip_reason(deadline)
+        if skip_reason:
+            return self._local_fallback_result(message, skip_reason, deadline)
+        
+        shared = False
+        key = self._single_flight_key(message, formatted_history)
+        try:
+            if key is None:
+                # Get response from Azure
+                response_text = self._call_azure(message, formatted_history, deadline)
+            else:
+                # Identical questions in flight share one upstream call
+                response_text, shared = self.single_flight.do(
+                    key,
+                    lambda: self._call_azure(message, formatted_history, deadline),
+                    timeout=self._single_flight_wait(deadline)
+                )
+        except PoolFullError as e:
+            return self._local_fallback_result(message, str(e), deadline)
+        except FutureTimeoutError:
+            return self._local_fallback_result(message, "timed out waiting for an in-flight Azure call", deadline)
+        if shared:
+            # The leader already stores the answer in the caches
+            embedding = None
+        
+        return self._azure_result(message, response_text, embedding, deadline, persist=not formatted_history and not shared)
+    
+    def _call_azure(self, message: str, formatted_history: List, deadline=None):
+        """
+        Blocking Azure call run on the I/O pool
+        
+        Args:
+            message: User message
+            formatted_history: Conversation history already formatted for Azure
+            deadline: Optional utils.deadline.Deadline, also bounding the wait for a pool thread
+            
+        Returns:
+            Response text from the Azure service
+        """
+        return self.io_pool.run(
+            lambda: self.azure_service.generate_response(message=message, context=formatted_history, deadline=deadline),
+            timeout=deadline.timeout() if deadline else None
         )
+    
+    def _single_flight_key(self, message: str, formatted_history: List):
+        """
+        Key under which concurrent Azure requests are merged
+        
+        Args:
+            message: User message
+            formatted_history: Conversation history already formatted for Azure
+            
+        Returns:
+            The normalized message, or None if the request must not be merged
+            (single-flight disabled, conversation history, nothing left after normalizing)
+        """
+        if not self.single_flight or formatted_history:
+            return None
+        return normalize_message(message) or None
+    
+    def _single_flight_wait(self, deadline=None):
+        """Seconds a merged request waits: the single-flight timeout, cut short by the deadline"""
+        waits = [wait for wait in (self.single_flight_timeout, deadline.timeout() if deadline else None) if wait is not None]
+        return min(waits) if waits else None
+    
+    def _remote_skip_reason(self, deadline=None):
+        """
+        Why an Azure call should not be started
+        
+        Args:
+            deadline: Optional utils.deadline.Deadline of the request
+            
+        Returns:
+            Reason string, or None if the call may go ahead
+        """
+        # Open, or half open with every trial slot taken: the call would be refused
+        if not self.azure_service.accepting_calls:
+            return "Azure OpenAI circuit is open"
+        if deadline is not None and deadline.remaining() < self.min_remote_seconds:
+            return f"{deadline.remaining():.3f}s left on the request deadline"
+        return None
+    
+    def _azure_result(self, message: str, response_text, embedding, deadline=None, persist=False) -> Dict:
+        """
+        Build the response dict for an Azure answer and cache it when possible
         
+        Args:
+            message: User message
+            response_text: Text returned by the Azure service (None on failure)
+            embedding: Semantic cache embedding of the message, or None
+            deadline: Optional utils.deadline.Deadline of the request
+            persist: Store the answer in the persistent response cache
+            
+        Returns:
+            Dict containing response and metadata
+        """
+        if not response_text or response_text == self.azure_service.ERROR_RESPONSE:
+            # generate_response only returns None with a client when the breaker refused the call
+            refused = response_text is None and self.azure_service.client is not None
+            return self._azure_error_result(message, deadline, response_text, refused)
+        
+        self._store_answer(message, response_text, embedding, persist)
+        return {
+            "response": response_text,
+            "source": "azure",
+            "confidence": 1.0,  # Azure responses are considered high confidence
+            "intent": "azure_generated"
+        }
+    
+    def _store_answer(self, message: str, response_text: str, embedding, persist: bool):
+        """
+        Keep an Azure answer for later requests
+        
+        Args:
+            message: User message
+            response_text: Answer text
+            embedding: Semantic cache embedding of the message, or None to skip the semantic cache
+            persist: Also store it in the persistent response cache
+        """
+        if embedding is not None:
+            self.semantic_cache.store(embedding, message, response_text)
+        if persist and self.response_cache:
+            self.response_cache.set(message, response_text)
+    
+    def _azure_error_result(self, message: str, deadline=None, response_text=None, refused=False) -> Dict:
+        """
+        Response used when the Azure call failed
+        
+        Args:
+            message: User message
+            deadline: Optional utils.deadline.Deadline of the request
+            response_text: Text returned by the Azure service (None or its error response)
+            refused: The circuit breaker refused the call (a half-open trial was already running)
+            
+        Returns:
+            The local fallback if the breaker refused or opened during the call or the
+            deadline ran out, otherwise the Azure error response or the fallback message
+        """
+        if not self.azure_service.accepting_calls:
+            return self._local_fallback_result(message, "Azure OpenAI circuit opened during the call", deadline)
+        if refused:
+            return self._local_fallback_result(message, "Azure OpenAI call refused by the circuit breaker", deadline)
+        if deadline is not None and deadline.expired:
+            return self._local_fallback_result(message, "request deadline ran out during the Azure call", deadline)
         if response_text:
             return {
                 "response": response_text,
                 "source": "azure",
-                "confidence": 1.0,  # Azure responses are considered high confidence
+                "confidence": 1.0,
                 "intent": "azure_generated"
             }
-        else:
-            # If Azure fails, provide a fallback message
-            logger.error("Failed to get response from Azure OpenAI")
+        # If Azure fails, provide a fallback message
+        logger.error("Failed to get response from Azure OpenAI")
+        return self._azure_failure_result()
+    
+    def _local_fallback_result(self, message: str, reason: str, deadline=None) -> Dict:
+        """
+        Local answer used when Azure OpenAI cannot be used (circuit open, deadline too close)
+        
+        Args:
+            message: User message
+            reason: Why Azure is skipped, for the log
+            deadline: Optional utils.deadline.Deadline of the request, bounding a new classification
+            
+        Returns:
+            The best local intent's response if it clears fallback_confidence,
+            otherwise the Azure failure response
+        """
+        logger.warning(f"Answering locally instead of Azure OpenAI: {reason}")
+        # One snapshot so the answer comes from the intents the classifier was built for
+        components = self.components
+        intent_data = self._fallback_intent(message, deadline, components)
+        
+        if intent_data and intent_data["intent"] and intent_data["confidence"] >= self.fallback_confidence:
+            response = self._get_local_response(intent_data["intent"], components.intents)
+            if response:
+                return {
+                    "response": response,
+                    "source": "local_fallback",
+                    "confidence": intent_data["confidence"],
+                    "intent": intent_data["intent"]
+                }
+        return self._azure_failure_result()
+    
+    def _fallback_intent(self, message: str, deadline=None, components=None):
+        """
+        Prediction for the local fallback
+        
+        Args:
+            message: User message
+            deadline: Optional utils.deadline.Deadline of the request
+            components: ActiveComponents snapshot to use, defaults to the active one
+            
+        Returns:
+            Intent dict, or None if the message was not classified and no time is left to do it
+        """
+        components = components or self.components
+        classifier = components.classifier
+        if not classifier:
+            return None
+        # Normally just made by _classify_locally: reuse it without going back to the inference pool
+        intent_data = classifier.cached_prediction(message)
+        if intent_data is not None:
+            return intent_data
+        if deadline is not None and deadline.expired:
+            logger.warning("Request deadline exceeded, skipping classification for the local fallback")
+            return None
+        try:
+            return self._predict_intent(message, deadline, components)
+        except Exception as e:
+            logger.error(f"Error classifying message for local fallback: {str(e)}")
+            return None
+    
+    def _empty_message_result(self) -> Dict:
+        """Response used when the message is empty"""
+        return {
+            "response": "I didn't receive a message. How can I help you?",
+            "source": "default",
+            "confidence": 0.0,
+            "intent": None
+        }
+    
+    def _error_result(self) -> Dict:
+        """Response used when the request could not be processed at all"""
+        return {
+            "response": "I'm sorry, I encountered an issue processing your request. Please try again.",
+            "source": "error",
+            "confidence": 0.0,
+            "intent": None
+        }
+    
+    def _azure_failure_result(self) -> Dict:
+        """Response used when Azure OpenAI cannot produce an answer"""
+        return {
+            "response": "I'm sorry, I couldn't generate a response at the moment. Please try asking in a different way.",
+            "source": "fallback",
+            "confidence": 0.0,
+            "intent": None
+        }
+    
+    @tracer.traced("response_manager.cache_lookup")
+    def _lookup_cached_response(self, message: str, formatted_history: List):
+        """
+        Look up a cached Azure answer: the persistent cache for the same
+        normalized question first, then the semantic cache for a near-identical one
+        
+        Args:
+            message: User message
+            formatted_history: Conversation history already formatted for Azure
+            
+        Returns:
+            Tuple of (cached response dict or None, embedding to store the new answer under or None)
+        """
+        # Answers depend on the conversation, so only history-free questions use the caches
+        if formatted_history:
+            if self.semantic_cache.enabled:
+                self.semantic_cache.record_bypass()
+            return None, None
+        
+        persisted = self.response_cache.get(message) if self.response_cache else None
+        if persisted:
+            logger.info("Persistent response cache hit")
             return {
-                "response": "I'm sorry, I couldn't generate a response at the moment. Please try asking in a different way.",
-                "source": "fallback",
-                "confidence": 0.0,
-                "intent": None
-            }
+                "response": persisted,
+                "source": "azure",
+                "confidence": 1.0,
+                "intent": "azure_generated",
+                "cache": "persistent"
+            }, None
+        
+        if not self.semantic_cache.enabled:
+            return None, None
+        
+        embedding = self._embed_for_cache(message)
+        cached = self.semantic_cache.lookup(embedding) if embedding is not None else None
+        if not cached:
+            return None, embedding
+        
+        entry, similarity = cached
+        logger.info("Semantic cache hit (similarity %.3f)", similarity)
+        return {
+            "response": entry["response"],
+            "source": "azure",
+            "confidence": 1.0,
+            "intent": "azure_generated",
+            "cache": "semantic"
+        }, embedding
+    
+    def _embed_for_cache(self, message: str):
+        """
+        Embed a message for the semantic cache with the classifier's encoder
+        
+        Args:
+            message: User message
+            
+        Returns:
+            Embedding vector, or None without a sentence encoder ('bow' and 'lstm'
+            classifiers), which leaves exact repeats to the persistent cache
+        """
+        classifier = self.intent_classifier
+        if not classifier or not classifier.has_sentence_encoder:
+            return None
+        try:
+            return self.inference_pool.run(classifier.embed_messages, [message])[0]
+        except Exception as e:
+            logger.warning(f"Could not embed message for semantic cache: {str(e)}")
+            return None
     
+    @tracer.traced("response_manager.format_history")
     def _format_conversation_history(self, history: List) -> List:
         """
         Format conversation history for Azure OpenAI
@@ -0,0 +1,159 @@
+# semantic_cache.py
+import time
+import threading
+import numpy as np
+
+
+class SemanticResponseCache:
+    """
+    Cache of Azure answers looked up by cosine similarity of message embeddings
+
+    Embeddings are kept L2-normalized in one preallocated matrix so a lookup
+    is a single matrix-vector product over the cached questions.
+    """
+
+    def __init__(self, max_size=512, ttl=3600.0, threshold=0.92):
+        """
+        Initialize the cache
+
+        Args:
+            max_size: Maximum number of cached questions; 0 disables the cache
+            ttl: Seconds an answer stays valid, None for no expiry
+            threshold: Minimum cosine similarity for a hit
+        """
+        self.max_size = max(0, int(max_size))
+        self.ttl = ttl if ttl else None
+        self.threshold = float(threshold)
+
+        self._lock = threading.Lock()
+        self._embeddings = None
+        self._valid = np.zeros(self.max_size, dtype=bool)
+        self._expires_at = np.full(self.max_size, np.inf)
+        self._last_used = np.zeros(self.max_size)
+        self._entries = [None] * self.max_size
+
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.inserts = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    @staticmethod
+    def _normalize(embedding):
+        """Return the unit vector, or None when it cannot be compared"""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if not norm or not np.isfinite(norm):
+            return None
+        return vector / norm
+
+    def record_bypass(self):
+        """Count a request that skipped the cache (e.g. it carries history)"""
+        with self._lock:
+            self.bypasses += 1
+
+    def lookup(self, embedding):
+        """
+        Find the stored answer for the most similar cached question
+
+        Args:
+            embedding: Embedding of the incoming message
+
+        Returns:
+            Tuple of (cached entry dict, similarity) on a hit, otherwise None
+        """
+        if not self.enabled:
+            return None
+        query = self._normalize(embedding)
+
+        with self._lock:
+            if query is None or self._embeddings is None or query.shape[0] != self._embeddings.shape[1]:
+                self.misses += 1
+                return None
+
+            now = time.monotonic()
+            live = self._valid & (self._expires_at > now)
+            if not live.any():
+                self.misses += 1
+                return None
+
+            similarities = self._embeddings @ query
+            similarities[~live] = -np.inf
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+
+            self._last_used[best] = now
+            self.hits += 1
+            return self._entries[best], similarity
+
+    def store(self, embedding, message, response):
+        """
+        Cache an answer, evicting expired or least recently used entries when full
+
+        Args:
+            embedding: Embedding of the question
+            message: Question text (kept for inspection)
+            response: Answer text
+        """
+        if not self.enabled:
+            return
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        with self._lock:
+            # A new embedding size means a different encoder: start over
+            if self._embeddings is None or self._embeddings.shape[1] != vector.shape[0]:
+                self._embeddings = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+                self._valid[:] = False
+
+            now = time.monotonic()
+            free = np.flatnonzero(~self._valid | (self._expires_at <= now))
+            if free.size:
+                slot = int(free[0])
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+
+            self._embeddings[slot] = vector
+            self._valid[slot] = True
+            self._expires_at[slot] = now + self.ttl if self.ttl else np.inf
+            self._last_used[slot] = now
+            self._entries[slot] = {"message": message, "response": response, "created_at": time.time()}
+            self.inserts += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._valid[:] = False
+            self._entries = [None] * self.max_size
+
+    def stats(self):
+        """
+        Get cache metrics
+
+        Returns:
+            dict with size, configuration and hit/miss/bypass counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            live = self._valid & (self._expires_at > time.monotonic())
+            return {
+                "size": int(live.sum()),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "inserts": self.inserts,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
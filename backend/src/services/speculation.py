@@ -0,0 +1,216 @@
+# speculation.py
+import os
+import re
+import sys
+import time
+import threading
+from collections import Counter
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import setup_logger
+from utils.histogram import Histogram
+
+# Set up logger
+logger = setup_logger("speculation")
+
+_TOKEN = re.compile(r"\w+")
+
+# Milliseconds of latency saved by overlapping Azure with local classification
+LATENCY_SAVED_MS_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _tokens(text):
+    """Lowercase word tokens with a crude plural strip, shared by the vocabulary and the check"""
+    return [token[:-1] if len(token) > 3 and token.endswith("s") else token for token in _TOKEN.findall(text.lower())]
+
+
+class DomainPrecheck:
+    """
+    Cheap guess whether a message is outside the intents' domain
+
+    The vocabulary is every word of the intent patterns. Words used by a
+    large share of the intents ("what", "your", ...) say nothing about the
+    domain and are ignored on both sides. A message whose remaining words
+    are mostly unknown is flagged as probably out-of-domain.
+    """
+
+    def __init__(self, intents, max_coverage=0.5, common_word_ratio=0.25):
+        """
+        Build the vocabulary
+
+        Args:
+            intents: utils.intents_store.IntentsStore
+            max_coverage: Messages with at most this share of known words are flagged
+            common_word_ratio: Words found in more than this share of intents are ignored
+        """
+        self.max_coverage = max_coverage
+        document_frequency = Counter()
+        for intent in intents:
+            words = set()
+            for pattern in intent.patterns:
+                words.update(_tokens(pattern))
+            document_frequency.update(words)
+
+        limit = max(1, int(len(intents) * common_word_ratio))
+        self.common_words = frozenset(word for word, count in document_frequency.items() if count > limit)
+        self.vocabulary = frozenset(document_frequency) - self.common_words
+
+    def coverage(self, message):
+        """
+        Share of the message's informative words found in the intent patterns
+
+        Args:
+            message: User message
+
+        Returns:
+            Coverage between 0 and 1, or None when the message has no informative word
+        """
+        words = [word for word in _tokens(message) if word not in self.common_words]
+        if not words:
+            return None
+        return sum(1 for word in words if word in self.vocabulary) / len(words)
+
+    def is_out_of_domain(self, message):
+        """Whether the message is probably out-of-domain"""
+        coverage = self.coverage(message)
+        return coverage is not None and coverage <= self.max_coverage
+
+
+class SpeculativeCall:
+    """
+    Azure completion running in a worker thread while the message is classified
+
+    The call is made in streaming mode so it can really be abandoned: on
+    cancel the worker stops reading at the next chunk and closes the HTTP
+    stream, which ends token generation upstream.
+    """
+
+    def __init__(self, executor, azure_service, message, context=None, deadline=None):
+        """
+        Submit the call
+
+        Args:
+            executor: Executor running the call
+            azure_service: AzureOpenAIService
+            message: User message
+            context: Conversation history already formatted for Azure
+            deadline: Optional utils.deadline.Deadline of the request
+        """
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self._cancelled = threading.Event()
+        self.future = executor.submit(self._run, azure_service, message, context, deadline)
+
+    def _run(self, azure_service, message, context, deadline):
+        """Worker: collect the streamed answer unless cancelled"""
+        chunks = []
+        stream = azure_service.generate_response_stream(message=message, context=context, deadline=deadline)
+        try:
+            for chunk in stream:
+                if self._cancelled.is_set():
+                    logger.info("Speculative Azure call cancelled")
+                    return None
+                chunks.append(chunk)
+        finally:
+            # Closing the generator closes the HTTP stream when the loop stopped early
+            stream.close()
+            self.finished_at = time.monotonic()
+        return "".join(chunks) or None
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Abandon the call; a call that has not started yet never runs"""
+        self._cancelled.set()
+        self.future.cancel()
+
+    def result(self, timeout=None):
+        """
+        Wait for the answer
+
+        Args:
+            timeout: Seconds to wait, None to wait for the call to finish
+
+        Returns:
+            Response text, or None if the call produced nothing
+        """
+        return self.future.result(timeout=timeout)
+
+
+class SpeculationMetrics:
+    """
+    Counters for speculative Azure calls
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.flagged = 0
+        self.started = 0
+        self.used = 0
+        self.wasted = 0
+        self.failed = 0
+        self.wasted_seconds = 0.0
+        self.latency_saved_histogram = Histogram(LATENCY_SAVED_MS_BUCKETS)
+
+    def record_check(self, flagged):
+        """Count a pre-check, and whether it flagged the message"""
+        with self._lock:
+            self.checked += 1
+            if flagged:
+                self.flagged += 1
+
+    def record_started(self):
+        with self._lock:
+            self.started += 1
+
+    def record_used(self, saved_seconds):
+        """
+        Count a speculative answer that was served
+
+        Args:
+            saved_seconds: Time the local stage overlapped with the Azure call
+        """
+        with self._lock:
+            self.used += 1
+        self.latency_saved_histogram.observe(saved_seconds * 1000.0)
+
+    def record_wasted(self, seconds):
+        """
+        Count a speculative call cancelled because a local answer was enough
+
+        Args:
+            seconds: How long the call had been running when it was cancelled
+        """
+        with self._lock:
+            self.wasted += 1
+            self.wasted_seconds += seconds
+
+    def record_failed(self):
+        with self._lock:
+            self.failed += 1
+
+    def stats(self):
+        """
+        Get speculation metrics
+
+        Returns:
+            dict with pre-check and call counters, wasted Azure time and latency saved
+        """
+        with self._lock:
+            resolved = self.used + self.wasted
+            stats = {
+                "checked": self.checked,
+                "flagged": self.flagged,
+                "started": self.started,
+                "used": self.used,
+                "wasted": self.wasted,
+                "failed": self.failed,
+                "wasted_ratio": self.wasted / resolved if resolved else 0.0,
+                "wasted_seconds": round(self.wasted_seconds, 3)
+            }
+        stats["latency_saved_ms"] = self.latency_saved_histogram.snapshot()
+        return stats
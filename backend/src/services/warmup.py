@@ -0,0 +1,198 @@
+# warmup.py
+import os
+import sys
+import json
+import time
+import threading
+from collections import Counter
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import setup_logger
+from utils.cache import normalize_message
+from utils.deadline import Deadline
+
+# Set up logger
+logger = setup_logger("warmup")
+
+
+def load_top_questions(path, top_n=200):
+    """
+    Rank the questions of a chat traffic file by frequency
+
+    Each line is a JSON object with a "message" field (the /api/chat request
+    body) or a bare JSON string. Messages are counted by normalized text and
+    the most frequent spelling of each is kept. Unreadable lines are skipped.
+
+    Args:
+        path: JSONL traffic file
+        top_n: Number of questions to return
+
+    Returns:
+        List of (message, count) tuples, most frequent first
+    """
+    counts = Counter()
+    spellings = {}
+    skipped = 0
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+            message = record.get("message") if isinstance(record, dict) else record
+            if not isinstance(message, str) or not message.strip():
+                skipped += 1
+                continue
+            message = message.strip()
+            key = normalize_message(message)
+            if not key:
+                skipped += 1
+                continue
+            counts[key] += 1
+            spellings.setdefault(key, Counter())[message] += 1
+
+    if skipped:
+        logger.warning(f"Skipped {skipped} unreadable lines in {path}")
+    return [(spellings[key].most_common(1)[0][0], count) for key, count in counts.most_common(top_n)]
+
+
+class CacheWarmup:
+    """
+    Warm-up pass over the most frequent questions of past traffic
+
+    Every question is classified once, which loads the model, fills the
+    prediction cache and compiles the inference path. Questions the
+    classifier would send to Azure are optionally answered by an offline,
+    rate-limited Azure pass and stored in the persistent response cache,
+    so the first visitors after a deploy get them from the cache.
+    """
+
+    def __init__(self, traffic_path, classify, top_n=200, azure_service=None, response_cache=None, azure_rate=1.0):
+        """
+        Configure the pass
+
+        Args:
+            traffic_path: JSONL traffic file (see load_top_questions)
+            classify: Callable returning a local result dict or None for a message
+            top_n: Number of questions to warm
+            azure_service: AzureOpenAIService for the offline pass, None to only classify
+            response_cache: PersistentResponseCache receiving the Azure answers
+            azure_rate: Maximum Azure calls per second of the offline pass
+        """
+        self.traffic_path = traffic_path
+        self.classify = classify
+        self.top_n = top_n
+        self.azure_service = azure_service if response_cache else None
+        self.response_cache = response_cache
+        self.azure_interval = 1.0 / azure_rate if azure_rate and azure_rate > 0 else 0.0
+
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self.status = "pending"
+        self.started_at = None
+        self.finished_at = None
+        self.questions = 0
+        self.local = 0
+        self.remote = 0
+        self.already_cached = 0
+        self.prefilled = 0
+        self.failed = 0
+        self.error = None
+
+    @property
+    def done(self):
+        """Whether the pass has finished (successfully or not)"""
+        return self._done.is_set()
+
+    def start(self):
+        """Run the pass in a daemon thread so it never blocks the server"""
+        thread = threading.Thread(target=self.run, name="cache-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def wait(self, timeout=None):
+        """Block until the pass has finished; returns whether it did"""
+        return self._done.wait(timeout)
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def run(self):
+        """Classify the top questions, then pre-fill the response cache for the remote ones"""
+        self.status = "running"
+        self.started_at = time.time()
+        try:
+            questions = load_top_questions(self.traffic_path, self.top_n)
+            self.questions = len(questions)
+            logger.info(f"Warming up with {len(questions)} questions from {self.traffic_path}")
+
+            remote = []
+            for message, _ in questions:
+                if self.classify(message):
+                    self._count("local")
+                else:
+                    self._count("remote")
+                    remote.append(message)
+
+            if self.azure_service and remote:
+                self._prefill(remote)
+            self.status = "done"
+        except Exception as e:
+            logger.error(f"Cache warm-up failed: {str(e)}")
+            self.status = "failed"
+            self.error = str(e)
+        finally:
+            self.finished_at = time.time()
+            self._done.set()
+            logger.info(f"Cache warm-up {self.status} in {self.finished_at - self.started_at:.2f}s: "
+                        f"{self.local} local, {self.remote} remote, {self.prefilled} pre-filled")
+
+    def _prefill(self, messages):
+        """Offline Azure pass, at most one call per azure_interval"""
+        next_call = 0.0
+        for message in messages:
+            if self.response_cache.get(message):
+                self._count("already_cached")
+                continue
+            if self.azure_service.circuit_open:
+                logger.warning("Azure circuit open, stopping the warm-up pre-fill")
+                break
+
+            delay = next_call - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_call = time.monotonic() + self.azure_interval
+
+            response_text = self.azure_service.generate_response(message=message, context=[], deadline=Deadline())
+            if not response_text or response_text == self.azure_service.ERROR_RESPONSE:
+                self._count("failed")
+                continue
+            self.response_cache.set(message, response_text)
+            self._count("prefilled")
+
+    def stats(self):
+        """
+        Get warm-up progress
+
+        Returns:
+            dict with the status, question counts and duration of the pass
+        """
+        with self._lock:
+            return {
+                "status": self.status,
+                "traffic_path": self.traffic_path,
+                "questions": self.questions,
+                "local": self.local,
+                "remote": self.remote,
+                "already_cached": self.already_cached,
+                "prefilled": self.prefilled,
+                "failed": self.failed,
+                "duration": round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+                "error": self.error
+            }
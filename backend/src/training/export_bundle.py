@@ -0,0 +1,134 @@
+# export_bundle.py
+import os
+import sys
+import json
+import uuid
+import pickle
+import argparse
+import tempfile
+import numpy as np
+
+# Add the parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import setup_logger
+from prediction.model_bundle import ModelBundle, write_bundle, KERAS_BLOB
+from training.export_numpy import convert_model, verify_export
+
+# Set up logger
+logger = setup_logger("export_bundle")
+
+
+def _keras_blob(model):
+    """Serialize a keras model to .h5 bytes"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "model.h5")
+        model.save(path)
+        with open(path, "rb") as file:
+            return np.frombuffer(file.read(), dtype=np.uint8)
+
+
+def export_bundle(model, output_path, embedding_method, classes, words=None, max_seq_len=None,
+                  run_id=None, metrics=None, atol=1e-4):
+    """
+    Write a trained model and its metadata as one versioned bundle
+
+    Dense heads are stored as float32 layers for the numpy runtime; other
+    models (LSTM) are embedded as a serialized keras model.
+
+    Args:
+        model: Trained keras model
+        output_path: Destination .bundle path
+        embedding_method: 'use', 'lstm' or 'bow'
+        classes: Intent tags in model output order
+        words: Vocabulary (bag of words columns, or LSTM words with index i + 1)
+        max_seq_len: LSTM input length
+        run_id: Training run id, a random one is generated if omitted
+        metrics: Optional dict of training metrics kept in the manifest
+        atol: Maximum tolerated difference of the numpy conversion from keras
+
+    Returns:
+        Manifest of the written bundle
+    """
+    manifest = {
+        "embedding_method": embedding_method,
+        "classes": list(classes),
+        "words": list(words or []),
+        "max_seq_len": max_seq_len,
+        "run_id": run_id or uuid.uuid4().hex,
+        "metrics": metrics or {}
+    }
+
+    try:
+        numpy_model = convert_model(model)
+        max_diff = max(
+            verify_export(model, numpy_model, binary=True),
+            verify_export(model, numpy_model, binary=False)
+        )
+        if max_diff > atol:
+            raise ValueError(f"numpy conversion differs from keras by {max_diff:.2e}")
+        arrays = {}
+        for i, (kernel, bias, _) in enumerate(numpy_model.layers):
+            arrays[f"layer_{i}_kernel"] = kernel.astype(np.float32)
+            arrays[f"layer_{i}_bias"] = bias.astype(np.float32)
+        manifest["layers"] = [activation for _, _, activation in numpy_model.layers]
+        manifest["input_dim"] = numpy_model.input_dim
+    except ValueError as e:
+        logger.info(f"Storing the keras model in the bundle ({str(e)})")
+        arrays = {KERAS_BLOB: _keras_blob(model)}
+
+    manifest = write_bundle(output_path, manifest, arrays)
+    logger.info(f"Model bundle {manifest['bundle_id']} written to {output_path} (run {manifest['run_id']})")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or inspect a versioned model bundle")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Bundle an existing .h5 model and its pickles")
+    build_parser.add_argument('model_path', nargs='?', default='models/chatbot_model_improved.h5')
+    build_parser.add_argument('output_path', nargs='?', help="Defaults to the model path with a .bundle extension")
+    build_parser.add_argument('--classes', default=None, help="classes.pkl (default: next to the model)")
+    build_parser.add_argument('--words', default=None, help="words.pkl (default: next to the model)")
+    build_parser.add_argument('--model-info', default=None, help="model_info.pkl (default: next to the model)")
+    build_parser.add_argument('--run-id', default=None)
+    build_parser.add_argument('--atol', type=float, default=1e-4)
+
+    inspect_parser = subparsers.add_parser('inspect', help="Print the manifest of a bundle")
+    inspect_parser.add_argument('bundle_path')
+    args = parser.parse_args()
+
+    if args.command == 'inspect':
+        print(json.dumps(ModelBundle.load(args.bundle_path).describe(), indent=2))
+        sys.exit(0)
+
+    model_dir = os.path.dirname(args.model_path)
+
+    def _load_pickle(path, default):
+        # Legacy artifacts only: the bundle itself never uses pickle
+        if not os.path.exists(path):
+            return default
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+
+    classes = _load_pickle(args.classes or os.path.join(model_dir, 'classes.pkl'), None)
+    if classes is None:
+        parser.error("classes.pkl not found")
+    words = _load_pickle(args.words or os.path.join(model_dir, 'words.pkl'), [])
+    model_info = _load_pickle(args.model_info or os.path.join(model_dir, 'model_info.pkl'), {})
+
+    import tensorflow as tf
+    import tensorflow_hub as hub
+    keras_model = tf.keras.models.load_model(args.model_path, custom_objects={'KerasLayer': hub.KerasLayer}, compile=False)
+    output_path = args.output_path or os.path.splitext(args.model_path)[0] + '.bundle'
+    written = export_bundle(
+        keras_model,
+        output_path,
+        embedding_method=model_info.get('embedding_method', 'bow'),
+        classes=classes,
+        words=words,
+        max_seq_len=model_info.get('max_seq_len'),
+        run_id=args.run_id,
+        atol=args.atol
+    )
+    print(f"Bundled {args.model_path} -> {output_path} (bundle {written['bundle_id']})")
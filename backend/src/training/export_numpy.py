@@ -0,0 +1,181 @@
+# export_numpy.py
+import os
+import sys
+import argparse
+import numpy as np
+
+# Add the parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import setup_logger
+from prediction.numpy_model import NumpyDenseModel
+
+# Set up logger
+logger = setup_logger("export_numpy")
+
+
+def _layer_ops(model):
+    """
+    Convert keras layers into a flat list of affine operations
+
+    Returns:
+        List of dicts with kind 'dense' (kernel, bias, activation) or
+        'affine' (scale, shift) for BatchNormalization
+    """
+    ops = []
+    for layer in model.layers:
+        kind = layer.__class__.__name__
+        if kind == 'Dense':
+            kernel, bias = (layer.get_weights() + [None])[:2]
+            if bias is None:
+                bias = np.zeros(kernel.shape[1], dtype=kernel.dtype)
+            ops.append({
+                'kind': 'dense',
+                'kernel': kernel.astype(np.float64),
+                'bias': bias.astype(np.float64),
+                'activation': layer.get_config().get('activation', 'linear')
+            })
+        elif kind == 'BatchNormalization':
+            config = layer.get_config()
+            weights = list(layer.get_weights())
+            gamma = weights.pop(0) if config.get('scale', True) else None
+            beta = weights.pop(0) if config.get('center', True) else None
+            moving_mean, moving_var = weights
+            if gamma is None:
+                gamma = np.ones_like(moving_mean)
+            if beta is None:
+                beta = np.zeros_like(moving_mean)
+            scale = gamma / np.sqrt(moving_var + config.get('epsilon', 1e-3))
+            ops.append({
+                'kind': 'affine',
+                'scale': scale.astype(np.float64),
+                'shift': (beta - moving_mean * scale).astype(np.float64)
+            })
+        elif kind in ('Dropout', 'InputLayer'):
+            # Dropout is the identity at inference time
+            continue
+        else:
+            raise ValueError(f"Layer type {kind} cannot be exported to the numpy runtime")
+    return ops
+
+
+def _fold_batch_norm(ops):
+    """
+    Fold every BatchNormalization into an adjacent Dense layer
+
+    A BN that follows a linear Dense is folded into it; otherwise (the
+    Dense -> ReLU -> BN layout used by our training scripts) it is folded
+    into the inputs of the next Dense layer. A trailing BN is kept as a
+    linear layer with a diagonal kernel.
+    """
+    folded = []
+    pending = None  # (scale, shift) waiting for the next Dense
+    for op in ops:
+        if op['kind'] == 'affine':
+            scale, shift = op['scale'], op['shift']
+            if pending is not None:
+                scale, shift = pending[0] * scale, pending[1] * scale + shift
+                pending = None
+            if folded and folded[-1]['activation'] == 'linear':
+                previous = folded[-1]
+                previous['kernel'] = previous['kernel'] * scale
+                previous['bias'] = previous['bias'] * scale + shift
+            else:
+                pending = (scale, shift)
+        else:
+            if pending is not None:
+                scale, shift = pending
+                op['bias'] = shift @ op['kernel'] + op['bias']
+                op['kernel'] = scale[:, None] * op['kernel']
+                pending = None
+            folded.append(op)
+
+    if pending is not None:
+        scale, shift = pending
+        folded.append({
+            'kind': 'dense',
+            'kernel': np.diag(scale),
+            'bias': shift,
+            'activation': 'linear'
+        })
+    return folded
+
+
+def convert_model(model):
+    """
+    Convert a keras Dense/BatchNormalization/Dropout stack to NumpyDenseModel
+
+    Args:
+        model: Trained keras model
+
+    Returns:
+        NumpyDenseModel with BatchNormalization folded into the Dense layers
+    """
+    ops = _fold_batch_norm(_layer_ops(model))
+    if not ops:
+        raise ValueError("Model has no Dense layers to export")
+    layers = [(op['kernel'], op['bias'], op['activation']) for op in ops]
+    return NumpyDenseModel(layers, input_dim=model.input_shape[-1])
+
+
+def verify_export(model, numpy_model, num_samples=256, binary=False, seed=0):
+    """
+    Compare keras and numpy predictions on random inputs
+
+    Args:
+        model: Keras model
+        numpy_model: Converted NumpyDenseModel
+        num_samples: Number of random inputs
+        binary: Draw 0/1 inputs (bag of words) instead of normal noise (USE)
+        seed: Random seed
+
+    Returns:
+        Maximum absolute difference between the two predictions
+    """
+    rng = np.random.default_rng(seed)
+    shape = (num_samples, numpy_model.input_dim)
+    if binary:
+        samples = (rng.random(shape) < 0.02).astype(np.float32)
+    else:
+        samples = rng.normal(size=shape).astype(np.float32)
+    expected = model.predict(samples, verbose=0)
+    actual = numpy_model.predict(samples)
+    return float(np.max(np.abs(expected - actual)))
+
+
+def export_numpy_model(model, output_path, atol=1e-4):
+    """
+    Export a trained keras model to the numpy runtime format
+
+    Args:
+        model: Trained keras model
+        output_path: Destination .npz path
+        atol: Maximum tolerated absolute difference from the keras predictions
+
+    Returns:
+        Maximum absolute difference observed during verification
+    """
+    numpy_model = convert_model(model)
+    max_diff = max(
+        verify_export(model, numpy_model, binary=True),
+        verify_export(model, numpy_model, binary=False)
+    )
+    if max_diff > atol:
+        raise ValueError(f"Exported model differs from keras by {max_diff:.2e} (tolerance {atol:.0e})")
+
+    numpy_model.save(output_path)
+    logger.info(f"Numpy model exported to {output_path} ({len(numpy_model.layers)} layers, max diff {max_diff:.2e})")
+    return max_diff
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a trained .h5 model to the numpy runtime format")
+    parser.add_argument('model_path', nargs='?', default='models/chatbot_model_improved.h5')
+    parser.add_argument('output_path', nargs='?', help="Defaults to the model path with a .npz extension")
+    parser.add_argument('--atol', type=float, default=1e-4)
+    args = parser.parse_args()
+
+    import tensorflow as tf
+    keras_model = tf.keras.models.load_model(args.model_path, compile=False)
+    output_path = args.output_path or os.path.splitext(args.model_path)[0] + '.npz'
+    diff = export_numpy_model(keras_model, output_path, atol=args.atol)
+    print(f"Exported {args.model_path} -> {output_path} (max abs diff {diff:.2e})")
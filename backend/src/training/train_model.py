@@ -1,4 +1,17 @@
 # src/training/train_model.py
+import os
+import sys
+
+# Add the parent directories to path to import utils and config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.thread_policy import ThreadPolicy
+from config import get_config
+
+# OpenMP and MKL read their thread counts when first loaded: export them before numpy and tensorflow
+thread_policy = ThreadPolicy.from_config(get_config())
+thread_policy.apply_environment()
+
 import json
 import pickle
 import numpy as np
@@ -6,12 +19,10 @@ import tensorflow as tf
 import random
 import nltk
 from nltk.stem import WordNetLemmatizer
-import os
-import sys
 
-# Add the parent directory to path to import utils
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.logger import setup_logger
+from training.export_numpy import export_numpy_model
+from training.export_bundle import export_bundle
 
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, Dropout, BatchNormalization
@@ -26,6 +37,10 @@ def train_model(num_epochs: int):
     
     logger.info("Starting model training process")
     
+    # Size the TensorFlow thread pools before the first op
+    thread_policy.apply_tensorflow()
+    thread_policy.pin()
+    
     # Download required NLTK resources
     logger.info("Downloading NLTK resources")
     nltk.download('punkt')
@@ -206,6 +221,25 @@ def train_model(num_epochs: int):
     model.save('models/chatbot_model.h5')
     logger.info("Model saved to models/chatbot_model.h5")
     
+    # Export a tensorflow-free copy for serving with the numpy runtime
+    try:
+        export_numpy_model(model, 'models/chatbot_model.npz')
+    except Exception as e:
+        logger.error(f"Numpy export failed: {str(e)}")
+    
+    # One versioned file with the model, classes and vocabulary of this run
+    try:
+        export_bundle(
+            model,
+            'models/chatbot_model.bundle',
+            embedding_method='bow',
+            classes=classes,
+            words=words,
+            metrics={"best_train_accuracy": float(best_train_accuracy), "epochs": len(hist.epoch)}
+        )
+    except Exception as e:
+        logger.error(f"Model bundle export failed: {str(e)}")
+    
     return {
         'words': words,
         'classes': classes,
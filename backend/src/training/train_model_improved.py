@@ -1,4 +1,17 @@
 # train_model_improved.py
+import os
+import sys
+
+# Add the parent directories to path to import utils and config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.thread_policy import ThreadPolicy
+from config import get_config
+
+# OpenMP and MKL read their thread counts when first loaded: export them before numpy and tensorflow
+thread_policy = ThreadPolicy.from_config(get_config())
+thread_policy.apply_environment()
+
 import json
 import pickle
 import numpy as np
@@ -6,16 +19,14 @@ import tensorflow as tf
 import random
 import nltk
 from nltk.stem import WordNetLemmatizer
-import os
-import sys
 import tensorflow_hub as hub
 import nlpaug.augmenter.word as naw
 import mlflow
 import mlflow.keras
 
-# Add the parent directory to path to import utils
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.logger import setup_logger
+from training.export_numpy import export_numpy_model
+from training.export_bundle import export_bundle
 
 from tensorflow.keras.models import Sequential, Model
 from tensorflow.keras.layers import Dense, Dropout, BatchNormalization, Input, Embedding, LSTM, Bidirectional
@@ -37,6 +48,10 @@ def train_model(num_epochs=200, use_data_augmentation=True, embedding_method="us
     
     logger.info(f"Starting improved model training process with {embedding_method} embeddings")
     
+    # Size the TensorFlow thread pools before the first op
+    thread_policy.apply_tensorflow()
+    thread_policy.pin()
+    
     # Set up MLflow tracking
     mlflow.set_experiment("chatbot_intent_classification")
     
@@ -340,6 +355,28 @@ def train_model(num_epochs=200, use_data_augmentation=True, embedding_method="us
         model.save('models/chatbot_model_improved.h5')
         logger.info("Model saved to models/chatbot_model_improved.h5")
         
+        # The dense USE head can be served by the numpy runtime; the LSTM model cannot
+        if embedding_method == "use":
+            try:
+                export_numpy_model(model, 'models/chatbot_model_improved.npz')
+            except Exception as e:
+                logger.error(f"Numpy export failed: {str(e)}")
+        
+        # One versioned file with the model, classes and vocabulary of this run
+        try:
+            export_bundle(
+                model,
+                'models/chatbot_model_improved.bundle',
+                embedding_method=embedding_method,
+                classes=classes,
+                words=words if embedding_method == "lstm" else None,
+                max_seq_len=max_seq_len if embedding_method == "lstm" else None,
+                run_id=mlflow.active_run().info.run_id,
+                metrics={"best_train_accuracy": float(best_train_accuracy), "epochs_trained": len(hist.epoch)}
+            )
+        except Exception as e:
+            logger.error(f"Model bundle export failed: {str(e)}")
+        
         # Log model to MLflow
         mlflow.keras.log_model(model, "model")
         
@@ -0,0 +1,24 @@
+# admin_auth.py
+import hmac
+
+
+def admin_access_error(headers, admin_token):
+    """
+    Check the X-Admin-Token header of a request to the admin endpoints
+
+    Shared by the Flask and the ASGI routes, which wrap the result in their
+    own response type.
+
+    Args:
+        headers: Request headers (any mapping with get)
+        admin_token: Configured ADMIN_TOKEN, empty when the endpoints are disabled
+
+    Returns:
+        Tuple of (error message, HTTP status) when the request is refused, otherwise None
+    """
+    if not admin_token:
+        return "Admin endpoints are disabled (set ADMIN_TOKEN)", 404
+    # Compared as bytes: compare_digest rejects str with non-ASCII characters
+    if not hmac.compare_digest(headers.get('X-Admin-Token', '').encode(), admin_token.encode()):
+        return "Invalid admin token", 403
+    return None
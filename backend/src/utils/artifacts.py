@@ -0,0 +1,115 @@
+# artifacts.py
+import os
+import sys
+import shutil
+import argparse
+
+# Add the parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger("artifacts")
+
+# NLTK resources needed at serving time and where nltk.data.find looks for them
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'wordnet': 'corpora/wordnet',
+}
+
+USE_MODEL_URL = "https://tfhub.dev/google/universal-sentence-encoder/4"
+
+
+def configure_nltk(data_dir=None, offline=False):
+    """
+    Make the NLTK resources available, downloading only what is missing
+
+    Args:
+        data_dir: Local nltk_data directory searched first (and downloaded into)
+        offline: Never download; raise if a resource is missing
+
+    Raises:
+        LookupError: if offline and a resource cannot be found locally
+    """
+    import nltk
+
+    if data_dir and data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+
+    for name, resource in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(resource)
+            continue
+        except LookupError:
+            if offline:
+                raise LookupError(
+                    f"NLTK resource '{name}' not found in {nltk.data.path}; "
+                    f"run utils/artifacts.py to fetch it into {data_dir}"
+                )
+        logger.info(f"Downloading NLTK resource '{name}'")
+        nltk.download(name, quiet=True, download_dir=data_dir)
+
+
+def resolve_use_model(local_path=None, offline=False):
+    """
+    Get the location to load the Universal Sentence Encoder from
+
+    Args:
+        local_path: Directory holding the USE SavedModel
+        offline: Never fall back to the tfhub.dev URL
+
+    Returns:
+        local_path if it holds a SavedModel, otherwise the tfhub.dev URL
+
+    Raises:
+        FileNotFoundError: if offline and the local SavedModel is missing
+    """
+    if local_path and os.path.exists(os.path.join(local_path, 'saved_model.pb')):
+        return local_path
+    if offline:
+        raise FileNotFoundError(
+            f"Universal Sentence Encoder SavedModel not found at {local_path}; "
+            f"run utils/artifacts.py to fetch it"
+        )
+    logger.warning(f"Local USE model not found at {local_path}, loading from {USE_MODEL_URL}")
+    return USE_MODEL_URL
+
+
+def fetch_artifacts(nltk_data_dir, use_model_path=None):
+    """
+    Download everything the serving path needs into the artifact directory
+
+    Args:
+        nltk_data_dir: Destination for the NLTK resources
+        use_model_path: Destination for the USE SavedModel, skipped if None
+    """
+    import nltk
+
+    os.makedirs(nltk_data_dir, exist_ok=True)
+    for name in NLTK_RESOURCES:
+        logger.info(f"Fetching NLTK resource '{name}' into {nltk_data_dir}")
+        nltk.download(name, quiet=True, download_dir=nltk_data_dir)
+
+    if use_model_path:
+        import tensorflow_hub as hub
+
+        logger.info(f"Fetching Universal Sentence Encoder into {use_model_path}")
+        cached = hub.resolve(USE_MODEL_URL)
+        if os.path.exists(use_model_path):
+            shutil.rmtree(use_model_path)
+        shutil.copytree(cached, use_model_path)
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    from config import get_config
+
+    app_config = get_config()
+    parser = argparse.ArgumentParser(description="Fetch NLTK data and the USE SavedModel for offline startup")
+    parser.add_argument('--nltk-data-dir', default=app_config.NLTK_DATA_DIR)
+    parser.add_argument('--use-model-path', default=app_config.USE_MODEL_PATH)
+    parser.add_argument('--skip-use', action='store_true', help="Only fetch the NLTK resources")
+    args = parser.parse_args()
+
+    fetch_artifacts(args.nltk_data_dir, None if args.skip_use else args.use_model_path)
+    print(f"Artifacts ready: {args.nltk_data_dir}" + ("" if args.skip_use else f", {args.use_model_path}"))
@@ -0,0 +1,118 @@
+# cache.py
+import re
+import time
+import threading
+from collections import OrderedDict
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message):
+    """
+    Fold case, punctuation and whitespace so equivalent messages share a key
+
+    Args:
+        message: Raw user message
+
+    Returns:
+        Normalized message text
+    """
+    text = _NON_WORD.sub("", message.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with optional TTL and hit/miss counters
+    """
+
+    def __init__(self, max_size=1024, ttl=None):
+        """
+        Initialize the cache
+
+        Args:
+            max_size: Maximum number of entries; 0 disables the cache
+            ttl: Seconds an entry stays valid, None for no expiry
+        """
+        self.max_size = max(0, int(max_size))
+        self.ttl = ttl if ttl else None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def get(self, key, default=None):
+        """
+        Look up a key and mark it as most recently used
+
+        Args:
+            key: Cache key
+            default: Returned on a miss or an expired entry
+
+        Returns:
+            Cached value or default
+        """
+        if not self.enabled:
+            return default
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least recently used entries when full
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """
+        Get cache metrics
+
+        Returns:
+            dict with size, bounds and hit/miss counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
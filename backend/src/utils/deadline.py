@@ -0,0 +1,64 @@
+# deadline.py
+import math
+import time
+
+
+class Deadline:
+    """
+    Time budget of one request, shared by every stage of the pipeline
+    """
+
+    def __init__(self, seconds=None):
+        """
+        Start the budget now
+
+        Args:
+            seconds: Time budget in seconds, None or 0 for no limit
+        """
+        self.seconds = seconds if seconds and seconds > 0 else None
+        self.started_at = time.monotonic()
+        self.at = self.started_at + self.seconds if self.seconds else None
+
+    @classmethod
+    def from_header(cls, value, default=None, maximum=None):
+        """
+        Build a deadline from an X-Request-Deadline header value
+
+        Args:
+            value: Header value in seconds ("2.5") or milliseconds ("2500ms"); None uses the default
+            default: Budget in seconds when the header is missing or invalid
+            maximum: Upper bound on the budget a client may ask for
+
+        Returns:
+            Deadline instance
+        """
+        seconds = default
+        if value:
+            text = value.strip().lower()
+            try:
+                seconds = float(text[:-2]) / 1000.0 if text.endswith("ms") else float(text)
+            except ValueError:
+                seconds = default
+            if seconds is None or not math.isfinite(seconds) or seconds <= 0:
+                seconds = default
+        if maximum and (not seconds or seconds > maximum):
+            seconds = maximum
+        return cls(seconds)
+
+    def remaining(self):
+        """Seconds left, math.inf when unlimited (never negative)"""
+        if self.at is None:
+            return math.inf
+        return max(0.0, self.at - time.monotonic())
+
+    def timeout(self):
+        """Seconds left for APIs taking a timeout, None when unlimited"""
+        return None if self.at is None else self.remaining()
+
+    @property
+    def expired(self):
+        return self.at is not None and time.monotonic() >= self.at
+
+    def elapsed(self):
+        """Seconds since the request started"""
+        return time.monotonic() - self.started_at
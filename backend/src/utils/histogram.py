@@ -0,0 +1,55 @@
+# histogram.py
+import bisect
+import threading
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram safe to update from several threads
+    """
+
+    def __init__(self, buckets):
+        """
+        Initialize the histogram
+
+        Args:
+            buckets: Sorted upper bounds of the buckets; an overflow bucket is added
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Record one value"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        """
+        Get a consistent copy of the histogram
+
+        Returns:
+            dict with cumulative bucket counts keyed by upper bound, count and sum
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+            count = self._count
+
+        cumulative = {}
+        running = 0
+        for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+            running += bucket_count
+            cumulative[str(bound)] = running
+
+        return {
+            "buckets": cumulative,
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0
+        }
@@ -0,0 +1,106 @@
+# intents_store.py
+import json
+import random
+import hashlib
+from collections import namedtuple
+from types import MappingProxyType
+
+# One intent of intents.json; patterns and responses are tuples, extra keys are read-only metadata
+Intent = namedtuple("Intent", ["tag", "patterns", "responses", "metadata"])
+
+
+class IntentsStore:
+    """
+    Intents parsed once into an immutable tag -> Intent mapping
+
+    Built at startup and shared by the response manager, the intent
+    classifier and the routes, so answering never reads or parses
+    intents.json on the request path.
+    """
+
+    def __init__(self, intents_data, path=None, version=None):
+        """
+        Build the store
+
+        Args:
+            intents_data: Parsed intents.json ({"intents": [{"tag", "patterns", "responses", ...}, ...]})
+            path: File the data was read from, kept for reference
+            version: Content hash of that file, None when built from data
+        """
+        self.path = path
+        self.version = version
+        intents = {}
+        for item in intents_data.get("intents", []):
+            tag = item.get("tag")
+            # The first definition of a tag wins, as with the former linear scan
+            if not tag or tag in intents:
+                continue
+            intents[tag] = Intent(
+                tag=tag,
+                patterns=tuple(item.get("patterns", [])),
+                responses=tuple(item.get("responses", [])),
+                metadata=MappingProxyType({key: value for key, value in item.items()
+                                           if key not in ("tag", "patterns", "responses")})
+            )
+        self._intents = MappingProxyType(intents)
+        self.tags = tuple(intents)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Read and parse an intents.json file
+
+        Args:
+            path: Path to the intents file
+
+        Returns:
+            IntentsStore versioned by a hash of the file content
+
+        Raises:
+            OSError, ValueError: if the file cannot be read or parsed
+        """
+        with open(path, 'rb') as file:
+            raw = file.read()
+        return cls(json.loads(raw.decode('utf-8')), path=path, version=hashlib.sha256(raw).hexdigest()[:12])
+
+    @classmethod
+    def empty(cls):
+        """Store without intents, used when the file could not be loaded"""
+        return cls({"intents": []})
+
+    def __len__(self):
+        return len(self._intents)
+
+    def __contains__(self, tag):
+        return tag in self._intents
+
+    def __iter__(self):
+        """Intents in file order"""
+        return iter(self._intents.values())
+
+    def get(self, tag):
+        """Intent for a tag, or None"""
+        return self._intents.get(tag)
+
+    def responses(self, tag):
+        """Responses of an intent, empty for an unknown tag"""
+        intent = self._intents.get(tag)
+        return intent.responses if intent else ()
+
+    def patterns(self, tag):
+        """Patterns of an intent, empty for an unknown tag"""
+        intent = self._intents.get(tag)
+        return intent.patterns if intent else ()
+
+    def random_response(self, tag):
+        """
+        Pick one of an intent's responses
+
+        Args:
+            tag: Intent tag
+
+        Returns:
+            Response string, or None for an unknown tag or an intent without responses
+        """
+        responses = self.responses(tag)
+        return random.choice(responses) if responses else None
@@ -1,37 +1,330 @@
-import os 
+import os
+import sys
+import glob
+import time
+import queue
+import atexit
 import logging
-from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-def setup_logger(name='chatbot'):
+# Line layout of the console and the log files
+LOG_FORMAT = '%(asctime)4s | %(name)4s | %(levelname)4s | %(message)s'
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+ROTATION_MODES = ('daily', 'size', 'none')
+
+# backend/logs, used until configure_logging applies LOG_DIR
+DEFAULT_LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'logs')
+
+
+def parse_sampling(spec):
     """
-    Set up a logger that writes to both console and file
+    Parse per-logger sampling rates such as "intent_classifier=0.1,chat_routes=0.25"
+
+    Args:
+        spec: Comma separated logger=rate pairs, rates from 0 to 1
+
+    Returns:
+        dict of logger name -> rate
+    """
+    rates = {}
+    for part in (spec or "").split(","):
+        name, _, rate = part.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class DailyFileHandler(logging.FileHandler):
+    """
+    File handler writing to <prefix>_<YYYYMMDD>.log and moving on to the
+    next day's file at midnight
+
+    Nothing is renamed, so several processes appending to the same files
+    (gunicorn workers) roll over without racing each other.
+    """
+
+    def __init__(self, prefix, backup_count=0, encoding="utf-8"):
+        """
+        Initialize the handler
+
+        Args:
+            prefix: Path of the files without the date suffix
+            backup_count: Days of older files kept, 0 keeps them all
+            encoding: File encoding
+        """
+        self.prefix = prefix
+        self.backup_count = backup_count
+        self._day = time.strftime("%Y%m%d")
+        super().__init__(self._path(self._day), delay=True, encoding=encoding)
+
+    def _path(self, day):
+        return f"{self.prefix}_{day}.log"
+
+    def emit(self, record):
+        day = time.strftime("%Y%m%d", time.localtime(record.created))
+        if day != self._day:
+            self._day = day
+            if self.stream is not None:
+                self.stream.close()
+                # FileHandler.emit opens baseFilename again when the stream is None
+                self.stream = None
+            self.baseFilename = os.path.abspath(self._path(day))
+            self._remove_old_files()
+        super().emit(record)
+
+    def _remove_old_files(self):
+        """Delete the oldest daily files beyond backup_count"""
+        if not self.backup_count:
+            return
+        # Called before the new day's file is created, so every match is an older day
+        files = sorted(glob.glob(f"{glob.escape(self.prefix)}_[0-9]*.log"))
+        for path in files[:-self.backup_count]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class _PerLoggerFileHandler(logging.Handler):
+    """Route each record to the file of its logger, opened on first use"""
+
+    def __init__(self, log_dir, rotation, max_bytes, backup_count):
+        super().__init__()
+        self.log_dir = log_dir
+        self.rotation = rotation
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._handlers = {}
+
+    def _file_handler(self, name):
+        os.makedirs(self.log_dir, exist_ok=True)
+        prefix = os.path.join(self.log_dir, name)
+        if self.rotation == 'size':
+            # Renames on rollover: meant for a single process per log directory
+            handler = RotatingFileHandler(f"{prefix}.log", maxBytes=self.max_bytes,
+                                          backupCount=self.backup_count, delay=True, encoding="utf-8")
+        elif self.rotation == 'daily':
+            handler = DailyFileHandler(prefix, backup_count=self.backup_count)
+        else:
+            handler = logging.FileHandler(f"{prefix}.log", delay=True, encoding="utf-8")
+        handler.setFormatter(self.formatter)
+        return handler
+
+    def emit(self, record):
+        # Only the listener thread emits, so the dict needs no lock
+        handler = self._handlers.get(record.name)
+        if handler is None:
+            try:
+                handler = self._handlers[record.name] = self._file_handler(record.name)
+            except OSError:
+                self.handleError(record)
+                return
+        handler.handle(record)
+
+    def close(self):
+        for handler in self._handlers.values():
+            handler.close()
+        self._handlers.clear()
+        super().close()
+
+
+class _SamplingFilter(logging.Filter):
+    """
+    Keep a share of the INFO and DEBUG lines of chosen loggers
+
+    The decision is taken per request from its trace id, so a request
+    keeps all of its lines or none of them, and traced requests keep all
+    of them. Lines outside a request (startup, background threads) and
+    warnings and errors are never dropped.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        rate = self.rates.get(record.name)
+        if rate is None or record.levelno > logging.INFO:
+            return True
+        # Looked up lazily: utils.tracing logs through this module
+        tracing = sys.modules.get("utils.tracing")
+        span = tracing.tracer.current_span() if tracing else None
+        if span is None or span.trace_id is None or span.sampled:
+            return True
+        return int(span.trace_id[-8:], 16) < rate * 0x100000000
+
+
+class _NonBlockingQueueHandler(QueueHandler):
     """
-    
-    os.makedirs('logs', exist_ok=True)
-    
-    # create the logger 
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
-    if not logger.handlers:
-        # create a file handler 
-        log_file = f"logs/{name}_{datetime.now().strftime('%Y%m%d')}.log"
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.INFO)
-        
-        # create console handler 
+    Queue handler that leaves formatting to the listener thread
+
+    The stock QueueHandler formats the message in the logging thread;
+    here only a traceback is rendered there (its frames may not survive),
+    and records are dropped and counted rather than blocking when the
+    queue is full.
+    """
+
+    def __init__(self, log_queue, max_size=0):
+        super().__init__(log_queue)
+        # Enforced here rather than by the queue, so the listener's stop sentinel always fits
+        self.max_size = max_size
+        self.dropped = 0
+
+    def prepare(self, record):
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.max_size and self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+
+class LogPipeline:
+    """
+    Every module logger writes to one queue; a single background thread
+    formats the records and writes the console and the files
+    """
+
+    def __init__(self):
+        self.level = logging.INFO
+        self.log_dir = DEFAULT_LOG_DIR
+        self.rotation = 'daily'
+        self.max_bytes = 10 * 1024 * 1024
+        self.backup_count = 14
+        self.queue_size = 10000
+        self.sampling = {}
+        self._loggers = set()
+        self._filter = _SamplingFilter(self.sampling)
+        self._queue_handler = None
+        self._listener = None
+
+    def _targets(self):
+        """Console and file handlers run by the listener thread"""
+        formatter = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
         console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # create the formatter 
-        formatter = logging.Formatter(
-            '%(asctime)4s | %(name)4s | %(levelname)4s | %(message)s',
-            datefmt="%Y-%m-%d %H:%M:%S"
-        )
-        file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
-        
-        #add handlers to the logger 
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
-    return logger
\ No newline at end of file
+        file_handler = _PerLoggerFileHandler(self.log_dir, self.rotation, self.max_bytes, self.backup_count)
+        file_handler.setFormatter(formatter)
+        return console_handler, file_handler
+
+    def _start(self):
+        """Create the queue and start the writer thread"""
+        log_queue = queue.Queue()
+        if self._queue_handler is None:
+            self._queue_handler = _NonBlockingQueueHandler(log_queue)
+            self._queue_handler.addFilter(self._filter)
+        else:
+            self._queue_handler.queue = log_queue
+        self._queue_handler.max_size = self.queue_size
+        self._listener = QueueListener(log_queue, *self._targets(), respect_handler_level=True)
+        self._listener.start()
+
+    def stop(self):
+        """Write out the queued records and stop the writer thread"""
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+
+    def after_fork(self):
+        """Start a writer thread in a forked child (the parent's did not survive the fork)"""
+        if self._listener is None:
+            return
+        self._listener = None
+        self._start()
+
+    def attach(self, logger):
+        """Route a module logger through the queue"""
+        if self._listener is None:
+            self._start()
+        logger.setLevel(self.level)
+        if self._queue_handler not in logger.handlers:
+            logger.addHandler(self._queue_handler)
+        self._loggers.add(logger)
+        return logger
+
+    def configure(self, level=None, log_dir=None, rotation=None, max_bytes=None,
+                  backup_count=None, queue_size=None, sampling=None):
+        """
+        Change the settings; records already queued are written with the old ones
+
+        Args:
+            level: Level name or number of every module logger
+            log_dir: Directory of the log files
+            rotation: 'daily' (<name>_<YYYYMMDD>.log), 'size' (<name>.log, .1, .2, ...) or 'none'
+            max_bytes: Size of a file before 'size' rotation
+            backup_count: Rotated files (or days) kept, 0 keeps all
+            queue_size: Records waiting for the writer before new ones are dropped, 0 for no limit
+            sampling: dict of logger name -> share of request INFO lines kept
+        """
+        if level is not None:
+            self.level = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+        if log_dir is not None:
+            self.log_dir = log_dir
+        if rotation is not None:
+            self.rotation = rotation if rotation in ROTATION_MODES else 'daily'
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        if backup_count is not None:
+            self.backup_count = backup_count
+        if queue_size is not None:
+            self.queue_size = queue_size
+        if sampling is not None:
+            # Updated in place: the filter is already attached to the handler
+            self.sampling.clear()
+            self.sampling.update(sampling)
+
+        for logger in self._loggers:
+            logger.setLevel(self.level)
+        self.stop()
+        self._start()
+
+    def stats(self):
+        """Queue depth and records dropped because the queue was full"""
+        return {
+            "queue_depth": self._queue_handler.queue.qsize() if self._queue_handler else 0,
+            "dropped": self._queue_handler.dropped if self._queue_handler else 0
+        }
+
+
+# One pipeline per process, shared by every module logger
+_pipeline = LogPipeline()
+atexit.register(_pipeline.stop)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_pipeline.after_fork)
+
+
+def configure_logging(app_config):
+    """Apply the LOG_* settings of a config.Config class"""
+    _pipeline.configure(
+        level=app_config.LOG_LEVEL,
+        log_dir=app_config.LOG_DIR,
+        rotation=app_config.LOG_ROTATION,
+        max_bytes=app_config.LOG_MAX_BYTES,
+        backup_count=app_config.LOG_BACKUP_COUNT,
+        queue_size=app_config.LOG_QUEUE_SIZE,
+        sampling=parse_sampling(app_config.LOG_SAMPLING)
+    )
+
+
+def logging_stats():
+    """Queue depth and dropped records of the logging pipeline"""
+    return _pipeline.stats()
+
+
+def setup_logger(name='chatbot'):
+    """
+    Set up a logger that writes to both console and file
+
+    Records are queued and written by one background thread, so logging
+    never waits on the disk or the console. Pass values as arguments
+    (logger.info("intent: %s", intent)) rather than f-strings: the message
+    is then only built for records that are kept, in the writer thread.
+    """
+    return _pipeline.attach(logging.getLogger(name))
@@ -0,0 +1,349 @@
+# metrics.py
+import os
+import bisect
+import threading
+import time
+import weakref
+from collections import namedtuple
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from sub-millisecond local stages to slow Azure calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# A metric computed at scrape time: samples are (labels dict, value) pairs
+MetricFamily = namedtuple("MetricFamily", ["name", "type", "documentation", "samples"])
+
+
+class _Cells:
+    """
+    Per-thread value slots
+
+    Each thread adds to its own list without taking a lock; readers sum the
+    slots of every thread. The lock is only taken the first time a thread
+    touches the metric and when scraping. Slots of finished threads are
+    folded into one retired list, so a server starting a thread per request
+    does not keep a list per request.
+    """
+
+    def __init__(self, size):
+        self._size = size
+        self._local = threading.local()
+        # (weak reference to the thread, its slots) of threads that may still write
+        self._threads = []
+        self._retired = [0] * size
+        self._lock = threading.Lock()
+
+    def mine(self):
+        """Slots of the calling thread"""
+        try:
+            return self._local.cells
+        except AttributeError:
+            cells = [0] * self._size
+            with self._lock:
+                self._retire_dead_threads()
+                self._threads.append((weakref.ref(threading.current_thread()), cells))
+            self._local.cells = cells
+            return cells
+
+    def _retire_dead_threads(self):
+        """Add the slots of finished threads to the retired totals and drop them (lock held)"""
+        live = []
+        for thread_ref, cells in self._threads:
+            thread = thread_ref()
+            if thread is not None and thread.is_alive():
+                live.append((thread_ref, cells))
+            else:
+                for i, value in enumerate(cells):
+                    self._retired[i] += value
+        self._threads = live
+
+    def totals(self):
+        """Sum of every thread's slots"""
+        with self._lock:
+            self._retire_dead_threads()
+            totals = list(self._retired)
+            threads = [cells for _, cells in self._threads]
+        for cells in threads:
+            for i, value in enumerate(cells):
+                totals[i] += value
+        return totals
+
+
+class _Metric:
+    """Base of labelled metrics: one child per label value combination"""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Child for one combination of label values (created on first use)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _items(self):
+        """(labels dict, child) pairs, label-less metrics included"""
+        with self._lock:
+            children = list(self._children.items())
+        return [(dict(zip(self.labelnames, values)), child) for values, child in children]
+
+    def collect(self):
+        """Samples as (suffix, labels dict, value) tuples"""
+        raise NotImplementedError
+
+
+class _CounterChild:
+    def __init__(self):
+        self._cells = _Cells(1)
+
+    def inc(self, amount=1):
+        self._cells.mine()[0] += amount
+
+    def value(self):
+        return self._cells.totals()[0]
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        """Increment the label-less counter"""
+        self.labels().inc(amount)
+
+    def collect(self):
+        return [("", labels, child.value()) for labels, child in self._items()]
+
+
+class _GaugeChild(_CounterChild):
+    def dec(self, amount=1):
+        self._cells.mine()[0] -= amount
+
+
+class _FunctionGaugeChild:
+    """Gauge whose value is read from a function at scrape time"""
+
+    def __init__(self, func):
+        self._func = func
+
+    def value(self):
+        return self._func()
+
+
+class Gauge(_Metric):
+    """Value going up and down, such as requests in progress"""
+
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set_function(self, func):
+        """Report the value returned by func for the label-less gauge"""
+        with self._lock:
+            self._children[()] = _FunctionGaugeChild(func)
+
+    def collect(self):
+        return [("", labels, child.value()) for labels, child in self._items()]
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self._buckets = buckets
+        # One slot per bucket plus overflow, then sum and count
+        self._cells = _Cells(len(buckets) + 3)
+
+    def observe(self, value):
+        cells = self._cells.mine()
+        cells[bisect.bisect_left(self._buckets, value)] += 1
+        cells[-2] += value
+        cells[-1] += 1
+
+    def time(self):
+        """Context manager observing the duration of the block in seconds"""
+        return _Timer(self)
+
+    def snapshot(self):
+        """Cumulative bucket counts, sum and count"""
+        totals = self._cells.totals()
+        cumulative = []
+        running = 0
+        for count in totals[:-2]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-2], totals[-1]
+
+
+class _Timer:
+    """Plain context manager: a few times cheaper than a contextlib generator"""
+
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._histogram.observe(time.perf_counter() - self._start)
+        return False
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets"""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def collect(self):
+        samples = []
+        for labels, child in self._items():
+            cumulative, total, count = child.snapshot()
+            for bound, value in zip(self.buckets + (float("inf"),), cumulative):
+                samples.append(("_bucket", dict(labels, le=_format_value(bound)), value))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, count))
+        return samples
+
+
+def _format_value(value):
+    """Number as written in the exposition format"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    """Escape a label value"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_sample(name, labels, value):
+    """One sample line"""
+    if labels:
+        label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+        return f"{name}{{{label_text}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """
+    Process-wide set of metrics rendered in the Prometheus text format
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self, families=()):
+        """
+        Render every registered metric
+
+        Args:
+            families: Extra MetricFamily objects computed by the caller at scrape time
+
+        Returns:
+            Exposition text
+        """
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric.collect():
+                lines.append(_format_sample(metric.name + suffix, labels, value))
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for labels, value in family.samples:
+                lines.append(_format_sample(family.name, labels, value))
+        return "\n".join(lines) + "\n"
+
+
+# Metrics of the chat service, shared by the classifier, the Azure service, the manager and the routes
+registry = MetricsRegistry()
+
+stage_seconds = registry.histogram(
+    "chatbot_stage_seconds",
+    "Time spent in each stage of answering a message",
+    ("stage",)
+)
+request_seconds = registry.histogram(
+    "chatbot_request_seconds",
+    "Chat request latency by endpoint",
+    ("endpoint",)
+)
+requests_total = registry.counter(
+    "chatbot_responses_total",
+    "Answered messages by endpoint and answer source",
+    ("endpoint", "source")
+)
+requests_in_flight = registry.gauge(
+    "chatbot_requests_in_flight",
+    "Chat requests being processed",
+    ("endpoint",)
+)
+azure_tokens_total = registry.counter(
+    "chatbot_azure_tokens_total",
+    "Tokens billed by Azure OpenAI",
+    ("type",)
+)
+process_start_time = registry.gauge(
+    "chatbot_process_start_time_seconds",
+    "Start time of this process since the epoch (metrics are per worker process)"
+)
+
+# Start of this process; forked gunicorn workers reset it rather than report the master's
+_process_start = time.time()
+
+
+def _reset_process_start():
+    global _process_start
+    _process_start = time.time()
+
+
+process_start_time.set_function(lambda: _process_start)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_process_start)
@@ -0,0 +1,136 @@
+# singleflight.py
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+
+class SingleFlight:
+    """
+    Merges concurrent calls with the same key into one execution
+
+    The first caller for a key (the leader) runs the function; callers
+    arriving while it runs wait for its result or exception instead of
+    starting their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.merged = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def do(self, key, func, timeout=None):
+        """
+        Run func once for every concurrent caller with this key
+
+        Args:
+            key: Hashable key identifying identical calls
+            func: Callable without arguments
+            timeout: Seconds a merged caller waits for the leader, None to wait indefinitely
+
+        Returns:
+            Tuple of (result, shared) where shared is True for merged callers
+
+        Raises:
+            concurrent.futures.TimeoutError: if a merged caller waited longer than timeout
+            Exception: whatever func raised, in the leader and every merged caller
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.leaders += 1
+            else:
+                self.merged += 1
+
+        if not leader:
+            try:
+                return future.result(timeout=timeout), True
+            except FutureTimeoutError:
+                with self._lock:
+                    self.timeouts += 1
+                raise
+
+        try:
+            result = func()
+        except BaseException as e:
+            with self._lock:
+                self.errors += 1
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self):
+        """
+        Get single-flight counters
+
+        Returns:
+            dict with leader, merged, timed out and failed call counts and calls in flight
+        """
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "merged": self.merged,
+                "timeouts": self.timeouts,
+                "errors": self.errors
+            }
+
+
+class AsyncSingleFlight(SingleFlight):
+    """
+    SingleFlight for coroutines on one event loop
+
+    The shared call runs as its own task, so a waiter that is cancelled or
+    times out (the leader included) does not cancel it for the others.
+    """
+
+    async def do(self, key, func, timeout=None):
+        """
+        Await func() once for every concurrent caller with this key
+
+        Args:
+            key: Hashable key identifying identical calls
+            func: Callable without arguments returning an awaitable
+            timeout: Seconds a merged caller waits, None to wait indefinitely
+
+        Returns:
+            Tuple of (result, shared) where shared is True for merged callers
+
+        Raises:
+            asyncio.TimeoutError: if a merged caller waited longer than timeout
+            Exception: whatever the call raised, in every caller
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self.merged += 1
+        else:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            self.leaders += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), timeout if shared else None)
+        except asyncio.TimeoutError:
+            if not task.done():
+                self.timeouts += 1
+            raise
+        return result, shared
+
+    def _finish(self, key, task):
+        """Done callback of a shared call"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
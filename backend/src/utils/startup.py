@@ -0,0 +1,71 @@
+# startup.py
+import os
+import sys
+import time
+import threading
+from contextlib import contextmanager
+
+# Add the parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger("startup")
+
+
+class StartupReport:
+    """
+    Records how long each initialization phase takes
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._phases = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time a startup phase
+
+        Args:
+            name: Phase name shown in the report
+        """
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self._phases.append({
+                    "phase": name,
+                    "start": round(start - self._origin, 4),
+                    "duration": round(duration, 4),
+                    "thread": threading.current_thread().name,
+                    "error": error
+                })
+            logger.info(f"Startup phase '{name}' took {duration:.3f}s" + (f" (failed: {error})" if error else ""))
+
+    def report(self):
+        """
+        Get the recorded phases
+
+        Returns:
+            dict with the phases in completion order and the elapsed time since process start
+        """
+        with self._lock:
+            phases = list(self._phases)
+        return {
+            "started_at": self.started_at,
+            "elapsed": round(time.perf_counter() - self._origin, 4),
+            "phases": phases
+        }
+
+
+# Shared report for the whole process
+startup_report = StartupReport()
@@ -0,0 +1,165 @@
+# thread_policy.py
+import os
+import sys
+
+# Add the parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger("thread_policy")
+
+# Thread counts read by the OpenMP, MKL and OpenBLAS runtimes when they are first loaded
+BLAS_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def parse_cpu_list(spec):
+    """
+    Parse a CPU list such as "0-3,8,10-11"
+
+    Args:
+        spec: Comma separated CPU numbers and inclusive ranges
+
+    Returns:
+        Sorted list of CPU numbers
+    """
+    cpus = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+class ThreadPolicy:
+    """
+    Thread topology of one serving or training process
+
+    TensorFlow sizes its intra-op and inter-op pools, and OpenMP/MKL their
+    own, to every core of the machine. Several gunicorn workers per node
+    then run many times more threads than cores. The policy caps the pools
+    per process and can pin each worker to its own block of cores.
+    """
+
+    def __init__(self, intra_op_threads=0, inter_op_threads=0, blas_threads=0, cpu_affinity=''):
+        """
+        Configure the policy
+
+        Args:
+            intra_op_threads: Threads one TensorFlow op may use, 0 for the TensorFlow default
+            inter_op_threads: TensorFlow ops run concurrently, 0 for the TensorFlow default
+            blas_threads: OpenMP/MKL/OpenBLAS threads, 0 to follow intra_op_threads
+            cpu_affinity: '' to leave scheduling to the OS, 'auto' for a block of
+                intra_op_threads cores per worker, or CPU lists such as '0-3;4-7'
+                (one ';'-separated block per worker, reused round-robin)
+        """
+        self.intra_op_threads = max(0, int(intra_op_threads or 0))
+        self.inter_op_threads = max(0, int(inter_op_threads or 0))
+        self.blas_threads = max(0, int(blas_threads or 0)) or self.intra_op_threads
+        self.cpu_affinity = (cpu_affinity or '').strip()
+
+    @classmethod
+    def from_config(cls, app_config):
+        """Build the policy from a config.Config class"""
+        return cls(
+            intra_op_threads=app_config.TF_INTRA_OP_THREADS,
+            inter_op_threads=app_config.TF_INTER_OP_THREADS,
+            blas_threads=app_config.BLAS_THREADS,
+            cpu_affinity=app_config.CPU_AFFINITY
+        )
+
+    def apply_environment(self):
+        """
+        Export the thread counts for runtimes that read them from the environment
+
+        Only effective for runtimes loaded afterwards: call it before numpy and
+        tensorflow are imported (gunicorn.conf.py, top of the training scripts).
+        """
+        if self.blas_threads:
+            for name in BLAS_ENV_VARS:
+                os.environ[name] = str(self.blas_threads)
+        if self.intra_op_threads:
+            os.environ["TF_NUM_INTRAOP_THREADS"] = str(self.intra_op_threads)
+        if self.inter_op_threads:
+            os.environ["TF_NUM_INTEROP_THREADS"] = str(self.inter_op_threads)
+
+    def apply_tensorflow(self):
+        """
+        Size the TensorFlow thread pools if tensorflow is imported
+
+        Must run before the first TensorFlow op; afterwards the pools are fixed
+        and a warning is logged instead.
+        """
+        tf = sys.modules.get("tensorflow")
+        if tf is None:
+            return
+        try:
+            if self.intra_op_threads:
+                tf.config.threading.set_intra_op_parallelism_threads(self.intra_op_threads)
+            if self.inter_op_threads:
+                tf.config.threading.set_inter_op_parallelism_threads(self.inter_op_threads)
+        except RuntimeError as e:
+            logger.warning(f"TensorFlow thread pools already initialized, keeping them: {str(e)}")
+
+    def apply(self):
+        """Environment and TensorFlow settings, before a model is loaded"""
+        self.apply_environment()
+        self.apply_tensorflow()
+
+    def cpu_set(self, worker_index=None):
+        """
+        CPUs a process should run on
+
+        Args:
+            worker_index: Slot of the worker among its siblings, None for a single process
+
+        Returns:
+            List of CPU numbers, or None to leave the affinity unchanged
+        """
+        if not self.cpu_affinity or not hasattr(os, "sched_getaffinity"):
+            return None
+        if self.cpu_affinity == "auto":
+            if worker_index is None:
+                return None
+            available = sorted(os.sched_getaffinity(0))
+            size = self.intra_op_threads or 1
+            blocks = max(1, len(available) // size)
+            start = (worker_index % blocks) * size
+            return available[start:start + size]
+        blocks = [block for block in self.cpu_affinity.split(";") if block.strip()]
+        return parse_cpu_list(blocks[(worker_index or 0) % len(blocks)])
+
+    def pin(self, worker_index=None):
+        """
+        Restrict this process to its CPUs (Linux only)
+
+        Args:
+            worker_index: Slot of the worker among its siblings, None for a single process
+
+        Returns:
+            The CPUs pinned to, or None
+        """
+        cpus = self.cpu_set(worker_index)
+        if not cpus:
+            return None
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            logger.warning(f"Could not set CPU affinity {cpus}: {str(e)}")
+            return None
+        logger.info(f"Process {os.getpid()} pinned to CPUs {cpus}")
+        return cpus
+
+    def describe(self):
+        """Settings as a dict, for logs and stats"""
+        return {
+            "intra_op_threads": self.intra_op_threads or None,
+            "inter_op_threads": self.inter_op_threads or None,
+            "blas_threads": self.blas_threads or None,
+            "cpu_affinity": self.cpu_affinity or None
+        }
@@ -0,0 +1,392 @@
+# tracing.py
+import os
+import sys
+import json
+import time
+import random
+import inspect
+import importlib
+import threading
+import functools
+import contextvars
+
+# Add the parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger("tracing")
+
+# Request and response header carrying the trace id
+TRACE_HEADER = "X-Trace-Id"
+
+# Characters accepted in a caller-supplied trace id
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+# Innermost open span of the running request (contextvars follow asyncio tasks and WorkerPool tasks)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id(size=8):
+    """Random hex id of size bytes (ids need not be unpredictable, so no urandom syscall)"""
+    return f"{random.getrandbits(size * 8):0{size * 2}x}"
+
+
+class Span:
+    """
+    One timed operation of a sampled trace
+    """
+
+    sampled = True
+    __slots__ = ("trace_id", "name", "span_id", "parent_id", "start", "duration_ms",
+                 "attributes", "error", "_spans", "_perf_start")
+
+    def __init__(self, name, trace_id, parent_id, spans, attributes):
+        self.trace_id = trace_id
+        self.name = name
+        self.span_id = _new_id()
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.duration_ms = None
+        self.attributes = attributes
+        self.error = None
+        # Finished spans of the whole trace, shared by every span of it
+        self._spans = spans
+        self._perf_start = time.perf_counter()
+
+    def set_attribute(self, key, value):
+        """Attach a value to the span"""
+        self.attributes[key] = value
+
+    def end(self, error=None):
+        """Stop the clock and add the span to its trace"""
+        self.duration_ms = (time.perf_counter() - self._perf_start) * 1000.0
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        # list.append is atomic, spans may finish on pool threads
+        self._spans.append(self)
+
+    def to_dict(self):
+        """Span as exported"""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class UnsampledSpan:
+    """
+    Root of a request left out by sampling: keeps the trace id for the
+    response header, records nothing and disables the spans below it
+    """
+
+    sampled = False
+    __slots__ = ("trace_id",)
+
+    def __init__(self, trace_id):
+        self.trace_id = trace_id
+
+    def set_attribute(self, key, value):
+        pass
+
+
+class _NoopScope:
+    """Span scope used when the request is not sampled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return _NOOP_SPAN
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_SPAN = UnsampledSpan(None)
+_NOOP_SCOPE = _NoopScope()
+
+
+class _SpanScope:
+    """Context manager opening a child span of the current one"""
+
+    __slots__ = ("_span", "_token")
+
+    def __init__(self, span):
+        self._span = span
+
+    def __enter__(self):
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, traceback):
+        _current_span.reset(self._token)
+        self._span.end(exc)
+        return False
+
+
+class _TraceScope:
+    """Context manager around a whole request: exports the trace when it closes"""
+
+    __slots__ = ("_tracer", "_root", "_token")
+
+    def __init__(self, tracer, root):
+        self._tracer = tracer
+        self._root = root
+
+    def __enter__(self):
+        self._token = _current_span.set(self._root)
+        return self._root
+
+    def __exit__(self, exc_type, exc, traceback):
+        _current_span.reset(self._token)
+        if self._root.sampled:
+            self._root.end(exc)
+            self._tracer.export(self._root._spans)
+        return False
+
+
+class SpanExporter:
+    """
+    Destination of finished traces
+
+    Subclasses implement export; TRACE_EXPORTER may name one as
+    'package.module.ClassName' (built without arguments).
+    """
+
+    def export(self, spans):
+        """
+        Write the spans of one finished trace
+
+        Args:
+            spans: List of span dicts, children before their parents
+        """
+        raise NotImplementedError
+
+    def shutdown(self):
+        """Flush and release resources"""
+
+
+class NullExporter(SpanExporter):
+    """Drop every trace (spans are still created for sampled requests)"""
+
+    def export(self, spans):
+        pass
+
+
+class LogExporter(SpanExporter):
+    """Write each trace to the tracing logger"""
+
+    def export(self, spans):
+        logger.info(json.dumps(spans))
+
+
+class JsonlExporter(SpanExporter):
+    """
+    Append one JSON line per span to a file
+
+    Each trace is written with a single append, so the lines of several
+    gunicorn workers sharing the file do not interleave within a trace.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the exporter
+
+        Args:
+            path: JSONL file, created with its directory on first export
+        """
+        self.path = path
+        self._file = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        # Reopened in a forked worker rather than sharing the parent's buffered file object
+        if self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._pid = os.getpid()
+        return self._file
+
+    def export(self, spans):
+        data = "".join(json.dumps(span) + "\n" for span in spans)
+        with self._lock:
+            try:
+                file = self._open()
+                file.write(data)
+                file.flush()
+            except OSError as e:
+                logger.warning(f"Could not write trace to {self.path}: {str(e)}")
+
+    def shutdown(self):
+        with self._lock:
+            if self._file is not None and self._pid == os.getpid():
+                self._file.close()
+            self._file = None
+            self._pid = None
+
+
+def create_exporter(name, path=None):
+    """
+    Build an exporter from its configured name
+
+    Args:
+        name: 'jsonl', 'log', 'none' or the dotted path of a SpanExporter subclass
+        path: File of the 'jsonl' exporter
+
+    Returns:
+        SpanExporter instance
+    """
+    name = (name or "none").strip()
+    if name == "jsonl":
+        return JsonlExporter(path)
+    if name == "log":
+        return LogExporter()
+    if name == "none":
+        return NullExporter()
+    module_name, _, class_name = name.rpartition(".")
+    try:
+        exporter_class = getattr(importlib.import_module(module_name), class_name)
+        return exporter_class()
+    except (ImportError, AttributeError, ValueError) as e:
+        logger.error(f"Unknown trace exporter '{name}', traces are dropped: {str(e)}")
+        return NullExporter()
+
+
+class Tracer:
+    """
+    In-process request tracing with head-based sampling
+
+    The keep-or-drop decision is taken once per request when its trace
+    starts. Requests left out get a trace id for the response header and
+    logs but no spans: every span call below them returns a shared no-op
+    scope after one context variable lookup.
+    """
+
+    def __init__(self, sample_rate=0.0, exporter=None):
+        """
+        Initialize the tracer
+
+        Args:
+            sample_rate: Share of requests traced, from 0 to 1
+            exporter: SpanExporter receiving finished traces, NullExporter by default
+        """
+        self.configure(sample_rate, exporter)
+
+    def configure(self, sample_rate=None, exporter=None):
+        """
+        Change the sampling rate and/or the exporter
+
+        Args:
+            sample_rate: Share of requests traced, from 0 to 1 (None keeps the current one)
+            exporter: SpanExporter receiving finished traces (None keeps the current one)
+        """
+        if sample_rate is not None:
+            self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        if exporter is not None or not hasattr(self, "exporter"):
+            self.exporter = exporter or NullExporter()
+
+    def configure_from(self, app_config):
+        """Apply TRACE_SAMPLE_RATE, TRACE_EXPORTER and TRACE_FILE of a config.Config class"""
+        self.configure(
+            sample_rate=app_config.TRACE_SAMPLE_RATE,
+            exporter=create_exporter(app_config.TRACE_EXPORTER, app_config.TRACE_FILE)
+        )
+        logger.info(f"Tracing {self.sample_rate:.1%} of requests with {type(self.exporter).__name__}")
+
+    def start_trace(self, name, trace_id=None, **attributes):
+        """
+        Open the root span of a request
+
+        Args:
+            name: Root span name, such as 'POST /api/chat'
+            trace_id: Trace id received from the caller (X-Trace-Id), a new one otherwise
+            attributes: Values attached to the root span
+
+        Returns:
+            Context manager yielding a Span, or an UnsampledSpan; both have trace_id
+        """
+        trace_id = _valid_trace_id(trace_id) or _new_id(16)
+        if self.sample_rate and random.random() < self.sample_rate:
+            return _TraceScope(self, Span(name, trace_id, None, [], attributes))
+        return _TraceScope(self, UnsampledSpan(trace_id))
+
+    def span(self, name, **attributes):
+        """
+        Open a child span of the current one
+
+        Args:
+            name: Span name
+            attributes: Values attached to the span
+
+        Returns:
+            Context manager yielding the Span, a no-op outside a sampled trace
+        """
+        parent = _current_span.get()
+        if parent is None or not parent.sampled:
+            return _NOOP_SCOPE
+        return _SpanScope(Span(name, parent.trace_id, parent.span_id, parent._spans, attributes))
+
+    def traced(self, name):
+        """
+        Decorator running a function or coroutine function in a child span
+
+        Args:
+            name: Span name
+        """
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def current_span():
+        """Innermost open span, None outside a request"""
+        return _current_span.get()
+
+    @staticmethod
+    def current_trace_id():
+        """Trace id of the running request, sampled or not, None outside a request"""
+        span = _current_span.get()
+        return span.trace_id if span is not None else None
+
+    @staticmethod
+    def annotate(**attributes):
+        """Attach values to the current span if the request is sampled"""
+        span = _current_span.get()
+        if span is not None and span.sampled:
+            span.attributes.update(attributes)
+
+    def export(self, spans):
+        """Hand a finished trace to the exporter without letting it fail the request"""
+        try:
+            self.exporter.export([span.to_dict() for span in spans])
+        except Exception as e:
+            logger.warning(f"Trace export failed: {str(e)}")
+
+
+def _valid_trace_id(value):
+    """Caller-supplied trace id if it is a short hex string, otherwise None"""
+    if value and len(value) <= 64 and all(char in _HEX_DIGITS for char in value):
+        return value.lower()
+    return None
+
+
+# Process-wide tracer, configured by the route modules (see Tracer.configure_from)
+tracer = Tracer()
@@ -0,0 +1,168 @@
+# worker_pool.py
+import time
+import threading
+import contextvars
+from concurrent.futures import Executor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from utils.histogram import Histogram
+
+QUEUE_WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000, 5000)
+
+
+class PoolFullError(RuntimeError):
+    """Raised when a task is submitted to a pool whose queue is at its limit"""
+
+
+class WorkerPool(Executor):
+    """
+    Size-limited thread pool that reports its queue depth
+
+    A drop-in concurrent.futures.Executor (usable with run_in_executor and
+    SpeculativeCall) that counts tasks waiting for a thread and running,
+    records how long tasks waited, and can reject new tasks once max_queue
+    are already waiting, so callers can fall back instead of queueing.
+    Tasks run in a copy of the submitter's contextvars, so the request's
+    trace follows them onto the pool threads.
+    """
+
+    def __init__(self, name, max_workers, max_queue=0):
+        """
+        Initialize the pool
+
+        Args:
+            name: Pool name, used for thread names and stats
+            max_workers: Maximum number of threads (the concurrency cap)
+            max_queue: Maximum number of tasks waiting for a thread, 0 for no limit
+        """
+        self.name = name
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue or 0))
+        self.queue_wait_histogram = Histogram(QUEUE_WAIT_MS_BUCKETS)
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.peak_queued = 0
+        self._reset()
+
+    def _reset(self):
+        """Fresh executor and in-flight counters"""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.queued = 0
+        self.active = 0
+
+    def after_fork(self):
+        """Replace the executor inherited from the parent process (its threads did not survive the fork)"""
+        self._reset()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queue a task
+
+        Returns:
+            concurrent.futures.Future of the task
+
+        Raises:
+            PoolFullError: if max_queue tasks are already waiting
+        """
+        with self._lock:
+            if self.max_queue and self.queued >= self.max_queue:
+                self.rejected += 1
+                raise PoolFullError(f"{self.name} pool is full ({self.queued} tasks waiting)")
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+        try:
+            future = self._executor.submit(contextvars.copy_context().run, self._call, time.perf_counter(), fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self.queued -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future):
+        # A task cancelled while waiting never reaches _call
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def _call(self, submitted, fn, args, kwargs):
+        """Run a task on a pool thread, keeping the counters"""
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        self.queue_wait_histogram.observe((started - submitted) * 1000.0)
+
+        self._local.inside = True
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            raise
+        else:
+            with self._lock:
+                self.completed += 1
+            return result
+        finally:
+            self._local.inside = False
+            with self._lock:
+                self.active -= 1
+
+    def run(self, fn, *args, timeout=None):
+        """
+        Run a task on the pool and wait for its result
+
+        A call made from one of the pool's own threads runs inline, so nested
+        calls never wait for a thread they are holding.
+
+        Args:
+            fn: Callable
+            *args: Arguments of fn
+            timeout: Seconds to wait for the result, None to wait indefinitely
+
+        Returns:
+            Whatever fn returned
+
+        Raises:
+            PoolFullError: if max_queue tasks are already waiting
+            concurrent.futures.TimeoutError: if the result is not ready in time
+                (a task still waiting for a thread is cancelled)
+            Exception: whatever fn raised
+        """
+        if getattr(self._local, "inside", False):
+            return fn(*args)
+
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def stats(self):
+        """
+        Get pool metrics
+
+        Returns:
+            dict with the limits, current and peak queue depth, task counts and queue wait histogram
+        """
+        with self._lock:
+            counters = {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue or None,
+                "queue_depth": self.queued,
+                "peak_queue_depth": self.peak_queued,
+                "active": self.active,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected
+            }
+        counters["queue_wait_ms"] = self.queue_wait_histogram.snapshot()
+        return counters
@@ -0,0 +1,41 @@
+# conftest.py
+import os
+import sys
+
+import pytest
+
+# Add the src directory to path so tests import modules the way the app does
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+# Route modules build the response manager at import: keep the classifier and Azure client unloaded
+os.environ.setdefault('STARTUP_MODE', 'lazy')
+
+
+class FakeTime:
+    """Stand-in for the time module with a clock moved by the test"""
+
+    def __init__(self, now):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """
+    Replace the time module of the modules under test with one FakeTime
+
+    Returns:
+        Function taking the modules to patch (and an optional start time) and returning the FakeTime
+    """
+    def patch(*modules, start=1000.0):
+        fake = FakeTime(start)
+        for module in modules:
+            monkeypatch.setattr(module, "time", fake)
+        return fake
+
+    return patch
@@ -0,0 +1,35 @@
+# test_admin_routes.py
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+# config.py lives in the backend directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from routes import admin_routes
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(admin_routes.app_config, "ADMIN_TOKEN", "secret")
+    app = Flask(__name__)
+    app.register_blueprint(admin_routes.admin_bp)
+    return app.test_client()
+
+
+def test_valid_token_is_accepted(client):
+    response = client.get('/api/admin/versions', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("token", ["wrong", "", "sécret"])
+def test_invalid_token_is_refused(client, token):
+    response = client.get('/api/admin/versions', headers={'X-Admin-Token': token})
+    assert response.status_code == 403
+
+
+def test_admin_endpoints_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(admin_routes.app_config, "ADMIN_TOKEN", "")
+    response = client.get('/api/admin/versions', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 404
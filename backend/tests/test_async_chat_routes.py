@@ -0,0 +1,43 @@
+# test_async_chat_routes.py
+import os
+import sys
+
+import pytest
+from starlette.testclient import TestClient
+
+# config.py lives in the backend directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from routes import async_chat_routes
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(async_chat_routes.app_config, "ADMIN_TOKEN", "secret")
+    return TestClient(async_chat_routes.create_asgi_app())
+
+
+def test_intents_lists_every_intent(client):
+    response = client.get('/api/chat/intents')
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == len(async_chat_routes.response_manager.intents)
+    assert all(len(intent["sample_patterns"]) <= 3 for intent in data["intents"])
+
+
+def test_test_endpoint_answers(client):
+    response = client.get('/api/chat/test')
+    assert response.status_code == 200
+    assert response.json()["source"] == "test"
+
+
+@pytest.mark.parametrize("token, status", [("secret", 200), ("wrong", 403), ("sécret", 403)])
+def test_admin_token_is_checked(client, token, status):
+    # Raw bytes: httpx only takes ASCII header strings, Starlette decodes them as latin-1
+    response = client.get('/api/admin/versions', headers={'X-Admin-Token': token.encode('latin-1')})
+    assert response.status_code == status
+
+
+def test_admin_endpoints_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(async_chat_routes.app_config, "ADMIN_TOKEN", "")
+    response = client.get('/api/admin/versions', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 404
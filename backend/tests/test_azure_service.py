@@ -0,0 +1,140 @@
+# test_azure_service.py
+import time
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from services.azure_service import AzureOpenAIService, AsyncAzureOpenAIService, CircuitOpenError
+from services.circuit_breaker import CircuitBreaker
+
+
+def test_cancelled_half_open_call_releases_trial_slot():
+    # reset_timeout=0: the circuit is half open as soon as it has opened
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    service = AsyncAzureOpenAIService(lazy=True, max_retries=0, retry_budget=0, circuit_breaker=breaker)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    async def run():
+        started = asyncio.Event()
+
+        async def hang(**kwargs):
+            started.set()
+            await asyncio.Event().wait()
+
+        task = asyncio.ensure_future(service._call_with_retries(hang))
+        await started.wait()
+        # The trial call holds the only half-open slot
+        assert breaker.allow_request() is False
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+    # The cancellation was neither a success nor a failure
+    assert breaker.successes == 0
+    assert breaker.failures == 1
+
+
+def _status_error(status_code):
+    request = httpx.Request("POST", "https://example.invalid/chat/completions")
+    response = httpx.Response(status_code, request=request)
+    return openai.APIStatusError(f"status {status_code}", response=response, body=None)
+
+
+def _connection_error():
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://example.invalid/chat/completions"))
+
+
+class FlakyCall:
+    """Client method raising the given errors in turn, then returning 'ok'"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.timeouts = []
+
+    def __call__(self, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def _service(**options):
+    options.setdefault("retry_backoff", 0.001)
+    options.setdefault("retry_backoff_max", 0.002)
+    return AzureOpenAIService(lazy=True, **options)
+
+
+def test_retryable_errors_are_retried():
+    service = _service(max_retries=2)
+    call = FlakyCall(_connection_error(), _status_error(503))
+
+    assert service._call_with_retries(call) == "ok"
+    assert len(call.timeouts) == 3
+    assert service.circuit_breaker.failures == 2
+    assert service.circuit_breaker.successes == 1
+
+
+def test_retries_stop_after_max_retries():
+    service = _service(max_retries=1)
+    call = FlakyCall(_status_error(429), _status_error(429), _status_error(429))
+
+    with pytest.raises(openai.APIStatusError):
+        service._call_with_retries(call)
+    assert len(call.timeouts) == 2
+
+
+def test_client_errors_are_not_retried_nor_held_against_the_upstream():
+    service = _service(max_retries=2)
+    call = FlakyCall(_status_error(400))
+
+    with pytest.raises(openai.APIStatusError):
+        service._call_with_retries(call)
+    assert len(call.timeouts) == 1
+    assert service.circuit_breaker.failures == 0
+
+
+def test_open_circuit_refuses_the_call():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    service = _service(circuit_breaker=breaker)
+    breaker.record_failure()
+    call = FlakyCall()
+
+    with pytest.raises(CircuitOpenError):
+        service._call_with_retries(call)
+    assert call.timeouts == []
+
+
+def test_failures_open_the_circuit_mid_retries():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    service = _service(max_retries=5, circuit_breaker=breaker)
+    call = FlakyCall(*[_connection_error() for _ in range(5)])
+
+    with pytest.raises(CircuitOpenError):
+        service._call_with_retries(call)
+    assert len(call.timeouts) == 2
+
+
+def test_backoff_is_capped_and_bounded_by_the_deadline():
+    service = _service(max_retries=3, retry_backoff=1.0, retry_backoff_max=2.0)
+    for attempt in range(1, 4):
+        assert 0 <= service._next_delay(attempt, None) <= 2.0
+    assert service._next_delay(4, None) is None
+    # No time left for a delay before the deadline
+    assert service._next_delay(1, time.monotonic()) is None
+
+
+def test_attempt_timeout_is_cut_short_by_the_deadline():
+    service = _service(read_timeout=30.0, connect_timeout=5.0)
+    timeout = service._attempt_timeout(time.monotonic() + 2.0)
+    assert timeout.read <= 2.0
+    assert timeout.connect <= 2.0
+    assert service._attempt_timeout(None).read == 30.0
@@ -0,0 +1,79 @@
+# test_batch_scheduler.py
+import threading
+
+import pytest
+
+from prediction.batch_scheduler import InferenceBatcher, BatcherClosedError
+
+
+class RecordingClassifier:
+    """Classifier echoing each message back and recording the batches it ran"""
+
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+
+    def predict_intents(self, messages):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.batches.append(list(messages))
+        return [{"intent": message, "confidence": 1.0} for message in messages]
+
+
+def test_concurrent_messages_share_one_batch():
+    classifier = RecordingClassifier()
+    batcher = InferenceBatcher(classifier, max_batch_size=8, max_wait_ms=200)
+
+    futures = [batcher.submit(f"message {i}") for i in range(5)]
+    results = [future.result(timeout=5) for future in futures]
+    batcher.shutdown()
+
+    assert [result["intent"] for result in results] == [f"message {i}" for i in range(5)]
+    assert classifier.batches == [[f"message {i}" for i in range(5)]]
+
+
+def test_batches_are_capped_at_max_batch_size():
+    gate = threading.Event()
+    classifier = RecordingClassifier(gate)
+    batcher = InferenceBatcher(classifier, max_batch_size=2, max_wait_ms=50)
+
+    futures = [batcher.submit(str(i)) for i in range(5)]
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+    batcher.shutdown()
+
+    assert [len(batch) for batch in classifier.batches] == [2, 2, 1]
+
+
+def test_classifier_errors_fail_every_future_of_the_batch():
+    class FailingClassifier:
+        def predict_intents(self, messages):
+            raise ValueError("model unavailable")
+
+    batcher = InferenceBatcher(FailingClassifier(), max_wait_ms=50)
+    futures = [batcher.submit("a"), batcher.submit("b")]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+    batcher.shutdown()
+
+
+def test_shutdown_flushes_queued_messages_and_refuses_new_ones():
+    gate = threading.Event()
+    classifier = RecordingClassifier(gate)
+    batcher = InferenceBatcher(classifier, max_batch_size=1, max_wait_ms=0)
+    futures = [batcher.submit("first"), batcher.submit("second")]
+
+    stopper = threading.Thread(target=batcher.shutdown)
+    stopper.start()
+    gate.set()
+    stopper.join(5)
+
+    assert [future.result(timeout=5)["intent"] for future in futures] == ["first", "second"]
+    with pytest.raises(BatcherClosedError):
+        batcher.submit("late")
+    with pytest.raises(BatcherClosedError):
+        batcher.predict_intent("late", timeout=0)
+    # The worker exited and was not restarted for the refused messages
+    assert not batcher._worker.is_alive()
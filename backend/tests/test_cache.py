@@ -0,0 +1,87 @@
+# test_cache.py
+import pytest
+
+from utils import cache
+from utils.cache import LRUCache, normalize_message
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(cache)
+
+
+def test_least_recently_used_entry_is_evicted():
+    lru = LRUCache(max_size=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    # Reading "a" makes "b" the least recently used
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    assert lru.stats()["evictions"] == 1
+
+
+def test_overwriting_a_key_refreshes_it():
+    lru = LRUCache(max_size=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.set("a", 10)
+    lru.set("c", 3)
+
+    assert lru.get("a") == 10
+    assert lru.get("b") is None
+    assert len(lru) == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    lru = LRUCache(max_size=10, ttl=60)
+    lru.set("a", 1)
+    clock.now += 59
+    assert lru.get("a") == 1
+    clock.now += 1
+    assert lru.get("a", "expired") == "expired"
+    # Expired entries are dropped on lookup
+    assert len(lru) == 0
+
+
+def test_no_ttl_never_expires(clock):
+    lru = LRUCache(max_size=10, ttl=None)
+    lru.set("a", 1)
+    clock.now += 10 ** 9
+    assert lru.get("a") == 1
+
+
+def test_disabled_cache_stores_nothing():
+    lru = LRUCache(max_size=0)
+    lru.set("a", 1)
+    assert lru.get("a") is None
+    assert len(lru) == 0
+    assert lru.stats()["misses"] == 0
+
+
+def test_stats_count_hits_and_misses():
+    lru = LRUCache(max_size=10)
+    lru.set("a", 1)
+    lru.get("a")
+    lru.get("a")
+    lru.get("b")
+    stats = lru.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["hit_ratio"] == pytest.approx(2 / 3)
+
+
+def test_clear_keeps_counters():
+    lru = LRUCache(max_size=10)
+    lru.set("a", 1)
+    lru.get("a")
+    lru.clear()
+    assert lru.get("a") is None
+    assert lru.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("message", ["What are your skills?", "  what ARE your   skills ", "what are your skills!!"])
+def test_equivalent_messages_share_a_key(message):
+    assert normalize_message(message) == "what are your skills"
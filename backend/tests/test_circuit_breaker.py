@@ -0,0 +1,117 @@
+# test_circuit_breaker.py
+import pytest
+
+from services import circuit_breaker
+from services.circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(circuit_breaker)
+
+
+def test_consecutive_failures_open_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    # A success resets the count
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is False
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["times_opened"] == 1
+    assert breaker.stats()["retry_in"] == 30
+
+
+def test_slow_calls_count_as_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=2, slow_call_threshold=1.0)
+    breaker.record_success(duration=1.5)
+    breaker.record_success(duration=0.1)
+    assert breaker._consecutive_failures == 0
+    breaker.record_success(duration=2.0)
+    breaker.record_success(duration=2.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.slow_calls == 3
+
+
+def test_half_open_trial_success_closes_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 29
+    assert breaker.allow_request() is False
+
+    clock.now += 1
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+    # Only half_open_max_calls trials at once
+    assert breaker.allow_request() is False
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request() is True
+
+
+def test_half_open_trial_failure_opens_the_circuit_again(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow_request() is True
+
+    # A single failed trial is enough, whatever the threshold
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()["times_opened"] == 2
+
+
+def test_release_frees_the_trial_slot_without_an_outcome(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, half_open_max_calls=2)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+    breaker.release()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+    assert (breaker.successes, breaker.failures) == (0, 1)
+
+
+def test_disabled_breaker_never_opens(clock):
+    breaker = CircuitBreaker(failure_threshold=0)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request() is True
+
+
+def test_reset_closes_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_failure()
+    breaker.reset()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["consecutive_failures"] == 0
+
+
+def test_admits_calls_only_while_a_trial_slot_is_free(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, half_open_max_calls=1)
+    assert breaker.admits_calls is True
+    breaker.record_failure()
+    assert breaker.admits_calls is False
+
+    clock.now += 30
+    assert breaker.admits_calls is True
+    assert breaker.allow_request() is True
+    # The trial is running: HALF_OPEN, yet a new call would be refused
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.admits_calls is False
+    assert breaker.allow_request() is False
+
+    breaker.record_success()
+    assert breaker.admits_calls is True
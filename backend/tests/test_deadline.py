@@ -0,0 +1,43 @@
+# test_deadline.py
+import math
+
+import pytest
+
+from utils.deadline import Deadline
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2.5", 2.5),
+    (" 2500ms ", 2.5),
+    ("300MS", 0.3),
+])
+def test_from_header_parses_seconds_and_milliseconds(value, expected):
+    assert Deadline.from_header(value).seconds == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("value", [None, "", "soon", "-1", "0", "nan", "inf"])
+def test_from_header_falls_back_to_default(value):
+    assert Deadline.from_header(value, default=4.0).seconds == 4.0
+
+
+def test_from_header_without_default_is_unlimited():
+    deadline = Deadline.from_header("soon")
+    assert deadline.seconds is None
+    assert deadline.remaining() == math.inf
+    assert deadline.timeout() is None
+    assert not deadline.expired
+
+
+def test_from_header_caps_at_maximum():
+    assert Deadline.from_header("60", maximum=10.0).seconds == 10.0
+    assert Deadline.from_header("5", maximum=10.0).seconds == 5.0
+    # A missing header cannot opt out of the cap
+    assert Deadline.from_header(None, maximum=10.0).seconds == 10.0
+
+
+def test_expired_deadline_has_no_time_left():
+    deadline = Deadline(1.0)
+    deadline.at = deadline.started_at
+    assert deadline.expired
+    assert deadline.remaining() == 0.0
+    assert deadline.timeout() == 0.0
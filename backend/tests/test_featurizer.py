@@ -0,0 +1,57 @@
+# test_featurizer.py
+import numpy as np
+import pytest
+
+from prediction.featurizer import BagOfWordsFeaturizer
+
+
+def tokenize(sentence):
+    """Whitespace tokenizer so the tests do not depend on NLTK data"""
+    return sentence.lower().split()
+
+
+def legacy_bag_of_words(sentence, words):
+    """Nested-loop encoder IntentClassifier used before BagOfWordsFeaturizer"""
+    bag = [0] * len(words)
+    for s_word in tokenize(sentence):
+        for i, word in enumerate(words):
+            if word == s_word:
+                bag[i] = 1
+    return bag
+
+
+WORDS = ["about", "contact", "hello", "hello", "project", "skill", "what", "your"]
+MESSAGES = [
+    "what are your skills",
+    "Hello hello",
+    "tell me about your project project",
+    "nothing known here",
+    "",
+]
+
+
+@pytest.mark.parametrize("message", MESSAGES)
+def test_transform_matches_legacy_bag_of_words(message):
+    featurizer = BagOfWordsFeaturizer(WORDS, tokenize)
+    expected = np.array([legacy_bag_of_words(message, WORDS)], dtype=np.float32)
+    np.testing.assert_array_equal(featurizer.transform(message), expected)
+
+
+def test_batch_matches_single_messages():
+    featurizer = BagOfWordsFeaturizer(WORDS, tokenize)
+    batch = featurizer.transform(MESSAGES)
+    assert batch.shape == (len(MESSAGES), len(WORDS))
+    for row, message in zip(batch, MESSAGES):
+        np.testing.assert_array_equal(row, featurizer.transform(message)[0])
+
+
+def test_duplicate_vocabulary_words_set_every_column():
+    featurizer = BagOfWordsFeaturizer(WORDS, tokenize)
+    assert featurizer.columns(["hello"]) == [2, 3]
+
+
+def test_transform_tokens_uses_dtype():
+    featurizer = BagOfWordsFeaturizer(WORDS, tokenize, dtype=np.int8)
+    matrix = featurizer.transform_tokens([["skill"], []])
+    assert matrix.dtype == np.int8
+    assert matrix.sum() == 1
@@ -0,0 +1,100 @@
+# test_logger.py
+import os
+import time
+import logging
+
+import pytest
+
+from utils.logger import DailyFileHandler, _SamplingFilter, parse_sampling
+from utils.tracing import Tracer
+
+# Kept at any rate above 0, dropped at any rate below 1 (the decision uses the last 8 hex digits)
+KEPT_TRACE_ID = "0" * 32
+DROPPED_TRACE_ID = "f" * 32
+
+
+def _record(name="intent_classifier", level=logging.INFO, created=None):
+    record = logging.LogRecord(name, level, __file__, 1, "message %s", ("arg",), None)
+    if created is not None:
+        record.created = created
+    return record
+
+
+@pytest.fixture
+def unsampled_request():
+    """Start a request left out by trace sampling, with a chosen trace id"""
+    tracer = Tracer(sample_rate=0)
+
+    def enter(trace_id):
+        return tracer.start_trace("POST /api/chat", trace_id=trace_id)
+    return enter
+
+
+def test_parse_sampling_clamps_rates():
+    assert parse_sampling("intent_classifier=0.1, chat_routes=2,bad,=0.5") == {
+        "intent_classifier": 0.1,
+        "chat_routes": 1.0
+    }
+    assert parse_sampling("") == {}
+
+
+def test_sampling_keeps_or_drops_a_whole_request(unsampled_request):
+    sampling = _SamplingFilter({"intent_classifier": 0.5})
+    with unsampled_request(KEPT_TRACE_ID):
+        assert sampling.filter(_record())
+        assert sampling.filter(_record(level=logging.DEBUG))
+    with unsampled_request(DROPPED_TRACE_ID):
+        assert not sampling.filter(_record())
+        assert not sampling.filter(_record(level=logging.DEBUG))
+
+
+def test_sampling_never_drops_warnings_or_other_loggers(unsampled_request):
+    sampling = _SamplingFilter({"intent_classifier": 0.0})
+    with unsampled_request(DROPPED_TRACE_ID):
+        assert sampling.filter(_record(level=logging.WARNING))
+        assert sampling.filter(_record(name="chat_routes"))
+        assert not sampling.filter(_record())
+
+
+def test_sampling_keeps_lines_outside_requests_and_traced_requests():
+    sampling = _SamplingFilter({"intent_classifier": 0.0})
+    assert sampling.filter(_record())
+
+    tracer = Tracer(sample_rate=1.0)
+    with tracer.start_trace("POST /api/chat", trace_id=DROPPED_TRACE_ID):
+        assert sampling.filter(_record())
+
+
+def test_daily_handler_moves_to_the_next_day_file(tmp_path):
+    prefix = str(tmp_path / "app")
+    handler = DailyFileHandler(prefix)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    today = time.time()
+    tomorrow = today + 86400
+
+    handler.emit(_record(created=today))
+    handler.emit(_record(created=tomorrow))
+    handler.close()
+
+    for created in (today, tomorrow):
+        path = f"{prefix}_{time.strftime('%Y%m%d', time.localtime(created))}.log"
+        with open(path, encoding="utf-8") as file:
+            assert file.read() == "message arg\n"
+
+
+def test_daily_handler_removes_files_beyond_backup_count(tmp_path):
+    prefix = str(tmp_path / "app")
+    for day in ("20000101", "20000102", "20000103"):
+        open(f"{prefix}_{day}.log", "w").close()
+    # Another logger sharing the directory is left alone
+    open(str(tmp_path / "app_routes_20000101.log"), "w").close()
+    handler = DailyFileHandler(prefix, backup_count=2)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    handler.emit(_record(created=time.time() + 86400))
+    handler.close()
+
+    tomorrow = time.strftime('%Y%m%d', time.localtime(time.time() + 86400))
+    assert sorted(os.listdir(tmp_path)) == [
+        "app_20000102.log", "app_20000103.log", f"app_{tomorrow}.log", "app_routes_20000101.log"
+    ]
@@ -0,0 +1,88 @@
+# test_metrics.py
+import os
+import threading
+
+import pytest
+
+from utils import metrics
+from utils.metrics import MetricsRegistry
+
+
+def _run_in_threads(func, count):
+    threads = [threading.Thread(target=func) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_counter_keeps_counts_of_finished_threads_without_their_slots():
+    counter = MetricsRegistry().counter("test_total", "Test counter")
+    _run_in_threads(lambda: counter.inc(2), 50)
+
+    child = counter.labels()
+    assert child.value() == 100
+    # Every writer has finished: nothing but the retired totals is left
+    assert child._cells._threads == []
+
+    counter.inc()
+    assert child.value() == 101
+    assert len(child._cells._threads) == 1
+
+
+def test_histogram_keeps_observations_of_finished_threads_without_their_slots():
+    # Default latency buckets: 18 slots per writing thread
+    child = MetricsRegistry().histogram("test_seconds", "Test histogram").labels()
+    _run_in_threads(lambda: (child.observe(0.003), child.observe(50.0)), 50)
+
+    cumulative, total, count = child.snapshot()
+    assert child._cells._threads == []
+    assert len(cumulative) == len(metrics.LATENCY_BUCKETS) + 1
+    # 0.003 lands in the 0.005 bucket, 50.0 in the overflow bucket
+    assert cumulative[metrics.LATENCY_BUCKETS.index(0.005)] == 50
+    assert cumulative[-1] == count == 100
+    assert total == pytest.approx(50 * 50.003)
+
+
+def test_gauge_balances_across_threads():
+    gauge = MetricsRegistry().gauge("test_in_flight", "Test gauge", ("endpoint",))
+    child = gauge.labels("chat")
+    child.inc(5)
+    _run_in_threads(child.dec, 5)
+    assert child.value() == 0
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = MetricsRegistry().histogram("test_seconds", "Test histogram", buckets=(0.1, 1.0))
+    child = histogram.labels()
+    for value in (0.05, 0.5, 0.5, 5.0):
+        child.observe(value)
+
+    cumulative, total, count = child.snapshot()
+    assert cumulative == [1, 3, 4]
+    assert total == pytest.approx(6.05)
+    assert count == 4
+
+
+def test_render_uses_exposition_format():
+    registry = MetricsRegistry()
+    registry.counter("test_total", "Test counter", ("source",)).labels('a"b').inc()
+    text = registry.render()
+    assert "# TYPE test_total counter" in text
+    assert 'test_total{source="a\\"b"} 1' in text
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_process_start_time_is_reset_in_forked_child():
+    parent_start = metrics.process_start_time.labels().value()
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        os.write(write_end, repr(metrics.process_start_time.labels().value()).encode())
+        os._exit(0)
+    os.close(write_end)
+    child_start = float(os.read(read_end, 64))
+    os.close(read_end)
+    os.waitpid(pid, 0)
+    assert child_start > parent_start
@@ -0,0 +1,95 @@
+# test_numpy_model.py
+import numpy as np
+import pytest
+
+from prediction.numpy_model import NumpyDenseModel
+from training.export_numpy import convert_model, export_numpy_model
+
+tf = pytest.importorskip("tensorflow")
+
+
+def _randomize_batch_norm(model, seed=0):
+    """Give every BatchNormalization non-trivial statistics, as after training"""
+    rng = np.random.default_rng(seed)
+    for layer in model.layers:
+        if layer.__class__.__name__ == 'BatchNormalization':
+            config = layer.get_config()
+            size = layer.get_weights()[-1].shape
+            weights = []
+            if config.get('scale', True):
+                weights.append(rng.uniform(0.5, 1.5, size=size))  # gamma
+            if config.get('center', True):
+                weights.append(rng.normal(size=size))  # beta
+            weights.append(rng.normal(size=size))  # moving mean
+            weights.append(rng.uniform(0.1, 2.0, size=size))  # moving variance
+            layer.set_weights(weights)
+
+
+def _model(*layers, input_dim=40):
+    model = tf.keras.Sequential([tf.keras.Input(shape=(input_dim,))] + list(layers))
+    _randomize_batch_norm(model)
+    return model
+
+
+def _inputs(input_dim=40, rows=64, seed=1):
+    rng = np.random.default_rng(seed)
+    return np.concatenate([
+        (rng.random((rows, input_dim)) < 0.1).astype(np.float32),
+        rng.normal(size=(rows, input_dim)).astype(np.float32)
+    ])
+
+
+@pytest.mark.parametrize("layers", [
+    # Training layout: Dense -> ReLU -> BN, folded into the next Dense
+    lambda: [
+        tf.keras.layers.Dense(32, activation='relu'),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dropout(0.5),
+        tf.keras.layers.Dense(16, activation='relu'),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dense(8, activation='softmax'),
+    ],
+    # BN after a linear Dense, folded into that Dense
+    lambda: [
+        tf.keras.layers.Dense(16),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dense(8, activation='softmax'),
+    ],
+    # Trailing BN, kept as a diagonal layer
+    lambda: [
+        tf.keras.layers.Dense(8, activation='tanh'),
+        tf.keras.layers.BatchNormalization(center=False),
+    ],
+])
+def test_numpy_runtime_matches_keras(layers):
+    model = _model(*layers())
+    numpy_model = convert_model(model)
+    inputs = _inputs()
+
+    expected = model.predict(inputs, verbose=0)
+    np.testing.assert_allclose(numpy_model.predict(inputs), expected, atol=1e-5)
+    # Dropout removed and BatchNormalization folded: only Dense layers are left
+    assert len(numpy_model.layers) == sum(
+        layer.__class__.__name__ == 'Dense' for layer in model.layers
+    ) + (model.layers[-1].__class__.__name__ == 'BatchNormalization')
+
+
+def test_exported_file_round_trips(tmp_path):
+    model = _model(
+        tf.keras.layers.Dense(16, activation='relu'),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dense(4, activation='softmax'),
+    )
+    path = str(tmp_path / "model.npz")
+    export_numpy_model(model, path)
+
+    loaded = NumpyDenseModel.load(path)
+    inputs = _inputs()
+    np.testing.assert_allclose(loaded.predict(inputs), model.predict(inputs, verbose=0), atol=1e-5)
+    assert loaded.input_shape == model.input_shape
+
+
+def test_unsupported_layers_are_refused():
+    model = _model(tf.keras.layers.Dense(8), tf.keras.layers.LayerNormalization())
+    with pytest.raises(ValueError):
+        convert_model(model)
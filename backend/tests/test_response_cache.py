@@ -0,0 +1,76 @@
+# test_response_cache.py
+import pytest
+
+from services import response_cache
+from services.response_cache import PersistentResponseCache
+
+
+@pytest.fixture
+def clock(fake_clock):
+    # Wall-clock start: entries store time.time() timestamps
+    return fake_clock(response_cache, start=1_700_000_000.0)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "responses.sqlite3")
+
+
+def test_answers_are_shared_between_instances(db_path, clock):
+    PersistentResponseCache(db_path, "v1").set("What are your skills?", "Python and ML")
+    other = PersistentResponseCache(db_path, "v1")
+    assert other.get("what are your skills") == "Python and ML"
+    assert other.stats()["hits"] == 1
+
+
+def test_prompt_versions_are_isolated(db_path, clock):
+    PersistentResponseCache(db_path, "v1").set("hello", "answer for v1")
+    v2 = PersistentResponseCache(db_path, "v2")
+    assert v2.get("hello") is None
+    v2.set("hello", "answer for v2")
+
+    assert PersistentResponseCache(db_path, "v1").get("hello") == "answer for v1"
+    assert v2.get("hello") == "answer for v2"
+
+
+def test_least_recently_used_answer_is_evicted(db_path, clock):
+    cache = PersistentResponseCache(db_path, "v1", max_size=2, touch_interval=0)
+    cache.set("a", "answer a")
+    clock.now += 1
+    cache.set("b", "answer b")
+    clock.now += 1
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") == "answer a"
+    clock.now += 1
+    cache.set("c", "answer c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "answer a"
+    assert cache.get("c") == "answer c"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_answers_expire_after_ttl(db_path, clock):
+    cache = PersistentResponseCache(db_path, "v1", ttl=60)
+    cache.set("hello", "hi")
+    clock.now += 59
+    assert cache.get("hello") == "hi"
+    clock.now += 1
+    assert cache.get("hello") is None
+
+
+def test_prune_removes_other_versions(db_path, clock):
+    PersistentResponseCache(db_path, "v1").set("hello", "old")
+    current = PersistentResponseCache(db_path, "v2")
+    current.set("hello", "new")
+
+    assert current.prune(other_versions=True) == 1
+    assert PersistentResponseCache(db_path, "v1").get("hello") is None
+    assert current.get("hello") == "new"
+
+
+def test_disabled_cache_stores_nothing(db_path, clock):
+    cache = PersistentResponseCache(db_path, "v1", max_size=0)
+    cache.set("hello", "hi")
+    assert cache.get("hello") is None
+    assert PersistentResponseCache(db_path, "v1").get("hello") is None
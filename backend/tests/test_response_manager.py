@@ -0,0 +1,186 @@
+# test_response_manager.py
+import threading
+
+import numpy as np
+import pytest
+
+from services.circuit_breaker import CircuitBreaker
+from services.response_manager import ResponseManager
+from utils.deadline import Deadline
+from utils.intents_store import IntentsStore
+
+
+class StubClassifier:
+    """Classifier returning a fixed prediction and counting model runs"""
+
+    has_sentence_encoder = False
+
+    def __init__(self, prediction=None, cached=None):
+        self.prediction = prediction
+        self.cached = cached
+        self.calls = 0
+
+    def embed_messages(self, messages):
+        # The same vector for every message, as a bag of words gives
+        # questions that only share their in-vocabulary words
+        return np.ones((len(messages), 4), dtype=np.float32)
+
+    def predict_intent(self, message):
+        self.calls += 1
+        return self.prediction
+
+    def cached_prediction(self, message):
+        return self.cached
+
+
+@pytest.fixture
+def make_manager():
+    managers = []
+
+    def make(classifier, **options):
+        options.setdefault("semantic_cache_size", 0)
+        manager = ResponseManager(startup_mode='lazy', single_flight=False, **options)
+        manager.components = manager.components._replace(classifier=classifier)
+        manager._components_ready.set()
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.inference_pool.shutdown()
+        manager.io_pool.shutdown()
+
+
+def _expired_deadline():
+    deadline = Deadline(1.0)
+    deadline.at = deadline.started_at
+    return deadline
+
+
+def test_classify_locally_defers_to_azure_without_prediction(make_manager):
+    manager = make_manager(StubClassifier(prediction=None))
+    assert manager._classify_locally("what are your skills") is None
+
+
+def test_local_fallback_reuses_cached_prediction_after_deadline(make_manager):
+    classifier = StubClassifier(cached={"intent": "skills", "confidence": 0.5})
+    manager = make_manager(classifier)
+
+    result = manager._local_fallback_result("what are your skills", "test", _expired_deadline())
+
+    assert result["source"] == "local_fallback"
+    assert result["intent"] == "skills"
+    assert classifier.calls == 0
+
+
+def test_local_fallback_skips_classification_after_deadline(make_manager):
+    classifier = StubClassifier(prediction={"intent": "skills", "confidence": 0.5})
+    manager = make_manager(classifier)
+
+    result = manager._local_fallback_result("what are your skills", "test", _expired_deadline())
+
+    assert result["source"] == "fallback"
+    assert classifier.calls == 0
+
+
+def test_local_fallback_classifies_with_time_left(make_manager):
+    classifier = StubClassifier(prediction={"intent": "skills", "confidence": 0.5})
+    manager = make_manager(classifier)
+
+    result = manager._local_fallback_result("what are your skills", "test", Deadline(5.0))
+
+    assert result["source"] == "local_fallback"
+    assert classifier.calls == 1
+
+
+def _intents(response):
+    return IntentsStore({"intents": [{"tag": "skills", "patterns": ["what are your skills"], "responses": [response]}]})
+
+
+def test_local_fallback_answers_from_its_own_snapshot(make_manager):
+    manager = make_manager(StubClassifier())
+    manager.components = manager.components._replace(intents=_intents("old answer"))
+    reloaded = manager.components._replace(intents=_intents("new answer"))
+
+    class ReloadingClassifier(StubClassifier):
+        def cached_prediction(self, message):
+            # A reload swaps the components while the fallback is classifying
+            manager.components = reloaded
+            return {"intent": "skills", "confidence": 0.9}
+
+    manager.components = manager.components._replace(classifier=ReloadingClassifier())
+    result = manager._local_fallback_result("what are your skills", "test", Deadline(5.0))
+
+    assert result["source"] == "local_fallback"
+    assert result["response"] == "old answer"
+
+
+def test_validation_prediction_runs_on_the_inference_pool(make_manager):
+    threads = []
+
+    class RecordingClassifier(StubClassifier):
+        classes = ["skills"]
+
+        def predict_intent(self, message):
+            threads.append(threading.current_thread().name)
+            return {"intent": "skills", "confidence": 0.9}
+
+    manager = make_manager(StubClassifier())
+    manager._validate_components(_intents("answer"), RecordingClassifier())
+
+    assert len(threads) == 1
+    assert threads[0].startswith("inference")
+
+
+def _half_open_with_trial_running(manager):
+    """Put the manager's breaker in HALF_OPEN with its only trial slot taken"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0, half_open_max_calls=1)
+    manager.azure_service.circuit_breaker = breaker
+    breaker.record_failure()
+    assert breaker.allow_request() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_half_open_with_trial_running_skips_azure(make_manager):
+    manager = make_manager(StubClassifier(cached={"intent": "skills", "confidence": 0.9}))
+    _half_open_with_trial_running(manager)
+
+    assert manager._remote_skip_reason(Deadline(5.0)) == "Azure OpenAI circuit is open"
+
+
+def test_refused_call_answers_locally(make_manager):
+    classifier = StubClassifier(cached={"intent": "skills", "confidence": 0.9})
+    manager = make_manager(classifier)
+    _half_open_with_trial_running(manager)
+
+    result = manager._azure_error_result("what are your skills", Deadline(5.0), refused=True)
+
+    assert result["source"] == "local_fallback"
+    assert result["intent"] == "skills"
+
+
+def _cache_azure_answer(manager, message, answer):
+    """Store an answer the way a completed Azure call does"""
+    cached, embedding = manager._lookup_cached_response(message, [])
+    assert cached is None
+    manager._store_answer(message, answer, embedding, persist=False)
+
+
+def test_semantic_cache_unused_without_sentence_encoder(make_manager):
+    manager = make_manager(StubClassifier(), semantic_cache_size=16)
+    _cache_azure_answer(manager, "What is the capital of France?", "Paris")
+
+    cached, _ = manager._lookup_cached_response("What is the population of Japan?", [])
+    assert cached is None
+    assert manager.semantic_cache.stats()["size"] == 0
+
+
+def test_semantic_cache_used_with_sentence_encoder(make_manager):
+    classifier = StubClassifier()
+    classifier.has_sentence_encoder = True
+    manager = make_manager(classifier, semantic_cache_size=16)
+    _cache_azure_answer(manager, "What is the capital of France?", "Paris")
+
+    cached, _ = manager._lookup_cached_response("what's the capital of france", [])
+    assert cached["response"] == "Paris"
+    assert cached["cache"] == "semantic"
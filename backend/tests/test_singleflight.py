@@ -0,0 +1,160 @@
+# test_singleflight.py
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import pytest
+
+from utils.singleflight import SingleFlight, AsyncSingleFlight
+
+
+def _wait_for(condition):
+    """Spin until condition() holds"""
+    while not condition():
+        time.sleep(0.001)
+
+
+def _run_merged(flight, func, release, followers, timeout=None):
+    """
+    Run a leader and merged callers of func, which blocks until release is set
+
+    Returns:
+        Tuple of (leader future, merged futures)
+    """
+    with ThreadPoolExecutor(max_workers=followers + 1) as executor:
+        leader = executor.submit(flight.do, "key", func)
+        _wait_for(lambda: flight.stats()["in_flight"] == 1)
+        merged = [executor.submit(flight.do, "key", func, timeout) for _ in range(followers)]
+        _wait_for(lambda: flight.stats()["merged"] == followers)
+        if timeout is not None:
+            _wait_for(lambda: all(future.done() for future in merged))
+        release.set()
+    return leader, merged
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        release.wait(5)
+        return "answer"
+
+    leader, merged = _run_merged(flight, func, release, 3)
+
+    assert leader.result() == ("answer", False)
+    assert [future.result() for future in merged] == [("answer", True)] * 3
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "merged": 3, "timeouts": 0, "errors": 0}
+
+
+def test_leader_error_reaches_every_caller():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def func():
+        release.wait(5)
+        raise ValueError("upstream failed")
+
+    leader, merged = _run_merged(flight, func, release, 2)
+
+    for future in [leader] + merged:
+        with pytest.raises(ValueError):
+            future.result()
+    assert flight.stats()["errors"] == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_merged_caller_times_out_without_stopping_the_leader():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def func():
+        release.wait(5)
+        return "late"
+
+    leader, merged = _run_merged(flight, func, release, 1, timeout=0.01)
+
+    with pytest.raises(FutureTimeoutError):
+        merged[0].result()
+    assert leader.result() == ("late", False)
+    assert flight.stats()["timeouts"] == 1
+
+
+def test_calls_after_completion_run_again():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == (1, False)
+    assert flight.do("key", lambda: 2) == (2, False)
+    assert flight.stats()["leaders"] == 2
+
+
+def test_async_calls_share_one_execution():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def func():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", func) for _ in range(4)))
+
+    results = asyncio.run(run())
+    assert results == [("answer", False)] + [("answer", True)] * 3
+    assert len(calls) == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_async_error_reaches_every_caller():
+    flight = AsyncSingleFlight()
+
+    async def func():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", func) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()["errors"] == 1
+
+
+def test_async_cancelled_leader_does_not_cancel_the_shared_call():
+    flight = AsyncSingleFlight()
+
+    async def func():
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("key", func))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", func))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == ("answer", True)
+
+
+def test_async_merged_caller_times_out():
+    flight = AsyncSingleFlight()
+
+    async def func():
+        await asyncio.sleep(0.2)
+        return "answer"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("key", func))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.do("key", func, timeout=0.01)
+        return await leader
+
+    assert asyncio.run(run()) == ("answer", False)
+    assert flight.stats()["timeouts"] == 1
@@ -3,6 +3,33 @@ import { useState, useCallback, useEffect, useRef } from 'react';
 
 const API_URL = 'http://localhost:5000';
 
+// Read a Server-Sent Events response body, calling onEvent(event, payload) per event
+async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      
+      let event = 'message';
+      let dataText = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataText += line.slice(5).trim();
+      }
+      if (dataText) onEvent(event, JSON.parse(dataText));
+    }
+  }
+}
+
 export function useChat() {
   const [messages, setMessages] = useState([]);
   const [isLoading, setIsLoading] = useState(false);
@@ -42,8 +69,8 @@ export function useChat() {
         content: msg.text
       })).filter(msg => msg.content);
       
-      // Send request to the API
-      const response = await fetch(`${API_URL}/api/chat`, {
+      // Send request to the streaming API
+      const response = await fetch(`${API_URL}/api/chat/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json'
@@ -55,28 +82,47 @@ export function useChat() {
         })
       });
       
-      // Parse response
-      const data = await response.json();
-      
       if (!response.ok) {
+        const data = await response.json();
         throw new Error(data.error || 'Failed to get response from the chatbot');
       }
       
-      // Add bot response to messages state
-      const botMessage = {
-        id: (Date.now() + 1).toString(),
-        text: data.response,
-        sender: 'assistant',
-        timestamp: new Date(),
-        metadata: {
-          source: data.source,
-          confidence: data.confidence,
-          intent: data.intent,
-          processing_time: data.processing_time
+      // Add the bot message on the first event and fill it in as more arrive
+      const botMessageId = (Date.now() + 1).toString();
+      let botMessageAdded = false;
+      
+      const updateBotMessage = (update) => {
+        if (!botMessageAdded) {
+          botMessageAdded = true;
+          const botMessage = { id: botMessageId, text: '', sender: 'assistant', timestamp: new Date() };
+          setMessages(prevMessages => [...prevMessages, { ...botMessage, ...update(botMessage) }]);
+          return;
         }
+        setMessages(prevMessages => prevMessages.map(msg => (
+          msg.id === botMessageId ? { ...msg, ...update(msg) } : msg
+        )));
       };
       
-      setMessages(prevMessages => [...prevMessages, botMessage]);
+      let data = {};
+      await readEventStream(response, (event, payload) => {
+        if (event === 'message') {
+          updateBotMessage(() => ({ text: payload.text }));
+        } else if (event === 'token') {
+          updateBotMessage(msg => ({ text: msg.text + payload.text }));
+        } else if (event === 'done') {
+          data = payload;
+          updateBotMessage(() => ({
+            metadata: {
+              source: payload.source,
+              confidence: payload.confidence,
+              intent: payload.intent,
+              processing_time: payload.processing_time
+            }
+          }));
+        } else if (event === 'error') {
+          throw new Error(payload.error || 'Failed to get response from the chatbot');
+        }
+      });
       
       // Update quick replies if provided by the backend
       if (data.quick_replies && Array.isArray(data.quick_replies)) {